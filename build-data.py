@@ -12,14 +12,28 @@ Outputs:
   - public/towns.json       (towns category)
   - public/navigation.json  (navigation category)
   - public/toilets.json     (toilets category)
+  - public/data-bundle.json (with --normalized: shared record table + per-file
+                             ID lists, see scripts/buildlib/bundle.py)
+
+Usage:
+    python3 build-data.py [--normalized] [--allow-size-change] [--trace out.json] [--profile out.prof]
 """
 
 import xml.etree.ElementTree as ET
 import csv
 import json
 import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from buildlib.bundle import build_bundle  # noqa: E402
+from buildlib.classify import on_trail_status  # noqa: E402
+from buildlib.manifest import ALLOW_SIZE_CHANGE_FLAG, publish, update_manifest  # noqa: E402
+from buildlib.trace import enable_from_argv, span, traced  # noqa: E402
 
 
+@traced("parse gpx")
 def parse_gpx_waypoints(gpx_file):
     """Parse GPX file and return dictionary of waypoint_name -> {lat, lon}"""
     tree = ET.parse(gpx_file)
@@ -37,6 +51,7 @@ def parse_gpx_waypoints(gpx_file):
     return waypoints
 
 
+@traced("parse csv")
 def parse_csv_metadata(csv_file):
     """Parse CSV file and return list of waypoints with metadata"""
     waypoints = []
@@ -56,18 +71,7 @@ def parse_csv_metadata(csv_file):
     return waypoints
 
 
-def extract_on_trail_status(landmark):
-    """Extract whether water is on trail or off trail"""
-    landmark_lower = landmark.lower()
-    off_trail_pattern = r'(\d+\.?\d*)\s*(mile|mi|m)\s*(off|away|to|from)'
-    match = re.search(off_trail_pattern, landmark_lower)
-    if match:
-        return False, match.group(1) + ' mi'
-    if 'off trail' in landmark_lower or 'off-trail' in landmark_lower:
-        return False, 'off trail'
-    return True, ''
-
-
+@traced("build waypoints")
 def build_all_waypoints(csv_waypoints, gpx_coords):
     """Build complete waypoints list for navigation/mile calculations"""
     all_waypoints = []
@@ -117,7 +121,7 @@ def build_category(csv_waypoints, gpx_coords, category):
         }
 
         if category == 'water':
-            on_trail, off_trail_dist = extract_on_trail_status(wp['landmark'])
+            on_trail, off_trail_dist = on_trail_status(wp['landmark'])
             entry['onTrail'] = on_trail
             entry['offTrailDist'] = off_trail_dist
             entry['details'] = wp['water_details']
@@ -156,6 +160,8 @@ def build_category(csv_waypoints, gpx_coords, category):
 
 
 def main():
+    enable_from_argv(usage=__doc__)
+    allow_size_change = ALLOW_SIZE_CHANGE_FLAG in sys.argv
     gpx_file = 'waypoints-including-alternates.gpx'
     csv_file = 'Water Sources Sanitized.csv'
 
@@ -169,28 +175,39 @@ def main():
 
     # Build all waypoints (for mile calculations)
     all_waypoints = build_all_waypoints(csv_waypoints, gpx_coords)
-    with open('public/waypoints.json', 'w', encoding='utf-8') as f:
-        json.dump(all_waypoints, f, indent=2)
+    outputs = {'public/waypoints.json': json.dumps(all_waypoints, indent=2)}
     print(f"\nwaypoints.json: {len(all_waypoints)} waypoints")
 
     # Build each category
     categories = ['water', 'towns', 'navigation', 'toilets']
     for cat in categories:
-        data = build_category(csv_waypoints, gpx_coords, cat)
-        output_file = f'public/{cat}.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        with span(f"build {cat}"):
+            data = build_category(csv_waypoints, gpx_coords, cat)
+            outputs[f'public/{cat}.json'] = json.dumps(data, indent=2)
         print(f"{cat}.json: {len(data)} entries")
+    # Every output is size-checked before any of them is written.
+    with span("write json"):
+        publish(outputs, allow_size_change)
 
     # Ensure category waypoints (notably toilets, which come from a separate
     # import path) are mirrored into waypoints.json. Without this, the
     # by-name lookup in modals.js silently misses them.
     print("\nSyncing category entries into waypoints.json...")
     import subprocess
-    subprocess.run(
-        ['node', 'scripts/sync-waypoints-with-categories.js', '--trail', 'odt'],
-        check=False
-    )
+    with span("sync waypoints (node)"):
+        subprocess.run(
+            ['node', 'scripts/sync-waypoints-with-categories.js', '--trail', 'odt'],
+            check=False
+        )
+    # The sync rewrote waypoints.json after publish(); record its final hash.
+    update_manifest(['public/waypoints.json'], max_size_change=None)
+
+    if '--normalized' in sys.argv:
+        print("\nBuilding normalized data bundle...")
+        with span("build bundle"):
+            bundle = build_bundle(Path('public'))
+        publish({'public/data-bundle.json': json.dumps(bundle, separators=(',', ':'))}, allow_size_change)
+        print(f"data-bundle.json: {len(bundle['records']['name'])} shared records")
 
     print("\nDone!")
 
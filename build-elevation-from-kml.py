@@ -10,10 +10,12 @@ Supports checkpoint/resume: saves progress to elevation-checkpoint.json
 so you can resume if interrupted.
 
 Usage:
-    python3 build-elevation-from-kml.py [--resume]
+    python3 build-elevation-from-kml.py [--resume] [--trace out.json] [--profile out.prof]
 
 Output:
-    public/elevation-profile.json   (replaces the existing file)
+    public/elevation-profile.json   (replaces the existing file; samples carry a smoothed grade)
+    public/steep-segments.json      (steep climbs/descents per section, see scripts/buildlib/grades.py)
+    public/hiking-times.json        (cumulative Tobler hours per sample, see scripts/buildlib/pace.py)
     elevation-profile-backup.json   (backup of the old file)
 """
 
@@ -25,10 +27,15 @@ import math
 import time
 import shutil
 import asyncio
-import aiohttp
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from buildlib.grades import GRADES_FILE, grade_profile  # noqa: E402
+from buildlib.manifest import ALLOW_SIZE_CHANGE_FLAG, publish  # noqa: E402
+from buildlib.pace import TIMES_FILE, hiking_times  # noqa: E402
+from buildlib.trace import enable_from_argv, span, traced  # noqa: E402
+
 # USGS epqs.nationalmap.gov uses a cert chain not in Python's default store.
 # curl works because it uses the macOS system store. We disable verification
 # here since this is a well-known federal government endpoint.
@@ -45,6 +52,8 @@ KML_FILES = [
 ]
 ROOT = Path(__file__).parent
 OUTPUT = ROOT / "public" / "elevation-profile.json"
+STEEP_OUTPUT = ROOT / "public" / GRADES_FILE
+TIMES_OUTPUT = ROOT / "public" / TIMES_FILE
 BACKUP = ROOT / "elevation-profile-backup.json"
 CHECKPOINT = ROOT / "elevation-checkpoint.json"
 
@@ -64,6 +73,7 @@ def haversine(lon1, lat1, lon2, lat2):
     return 2 * R * math.asin(math.sqrt(a))
 
 # ---- Parse KML ----
+@traced("parse kml")
 def parse_kml(path):
     ns = {'kml': 'http://www.opengis.net/kml/2.2'}
     tree = ET.parse(path)
@@ -95,6 +105,7 @@ def parse_kml(path):
     segments.sort(key=lambda x: x[0])
     return segments
 
+@traced("stitch kml")
 def stitch_all():
     all_segments = []
     for kml_file in KML_FILES:
@@ -122,6 +133,7 @@ def stitch_all():
 
     return points
 
+@traced("add distances")
 def add_distances(points):
     result = []
     cum = 0.0
@@ -136,6 +148,7 @@ def add_distances(points):
 
 # ---- USGS elevation query (single point) ----
 async def fetch_elevation(session, lon, lat):
+    import aiohttp  # only needed for the network stage; keeps --help and imports cheap
     params = {
         'x': f'{lon:.6f}',
         'y': f'{lat:.6f}',
@@ -186,6 +199,7 @@ async def fetch_batch(points_batch, start_idx, elevations, sem, session, done_co
     await asyncio.gather(*tasks)
 
 async def fetch_all_elevations(points, resume_from=0):
+    import aiohttp
     total = len(points)
     elevations = [None] * total
     done_counter = [resume_from]
@@ -244,6 +258,7 @@ async def fetch_all_elevations(points, resume_from=0):
     return elevations
 
 # ---- Gap filling ----
+@traced("fill gaps")
 def fill_gaps(elevations):
     n = len(elevations)
     result = list(elevations)
@@ -278,6 +293,7 @@ def fill_gaps(elevations):
     return result
 
 # ---- Comparison report ----
+@traced("compare profiles")
 def compare_profiles(old_path, new_points):
     if not old_path.exists():
         print("  (no old profile to compare)")
@@ -321,6 +337,7 @@ def compare_profiles(old_path, new_points):
 # ---- Main ----
 async def main():
     resume = '--resume' in sys.argv
+    enable_from_argv(usage=__doc__)
 
     print("=" * 62)
     print("ODT Elevation Profile Builder")
@@ -362,7 +379,8 @@ async def main():
     print()
 
     start = time.time()
-    elevations = await fetch_all_elevations(points, resume_from=resume_from)
+    with span("fetch elevations (USGS)", points=none_count_expected):
+        elevations = await fetch_all_elevations(points, resume_from=resume_from)
     elapsed = time.time() - start
     print(f"\n  Fetch complete in {elapsed/60:.1f} min")
 
@@ -389,11 +407,22 @@ async def main():
             'elevation': elev,
         })
 
+    # Grades + steep-segment index
+    with span("grades + times"):
+        steep = grade_profile('odt', result)
+        times = hiking_times(result)
+
     # Write output
-    with open(OUTPUT, 'w') as f:
-        json.dump(result, f, separators=(',', ':'))
+    with span("write json"):
+        publish({
+            OUTPUT: json.dumps(result, separators=(',', ':')),
+            STEEP_OUTPUT: json.dumps(steep, separators=(',', ':')) + '\n',
+            TIMES_OUTPUT: json.dumps(times, separators=(',', ':')) + '\n',
+        }, allow_size_change=ALLOW_SIZE_CHANGE_FLAG in sys.argv)
     size_kb = OUTPUT.stat().st_size / 1024
     print(f"  Written: {OUTPUT} ({size_kb:.0f} KB)")
+    print(f"  Written: {STEEP_OUTPUT}")
+    print(f"  Written: {TIMES_OUTPUT}")
 
     # Clean up checkpoint
     if CHECKPOINT.exists():
@@ -12,7 +12,15 @@ import xml.etree.ElementTree as ET
 import csv
 import json
 import re
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from buildlib.classify import is_town as town_keyword, is_water, on_trail_status, town_services  # noqa: E402
+from buildlib.manifest import ALLOW_SIZE_CHANGE_FLAG, publish  # noqa: E402
+from buildlib.trace import enable_from_argv, traced  # noqa: E402
+
+@traced("parse gpx")
 def parse_gpx_waypoints(gpx_file):
     """Parse GPX file and return dictionary of waypoint_name -> {lat, lon}"""
     tree = ET.parse(gpx_file)
@@ -32,6 +40,7 @@ def parse_gpx_waypoints(gpx_file):
 
     return waypoints
 
+@traced("parse csv")
 def parse_csv_metadata(csv_file):
     """Parse CSV file and return list of waypoints with metadata"""
     waypoints = []
@@ -52,48 +61,13 @@ def parse_csv_metadata(csv_file):
 
 def is_water_source(waypoint):
     """Determine if a waypoint has water based on metadata"""
-    water_details = waypoint['water_details'].strip()
-    landmark = waypoint['landmark'].lower()
-
-    # Has water if water_details is not empty, or landmark mentions water-related keywords
-    if water_details:
-        return True
-
-    # Check landmark for water keywords
-    water_keywords = ['water', 'spring', 'creek', 'river', 'lake', 'reservoir', 'trough',
-                      'canal', 'spigot', 'campground', 'pond', 'marsh']
-    if any(keyword in landmark for keyword in water_keywords):
-        return True
-
-    return False
+    return is_water(waypoint['landmark'], waypoint['water_details']) is not None
 
 def is_town(waypoint):
     """Determine if a waypoint is a town/services location"""
-    landmark = waypoint['landmark'].lower()
-    water_details = waypoint['water_details'].lower()
-
-    # Town keywords
-    town_keywords = ['services', 'town', 'city', 'ranch', 'store', 'resupply']
-
-    combined = landmark + ' ' + water_details
-    return any(keyword in combined for keyword in town_keywords)
-
-def extract_on_trail_status(landmark):
-    """Extract whether water is on trail or off trail"""
-    landmark_lower = landmark.lower()
-
-    # Look for distance indicators
-    off_trail_pattern = r'(\d+\.?\d*)\s*(mile|mi|m)\s*(off|away|to|from)'
-    match = re.search(off_trail_pattern, landmark_lower)
-
-    if match:
-        return False, match.group(1) + ' mi'
-
-    if 'off trail' in landmark_lower or 'off-trail' in landmark_lower:
-        return False, 'off trail'
-
-    return True, ''
+    return town_keyword(waypoint['landmark'], waypoint['water_details']) is not None
 
+@traced("build water sources")
 def build_water_sources(csv_waypoints, gpx_coords):
     """Build water sources list with GPS coordinates"""
     water_sources = []
@@ -105,7 +79,7 @@ def build_water_sources(csv_waypoints, gpx_coords):
             # Get GPS coordinates from GPX
             if waypoint_name in gpx_coords:
                 coords = gpx_coords[waypoint_name]
-                on_trail, off_trail_dist = extract_on_trail_status(wp['landmark'])
+                on_trail, off_trail_dist = on_trail_status(wp['landmark'])
 
                 water_entry = {
                     'mile': float(wp['mile']) if wp['mile'] else 0,
@@ -136,6 +110,7 @@ def build_water_sources(csv_waypoints, gpx_coords):
 
     return water_sources
 
+@traced("build towns")
 def build_towns(csv_waypoints, gpx_coords):
     """Build towns list with GPS coordinates"""
     towns = []
@@ -155,16 +130,8 @@ def build_towns(csv_waypoints, gpx_coords):
                 town_name_match = re.search(r'^([^(,]+)', landmark)
                 town_name = town_name_match.group(1).strip() if town_name_match else landmark
 
-                # Parse services level
-                services = 'limited'
-                if 'all services' in landmark.lower():
-                    services = 'all'
-                elif 'limited' in landmark.lower() or 'some services' in landmark.lower():
-                    services = 'limited'
-                elif 'no resupply' in landmark.lower() or 'no services' in landmark.lower():
-                    services = 'none'
-                elif 'store' in landmark.lower() or 'camp store' in landmark.lower():
-                    services = 'store'
+                # Parse services level (rules: scripts/buildlib/classify.py)
+                services = town_services(landmark)
 
                 # Parse off-trail distance
                 off_trail = None
@@ -199,6 +166,7 @@ def build_towns(csv_waypoints, gpx_coords):
 
     return unique_towns
 
+@traced("build waypoints")
 def build_all_waypoints(csv_waypoints, gpx_coords):
     """Build complete waypoints list with GPS coordinates for navigation"""
     all_waypoints = []
@@ -237,6 +205,7 @@ def build_all_waypoints(csv_waypoints, gpx_coords):
     return unique_waypoints
 
 def main():
+    enable_from_argv(usage=__doc__)
     # File paths
     gpx_file = 'waypoints-including-alternates.gpx'
     csv_file = 'Water Sources Sanitized.csv'
@@ -264,17 +233,12 @@ def main():
     towns = build_towns(csv_waypoints, gpx_coords)
     print(f"Generated {len(towns)} towns")
 
-    print("\nWriting waypoints.json...")
-    with open(waypoints_output, 'w', encoding='utf-8') as f:
-        json.dump(all_waypoints, f, indent=2)
-
-    print("Writing water-sources.json...")
-    with open(water_output, 'w', encoding='utf-8') as f:
-        json.dump(water_sources, f, indent=2)
-
-    print("Writing towns.json...")
-    with open(towns_output, 'w', encoding='utf-8') as f:
-        json.dump(towns, f, indent=2)
+    print("\nWriting waypoints.json, water-sources.json and towns.json...")
+    publish({
+        waypoints_output: json.dumps(all_waypoints, indent=2),
+        water_output: json.dumps(water_sources, indent=2),
+        towns_output: json.dumps(towns, indent=2),
+    }, allow_size_change=ALLOW_SIZE_CHANGE_FLAG in sys.argv)
 
     print("\n✓ Complete! Files generated:")
     print(f"  - {waypoints_output}")
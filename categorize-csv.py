@@ -2,7 +2,8 @@
 """
 One-time script to auto-populate category and subcategory columns in the CSV.
 
-Uses the same heuristics as the old build-water-sources.py to classify waypoints:
+Uses the shared keyword rules in scripts/buildlib/classify.py (also used by
+build-water-sources.py and build-data.py) to classify waypoints:
 - Towns: landmarks mentioning services/town/city/ranch/store/resupply
 - Water: has water details or water-related keywords in landmark (excluding towns)
 - Navigation: everything else
@@ -12,61 +13,23 @@ Run once, then manually review and curate the CSV.
 """
 
 import csv
-import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from buildlib.classify import classify  # noqa: E402
+
 
 def classify_waypoint(row):
-    """Return (category, subcategory) for a CSV row."""
-    landmark = row['Landmark'].lower()
-    water_details = row['Water Details'].strip()
-    water_details_lower = water_details.lower()
-
-    combined = landmark + ' ' + water_details_lower
-
-    # --- Towns ---
-    town_keywords = ['services', 'town', 'city', 'ranch', 'store', 'resupply']
-    if any(kw in combined for kw in town_keywords):
-        # Parse subcategory from services level
-        if 'all services' in landmark:
-            return 'towns', 'full'
-        elif 'no resupply' in landmark or 'no services' in landmark:
-            return 'towns', 'none'
-        elif 'limited' in landmark or 'some services' in landmark:
-            return 'towns', 'limited'
-        elif 'store' in landmark or 'camp store' in landmark:
-            return 'towns', 'limited'
-        return 'towns', 'limited'
-
-    # --- Water ---
-    water_keywords = ['water', 'spring', 'creek', 'river', 'lake', 'reservoir',
-                      'trough', 'canal', 'spigot', 'campground', 'pond', 'marsh']
-    has_water = bool(water_details)
-    if not has_water:
-        has_water = any(kw in landmark for kw in water_keywords)
-
-    if has_water:
-        # Parse subcategory from reliability
-        if 'unreliable' in water_details_lower or 'unreliable' in landmark:
-            return 'water', 'unreliable'
-        elif 'seasonal' in water_details_lower:
-            return 'water', 'seasonal'
-        elif 'reliable' in water_details_lower:
-            return 'water', 'reliable'
-        # Default: if it has water details but no reliability keyword
-        return 'water', 'seasonal'
-
-    # --- Navigation (everything else) ---
-    # Parse subcategory from landmark
-    if 'junction' in landmark or 'jct' in landmark:
-        return 'navigation', 'junction'
-    elif 'gate' in landmark or 'fence' in landmark:
-        return 'navigation', 'gate'
-    elif 'road' in landmark or 'highway' in landmark or 'paved' in landmark:
-        return 'navigation', 'road-crossing'
-    else:
-        return 'navigation', 'other'
+    """Return (category, subcategory, rule) for a CSV row (rules: scripts/buildlib/classify.py)."""
+    return classify(row['Landmark'], row['Water Details'])
 
 
 def main():
+    if '-h' in sys.argv or '--help' in sys.argv:
+        print(__doc__.strip())
+        return
     input_file = 'Water Sources Sanitized.csv'
     output_file = 'Water Sources Sanitized.csv'  # Overwrite in place
 
@@ -83,13 +46,15 @@ def main():
 
     # Classify each row
     stats = {}
+    rules = Counter()
     for row in rows:
         if not row['Way Point'].strip():
             row['category'] = ''
             row['subcategory'] = ''
             continue
 
-        category, subcategory = classify_waypoint(row)
+        category, subcategory, rule = classify_waypoint(row)
+        rules[rule] += 1
         row['category'] = category
         row['subcategory'] = subcategory
 
@@ -108,6 +73,10 @@ def main():
     for key in sorted(stats.keys()):
         print(f"  {key}: {stats[key]}")
 
+    print("\nRules fired:")
+    for rule, count in rules.most_common():
+        print(f"  {count:4}  {rule}")
+
     total = sum(stats.values())
     print(f"\nTotal categorized: {total}")
     print(f"Written to: {output_file}")
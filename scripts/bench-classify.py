@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark buildlib.classify against the keyword loops it replaced.
+
+Writes a synthetic 100k-row CSV shaped like Water Sources Sanitized.csv, reads
+it back, then classifies every row two ways: the previous categorize-csv.py
+logic (hard-coded `kw in text` loops) and buildlib.classify (the same rules as
+priority-ordered tables, reporting which rule fired). Both must agree on every
+row; tests/python/test_classify.py checks the same on the published data.
+
+Run:
+    python3 scripts/bench-classify.py [--rows 100000]
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+from buildlib.classify import classify
+from buildlib.synthetic import waypoint_csv_rows
+
+
+def legacy_classify(row):
+    """classify_waypoint() from categorize-csv.py before the shared rules module."""
+    landmark = row['Landmark'].lower()
+    water_details = row['Water Details'].strip()
+    water_details_lower = water_details.lower()
+    combined = landmark + ' ' + water_details_lower
+
+    town_keywords = ['services', 'town', 'city', 'ranch', 'store', 'resupply']
+    if any(kw in combined for kw in town_keywords):
+        if 'all services' in landmark:
+            return 'towns', 'full'
+        elif 'no resupply' in landmark or 'no services' in landmark:
+            return 'towns', 'none'
+        elif 'limited' in landmark or 'some services' in landmark:
+            return 'towns', 'limited'
+        elif 'store' in landmark or 'camp store' in landmark:
+            return 'towns', 'limited'
+        return 'towns', 'limited'
+
+    water_keywords = ['water', 'spring', 'creek', 'river', 'lake', 'reservoir',
+                      'trough', 'canal', 'spigot', 'campground', 'pond', 'marsh']
+    has_water = bool(water_details)
+    if not has_water:
+        has_water = any(kw in landmark for kw in water_keywords)
+    if has_water:
+        if 'unreliable' in water_details_lower or 'unreliable' in landmark:
+            return 'water', 'unreliable'
+        elif 'seasonal' in water_details_lower:
+            return 'water', 'seasonal'
+        elif 'reliable' in water_details_lower:
+            return 'water', 'reliable'
+        return 'water', 'seasonal'
+
+    if 'junction' in landmark or 'jct' in landmark:
+        return 'navigation', 'junction'
+    elif 'gate' in landmark or 'fence' in landmark:
+        return 'navigation', 'gate'
+    elif 'road' in landmark or 'highway' in landmark or 'paved' in landmark:
+        return 'navigation', 'road-crossing'
+    else:
+        return 'navigation', 'other'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    generated = waypoint_csv_rows(args.rows, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "waypoints.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(generated[0]))
+            writer.writeheader()
+            writer.writerows(generated)
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    print(f"Synthetic CSV: {len(rows):,} rows")
+
+    start = time.perf_counter()
+    legacy = [legacy_classify(row) for row in rows]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = [classify(row["Landmark"], row["Water Details"]) for row in rows]
+    shared_s = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy, shared) if a != (b.category, b.subcategory))
+    print(f"Hard-coded loops:  {legacy_s:8.3f} s")
+    print(f"Rule tables:       {shared_s:8.3f} s  ({mismatches} mismatches, with rule attribution)")
+    if mismatches:
+        raise SystemExit("classifiers disagree with the legacy rules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark comment-to-waypoint matching in extract-nnml-water-comments.py.
+
+Generates a synthetic NNML water chart workbook (10k rows by default) and a
+matching set of waypoint records, then times workbook parsing and the
+nearest-record lookup for every commented row against all five target files:
+the grid index used by the extractor versus the previous linear scan over every
+coordinate key. The linear scan is timed on a sample of rows and extrapolated.
+
+Run:
+    python3 scripts/bench-nnml-comment-matching.py [--rows 10000] [--baseline-rows 200]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from buildlib.scripts import load_script
+from buildlib.synthetic import trail_records, write_water_chart_xlsx
+
+comments = load_script("scripts/extract-nnml-water-comments.py")
+
+
+def linear_candidates(exact, coords):
+    """The extractor's previous fallback: scan every key with flat 69/55 mi-per-degree factors."""
+    if coords in exact:
+        return exact[coords]
+    nearest_key, nearest_distance = None, float("inf")
+    for key in exact:
+        distance = (((coords[0] - key[0]) * 69) ** 2 + ((coords[1] - key[1]) * 55) ** 2) ** 0.5
+        if distance < nearest_distance:
+            nearest_key, nearest_distance = key, distance
+    if nearest_key and nearest_distance <= comments.MAX_NEAREST_MATCH_MILES:
+        return exact[nearest_key]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--baseline-rows", type=int, default=200,
+                        help="Commented rows to time the linear scan on (extrapolated).")
+    args = parser.parse_args()
+    file_count = len(comments.TARGET_FILES)
+
+    records = trail_records(args.rows, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = Path(tmp) / "water-chart.xlsx"
+        commented = write_water_chart_xlsx(workbook, records, seed=2)
+        print(f"Synthetic workbook: {args.rows:,} rows, {commented:,} commented, "
+              f"{workbook.stat().st_size / 1024:.0f} KB")
+
+        start = time.perf_counter()
+        queries = []
+        for _, threads, rows in comments.commented_sheets(workbook):
+            for ref in threads:
+                coords = comments.parse_coords(rows.get(comments.cell_row(ref), {}).get("F", ""))
+                if coords:
+                    queries.append(coords)
+        print(f"Parse workbook:        {time.perf_counter() - start:8.3f} s")
+
+    start = time.perf_counter()
+    indexes = [comments.build_index(records) for _ in range(file_count)]
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grid_hits = 0
+    for index in indexes:
+        for coords in queries:
+            grid_hits += bool(comments.find_candidates(index, coords))
+    grid_s = time.perf_counter() - start
+    print(f"Grid index:            {grid_s + build_s:8.3f} s  "
+          f"(build {build_s:.3f} s, {grid_hits:,} matches over {file_count} files)")
+
+    sample = queries[:args.baseline_rows]
+    exact = indexes[0][0]
+    start = time.perf_counter()
+    linear_hits = sum(bool(linear_candidates(exact, coords)) for coords in sample)
+    sample_s = time.perf_counter() - start
+    linear_s = sample_s * len(queries) / max(len(sample), 1) * file_count
+    grid_sample_hits = sum(bool(comments.find_candidates(indexes[0], coords)) for coords in sample)
+    print(f"Linear scan (est.):    {linear_s:8.3f} s  "
+          f"(timed {len(sample)} rows; {linear_hits}/{len(sample)} matched vs {grid_sample_hits} by grid)")
+    print(f"Speedup:               {linear_s / max(grid_s + build_s, 1e-9):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
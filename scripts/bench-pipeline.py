@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Benchmark the Python build stages on synthetic trails at several scales.
+
+Scale 1 matches one real trail: a ~30k-point KML track split over four region
+files, a 900-row waypoint CSV with its GPX, a DEM covering the track and a
+1,000-row NNML water chart. Scale N multiplies every input by N. Inputs come
+from buildlib.synthetic and are generated outside the timed region; each
+stage keeps the best of --repeat runs.
+
+Stages:
+    stitch_all, add_distances, fill_gaps   build-elevation-from-kml.py
+    build_category                         build-data.py (all four categories)
+    sample_dem                             build-elevation-profile.py
+    nnml_comment_match                     extract-nnml-water-comments.py
+    nnml_databook_match                    parse-nnml-databook.py
+
+Stages whose code needs a package that is not installed (rasterio for
+sample_dem) are recorded as skipped rather than failing the run.
+
+`run` writes JSON results (build/bench/latest.json by default); `compare`
+flags every stage/scale that got slower than the baseline by more than
+--threshold, ignoring differences under --min-seconds, and exits 1 if any did.
+
+Run:
+    python3 scripts/bench-pipeline.py run [--scales 1 10 100] [--only sample_dem] [--out build/bench/baseline.json]
+    python3 scripts/bench-pipeline.py compare build/bench/baseline.json build/bench/latest.json [--threshold 0.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from buildlib import BUILD_DIR
+from buildlib.classify import classify
+from buildlib.scripts import load_script
+from buildlib.synthetic import (
+    random_walk,
+    trail_records,
+    waypoint_csv_rows,
+    write_csv,
+    write_dem_geotiff,
+    write_kml_tracks,
+    write_water_chart_xlsx,
+    write_waypoint_gpx,
+)
+
+TRACK_POINTS = 30_000
+TRACK_STEP_DEG = 0.0003  # ~30 m between KML vertices, like the ODT tracks
+CSV_ROWS = 900
+NNML_ROWS = 1_000
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_OUT = BUILD_DIR / "bench" / "latest.json"
+FORMAT_VERSION = 1
+
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def scaled_track(scale: int) -> list[tuple[float, float]]:
+    return random_walk(TRACK_POINTS * scale, seed=1, start=(44.05, -121.04), step_deg=TRACK_STEP_DEG)
+
+
+def setup_stitch_all(scale: int, tmp: Path):
+    kml = load_script("build-elevation-from-kml.py")
+    track = scaled_track(scale)
+    names = write_kml_tracks(tmp, track)
+
+    def run():
+        saved = kml.ROOT, kml.KML_FILES
+        kml.ROOT, kml.KML_FILES = tmp, names
+        try:
+            with quiet():
+                kml.stitch_all()
+        finally:
+            kml.ROOT, kml.KML_FILES = saved
+    return run, len(track)
+
+
+def setup_add_distances(scale: int, tmp: Path):
+    kml = load_script("build-elevation-from-kml.py")
+    points = [(lon, lat) for lat, lon in scaled_track(scale)]
+    return lambda: kml.add_distances(points), len(points)
+
+
+def setup_fill_gaps(scale: int, tmp: Path):
+    kml = load_script("build-elevation-from-kml.py")
+    rng = random.Random(3)
+    elevations = []
+    n = TRACK_POINTS * scale
+    while len(elevations) < n:
+        # Runs of misses, as when USGS requests fail in bursts.
+        if rng.random() < 0.02:
+            elevations.extend([None] * rng.randint(1, 40))
+        else:
+            elevations.append(rng.randint(3000, 7000))
+    elevations = elevations[:n]
+    elevations[0] = None
+    return lambda: kml.fill_gaps(elevations), n
+
+
+def setup_build_category(scale: int, tmp: Path):
+    data = load_script("build-data.py")
+    rows = waypoint_csv_rows(CSV_ROWS * scale, seed=2)
+    for row in rows:
+        row["category"], row["subcategory"], _ = classify(row["Landmark"], row["Water Details"])
+    write_csv(tmp / "waypoints.csv", rows)
+    write_waypoint_gpx(tmp / "waypoints.gpx", rows, scaled_track(scale))
+    with quiet():
+        csv_waypoints = data.parse_csv_metadata(tmp / "waypoints.csv")
+    gpx_coords = data.parse_gpx_waypoints(tmp / "waypoints.gpx")
+
+    def run():
+        for category in ("water", "towns", "navigation", "toilets"):
+            data.build_category(csv_waypoints, gpx_coords, category)
+    return run, len(rows)
+
+
+def setup_sample_dem(scale: int, tmp: Path):
+    profile = load_script("scripts/build-elevation-profile.py")
+    track = scaled_track(scale)
+    write_dem_geotiff(tmp / "dem.tif", track)
+    points = [(lon, lat) for lat, lon in track]
+    return lambda: profile.sample_dem(tmp / "dem.tif", points), len(points)
+
+
+def setup_nnml_comment_match(scale: int, tmp: Path):
+    comments = load_script("scripts/extract-nnml-water-comments.py")
+    records = trail_records(NNML_ROWS * scale, seed=4)
+    write_water_chart_xlsx(tmp / "water-chart.xlsx", records, seed=5)
+    queries = []
+    for _, threads, rows in comments.commented_sheets(tmp / "water-chart.xlsx"):
+        for ref in threads:
+            coords = comments.parse_coords(rows.get(comments.cell_row(ref), {}).get("F", ""))
+            if coords:
+                queries.append(coords)
+
+    def run():
+        index = comments.build_index(records)
+        for coords in queries:
+            comments.find_candidates(index, coords)
+    return run, len(queries)
+
+
+def setup_nnml_databook_match(scale: int, tmp: Path):
+    databook = load_script("scripts/parse-nnml-databook.py")
+    records = trail_records(NNML_ROWS * scale, seed=6)
+    rng = random.Random(7)
+    book = [
+        {"section": "S1", "cw": r["mile"], "name": r["name"],
+         "lat": round(r["lat"] + rng.uniform(-0.0003, 0.0003), 5),
+         "lon": round(r["lon"] + rng.uniform(-0.0003, 0.0003), 5),
+         "desc": f"Databook description {i}"}
+        for i, r in enumerate(records)
+    ]
+    datasets = {filename: records for filename in databook.TARGET_FIELDS}
+
+    def run():
+        fresh = copy.deepcopy(datasets)
+        with quiet():
+            databook.repair_landmarks(fresh, book)
+    return run, len(records) * len(datasets)
+
+
+STAGES = {
+    "stitch_all": setup_stitch_all,
+    "add_distances": setup_add_distances,
+    "fill_gaps": setup_fill_gaps,
+    "build_category": setup_build_category,
+    "sample_dem": setup_sample_dem,
+    "nnml_comment_match": setup_nnml_comment_match,
+    "nnml_databook_match": setup_nnml_databook_match,
+}
+
+
+def run_stage(setup, scale: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            fn, items = setup(scale, Path(tmp))
+        except ImportError as exc:
+            return {"skipped": f"missing dependency: {exc.name or exc}"}
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return {"seconds": round(best, 4), "items": items, "perItemUs": round(best / max(items, 1) * 1e6, 3)}
+
+
+def cmd_run(args) -> None:
+    stages = args.only or list(STAGES)
+    results: dict[str, dict[str, dict]] = {}
+    for name in stages:
+        results[name] = {}
+        for scale in args.scales:
+            result = run_stage(STAGES[name], scale, args.repeat)
+            results[name][str(scale)] = result
+            if "skipped" in result:
+                print(f"{name:22s} {scale:>4}x  skipped ({result['skipped']})")
+                break
+            print(f"{name:22s} {scale:>4}x  {result['seconds']:9.4f} s  "
+                  f"{result['items']:>10,} items  {result['perItemUs']:8.3f} us/item")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }, indent=2) + "\n")
+    print(f"\nWrote {out}")
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_seconds: float) -> list[str]:
+    """Human-readable regressions of current against baseline."""
+    regressions = []
+    for name, scales in current["results"].items():
+        for scale, result in scales.items():
+            base = baseline["results"].get(name, {}).get(scale)
+            if not base or "seconds" not in base or "seconds" not in result:
+                continue
+            delta = result["seconds"] - base["seconds"]
+            if delta > min_seconds and result["seconds"] > base["seconds"] * (1 + threshold):
+                regressions.append(f"{name} {scale}x: {base['seconds']:.4f} s -> {result['seconds']:.4f} s "
+                                   f"(+{delta / base['seconds']:.0%})")
+    return regressions
+
+
+def cmd_compare(args) -> None:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline.get("machine") != current.get("machine") or baseline.get("python") != current.get("python"):
+        print(f"Note: baseline from {baseline.get('machine')}/Python {baseline.get('python')}, "
+              f"current from {current.get('machine')}/Python {current.get('python')}")
+    for name, scales in current["results"].items():
+        for scale, result in scales.items():
+            base = baseline["results"].get(name, {}).get(scale, {})
+            if "seconds" in result and "seconds" in base:
+                print(f"{name:22s} {scale:>4}x  {base['seconds']:9.4f} s -> {result['seconds']:9.4f} s  "
+                      f"({result['seconds'] / max(base['seconds'], 1e-9):5.2f}x)")
+    regressions = compare(baseline, current, args.threshold, args.min_seconds)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Time every stage and write JSON results.")
+    run.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    run.add_argument("--only", action="append", choices=list(STAGES), help="Stage to run (repeatable).")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per stage/scale; the fastest is kept.")
+    run.add_argument("--out", default=str(DEFAULT_OUT))
+    run.set_defaults(func=cmd_run)
+
+    cmp = sub.add_parser("compare", help="Flag stages slower than a baseline.")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown.")
+    cmp.add_argument("--min-seconds", type=float, default=0.01, help="Ignore slowdowns smaller than this.")
+    cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Precompute the map's point clusters for every category layer.
+
+public/js/map.js adds one GeoJSON source per category with `cluster: true`,
+so MapLibre re-clusters every point set on the phone whenever data loads.
+This builds the same zoom-indexed hierarchy ahead of time (see
+buildlib/clusters.py), with each category's clusterRadius and clusterMaxZoom
+from CATEGORY_CONFIG in public/js/config.js. Writes clusters.json next to the
+trail's water.json:
+
+    {"tileSize": 512, "minPoints": 2,
+     "categories": {"water-reliable": {"source": "water.json", "clusterRadius": 35, "clusterMaxZoom": 14,
+                                       "points": 117, "record": [...],
+                                       "lon": [...], "lat": [...], "count": [...],
+                                       "minZoom": [...], "maxZoom": [...], "children": [[...], ...]}}}
+
+Node i < points is the source file's record record[i]; clusters follow, with
+children[i - points] listing their child node ids. Water is split with the
+app's default reliability (subcategory "reliable", or the trail's default
+reliable ratings where it has them); a hiker who changes that setting
+needs runtime clustering for the two water layers.
+
+Run:
+    python3 scripts/build-clusters.py --trail odt|nnml
+"""
+
+import argparse
+import json
+import re
+import time
+
+from buildlib import trail_public_dir
+from buildlib.clusters import MIN_POINTS, TILE_SIZE, cluster_hierarchy, visible
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.trace import add_trace_arguments, enable_from_args, span
+
+CLUSTERS_FILE = "clusters.json"
+# category -> (source file, clusterMaxZoom, clusterRadius); keep in step with
+# CATEGORY_CONFIG in public/js/config.js.
+CATEGORIES = {
+    "water-reliable": ("water.json", 14, 35),
+    "water-other": ("water.json", 14, 35),
+    "towns": ("towns.json", 12, 40),
+    "navigation": ("navigation.json", 14, 30),
+    "toilets": ("toilets.json", 14, 35),
+}
+# Trails with a waterReliability config in public/js/config.js: the ratings
+# counted as reliable until the hiker changes them.
+DEFAULT_RELIABLE_RATINGS = {"nnml": {"w3"}}
+RATING_PATTERN = re.compile(r"\bW\s*([0-3])(?:\s*-\s*[0-3])?\b", re.IGNORECASE)
+
+
+def water_rating(source: dict) -> str | None:
+    """utils.js getWaterRating: explicit waterRating, else a W0-W3 mention in the text."""
+    explicit = re.fullmatch(r"w([0-3])", str(source.get("waterRating") or "").strip().lower())
+    if explicit:
+        return f"w{explicit.group(1)}"
+    text = " ".join(str(source[k]) for k in ("landmark", "name", "details") if source.get(k))
+    match = RATING_PATTERN.search(text)
+    return f"w{match.group(1)}" if match else None
+
+
+def is_reliable(trail: str, source: dict) -> bool:
+    ratings = DEFAULT_RELIABLE_RATINGS.get(trail)
+    if ratings is None:
+        return source.get("subcategory") == "reliable"
+    return water_rating(source) in ratings
+
+
+def category_records(trail: str, category: str, items: list[dict]) -> list[int]:
+    """Indexes into the source file of the category's mappable records."""
+    keep = []
+    for i, item in enumerate(items):
+        if item.get("lat") is None or item.get("lon") is None:
+            continue
+        if category.startswith("water-") and is_reliable(trail, item) != (category == "water-reliable"):
+            continue
+        keep.append(i)
+    return keep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    print(f"Trail: {args.trail}")
+    categories = {}
+    start = time.perf_counter()
+    for category, (filename, max_zoom, radius) in CATEGORIES.items():
+        path = data_dir / filename
+        if not path.exists():
+            continue
+        with open(path) as f:
+            items = json.load(f)
+        records = category_records(args.trail, category, items)
+        with span("cluster", category=category, points=len(records)):
+            hierarchy = cluster_hierarchy([(items[i]["lon"], items[i]["lat"]) for i in records], radius, max_zoom)
+        categories[category] = {"source": filename, "clusterRadius": radius, "clusterMaxZoom": max_zoom,
+                                "points": hierarchy.pop("points"), "record": records, **hierarchy}
+        drawn = [len(visible(hierarchy, z)) for z in (0, 6, 9, 12, max_zoom)]
+        print(f"  {category:<15} {len(records):>4} points -> {len(hierarchy['children']):>4} clusters; "
+              f"drawn at z0/6/9/12/{max_zoom}: {'/'.join(map(str, drawn))}")
+    elapsed = time.perf_counter() - start
+
+    out = {"tileSize": TILE_SIZE, "minPoints": MIN_POINTS, "categories": categories}
+    out_path = data_dir / CLUSTERS_FILE
+    publish({out_path: json.dumps(out, separators=(",", ":")) + "\n"}, args.allow_size_change)
+    print(f"✓ {out_path} ({out_path.stat().st_size / 1024:.1f} KB) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -115,6 +115,16 @@ download_dem_chunked() {
   rm -rf "$tmp_dir"
 }
 
+# With DEM_TILES_DIR set, assemble the DEM offline from local tiles, clipped to
+# the contour buffer, instead of downloading the whole bbox.
+if [ ! -f "$DEM_FILE" ] && [ -n "$DEM_TILES_DIR" ]; then
+  echo "Assembling corridor DEM from local tiles in $DEM_TILES_DIR..."
+  [ -f "$NARROW_BUFFER_FILE" ] || node "$PROJECT_ROOT/scripts/create-narrow-buffer.js" --trail "$TRAIL"
+  python3 "$PROJECT_ROOT/scripts/build-corridor-dem.py" --trail "$TRAIL" --tiles "$DEM_TILES_DIR" \
+    --corridor "$NARROW_BUFFER_FILE" --out "$DEM_FILE" || exit 1
+  echo ""
+fi
+
 if [ ! -f "$DEM_FILE" ]; then
   echo "Downloading SRTM elevation data from OpenTopography..."
   echo "This may take a few minutes..."
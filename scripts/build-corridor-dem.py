@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Assemble a trail's corridor DEM from a directory of local DEM tiles, offline.
+
+Reads build/<trail>/corridor.geojson (or --corridor) and every GeoTIFF/HGT
+tile in --tiles, and writes data/corridor_dem.tif (data/<trail>_corridor_dem.tif
+for other trails), the file build-elevation-profile.py and build-contours.sh
+expect:
+
+- the output grid is the tiles' own grid (no resampling), cropped to the
+  corridor's bounding box
+- the grid is cut into --block windows; windows that miss the corridor are
+  never read, the rest are read from only the tiles that overlap them, in a
+  thread pool (each thread keeps its own dataset handles), with at most
+  --workers x 2 windows in flight
+- pixels outside the corridor are set to nodata, so the file compresses to a
+  fraction of the bbox DEM
+- the GeoTIFF is tiled (256x256), DEFLATE-compressed with a predictor and has
+  average-resampled overviews, so windowed sampling and gdal_contour read less
+
+Tiles must be WGS84 (EPSG:4326) and share one pixel size and grid alignment,
+as SRTM/3DEP 1x1 degree tiles do; otherwise merge them with gdalwarp first.
+Tiles of different numeric dtypes are written in the dtype they all widen to.
+Needs rasterio and numpy.
+
+Run:
+    python3 scripts/build-corridor-dem.py --trail odt --tiles ~/dem/srtm [--corridor build/narrow_buffer.geojson] [--workers 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from buildlib import corridor_dem_path, trail_build_dir
+from buildlib.trace import add_trace_arguments, enable_from_args, span, traced
+
+TILE_PATTERNS = ["*.tif", "*.tiff", "*.hgt"]
+BLOCK_PIXELS = 1024  # read/write window; a multiple of the 256 px GeoTIFF tile
+OVERVIEW_FACTORS = [2, 4, 8, 16, 32]
+GRID_TOLERANCE = 0.01  # fraction of a pixel a tile origin may be off the grid
+DEFAULT_NODATA = {"int16": -32768, "uint16": 0, "float32": -9999.0, "float64": -9999.0}
+
+
+class Tile(NamedTuple):
+    path: Path
+    col: int  # offset of the tile's first pixel in the output grid
+    row: int
+    width: int
+    height: int
+    nodata: float | None
+
+
+def corridor_geometries(path):
+    """(GeoJSON geometries, (west, south, east, north)) of a polygon file."""
+    features = json.loads(Path(path).read_text())["features"]
+    geometries = [f["geometry"] for f in features if f["geometry"]["type"] in ("Polygon", "MultiPolygon")]
+    if not geometries:
+        raise SystemExit(f"No polygons in {path}")
+    lons, lats = [], []
+    for geometry in geometries:
+        polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+        for polygon in polygons:
+            for ring in polygon:
+                for lon, lat, *_ in ring:
+                    lons.append(lon)
+                    lats.append(lat)
+    return geometries, (min(lons), min(lats), max(lons), max(lats))
+
+
+@traced("scan tiles")
+def scan_tiles(tile_dir, bbox):
+    """Grid (transform parameters, dtype, nodata) and the tiles overlapping bbox.
+
+    The grid's dtype is the one every overlapping tile's dtype casts to
+    without loss (numpy's result_type), so mixing e.g. int16 SRTM with
+    float32 3DEP tiles widens the output instead of truncating values.
+    """
+    import numpy as np
+    import rasterio
+
+    paths = sorted(p for pattern in TILE_PATTERNS for p in Path(tile_dir).glob(pattern))
+    if not paths:
+        raise SystemExit(f"No DEM tiles ({', '.join(TILE_PATTERNS)}) in {tile_dir}")
+    west, south, east, north = bbox
+    grid = None
+    overlapping = []
+    dtypes = set()
+    for path in paths:
+        with rasterio.open(path) as ds:
+            if ds.crs is None or ds.crs.to_epsg() != 4326:
+                raise SystemExit(f"{path.name}: CRS {ds.crs} is not EPSG:4326; reproject with gdalwarp first")
+            left, bottom, right, top = ds.bounds
+            if right <= west or left >= east or top <= south or bottom >= north:
+                continue
+            if grid is None:
+                grid = {"xres": ds.res[0], "yres": ds.res[1], "left": left, "top": top,
+                        "dtype": ds.dtypes[0], "nodata": ds.nodata}
+            elif not (math.isclose(ds.res[0], grid["xres"], rel_tol=1e-6)
+                      and math.isclose(ds.res[1], grid["yres"], rel_tol=1e-6)):
+                raise SystemExit(f"{path.name}: pixel size {ds.res} differs from {grid['xres'], grid['yres']}")
+            if np.dtype(ds.dtypes[0]).kind not in "iuf":
+                raise SystemExit(f"{path.name}: unsupported DEM dtype {ds.dtypes[0]}")
+            overlapping.append((path, left, top, ds.width, ds.height, ds.nodata))
+            dtypes.add(ds.dtypes[0])
+    if grid is None:
+        raise SystemExit(f"No tile in {tile_dir} overlaps the corridor bbox {bbox}")
+    if len(dtypes) > 1:
+        widened = np.result_type(*sorted(dtypes)).name
+        print(f"  Tiles mix {', '.join(sorted(dtypes))}; writing {widened}")
+        if widened != grid["dtype"]:
+            grid["dtype"] = widened
+            if grid["nodata"] is not None and not np.can_cast(np.min_scalar_type(grid["nodata"]), widened):
+                grid["nodata"] = None
+    return grid, overlapping
+
+
+def output_grid(grid, bbox):
+    """(west, north, width, height) of the tile grid cropped to bbox."""
+    west, south, east, north = bbox
+    xres, yres = grid["xres"], grid["yres"]
+    out_west = grid["left"] + math.floor((west - grid["left"]) / xres) * xres
+    out_north = grid["top"] - math.floor((grid["top"] - north) / yres) * yres
+    width = math.ceil((east - out_west) / xres)
+    height = math.ceil((out_north - south) / yres)
+    return out_west, out_north, width, height
+
+
+def place_tiles(overlapping, grid, out_west, out_north):
+    tiles = []
+    for path, left, top, width, height, nodata in overlapping:
+        col = (left - out_west) / grid["xres"]
+        row = (out_north - top) / grid["yres"]
+        if abs(col - round(col)) > GRID_TOLERANCE or abs(row - round(row)) > GRID_TOLERANCE:
+            raise SystemExit(f"{path.name} is not aligned with the other tiles' grid; merge with gdalwarp first")
+        tiles.append(Tile(path, round(col), round(row), width, height, nodata))
+    return tiles
+
+
+class BlockReader:
+    """Reads one output window: corridor mask, then the overlapping tile windows."""
+
+    def __init__(self, tiles, geometries, transform, dtype, nodata):
+        self.tiles = tiles
+        self.geometries = geometries
+        self.transform = transform
+        self.dtype = dtype
+        self.nodata = nodata
+        self.local = threading.local()
+        self.handles = []
+        self.lock = threading.Lock()
+
+    def dataset(self, path):
+        import rasterio
+
+        # Dataset handles are not thread-safe; each worker opens its own.
+        cache = getattr(self.local, "datasets", None)
+        if cache is None:
+            cache = self.local.datasets = {}
+        if path not in cache:
+            cache[path] = rasterio.open(path)
+            with self.lock:
+                self.handles.append(cache[path])
+        return cache[path]
+
+    def close(self):
+        for ds in self.handles:
+            ds.close()
+
+    def __call__(self, window):
+        import numpy as np
+        from rasterio.features import geometry_mask
+        from rasterio.windows import Window
+        from rasterio.windows import transform as window_transform
+
+        shape = (window.height, window.width)
+        inside = geometry_mask(self.geometries, shape, window_transform(window, self.transform), invert=True)
+        if not inside.any():
+            return window, None, 0
+        block = np.full(shape, self.nodata, dtype=self.dtype)
+        for tile in self.tiles:
+            c0, c1 = max(window.col_off, tile.col), min(window.col_off + window.width, tile.col + tile.width)
+            r0, r1 = max(window.row_off, tile.row), min(window.row_off + window.height, tile.row + tile.height)
+            if c0 >= c1 or r0 >= r1:
+                continue
+            data = self.dataset(tile.path).read(1, window=Window(c0 - tile.col, r0 - tile.row, c1 - c0, r1 - r0))
+            valid = data != tile.nodata if tile.nodata is not None else np.ones(data.shape, dtype=bool)
+            target = block[r0 - window.row_off:r1 - window.row_off, c0 - window.col_off:c1 - window.col_off]
+            # Neighbouring tiles share their edge row/column; never let one
+            # tile's nodata overwrite another's value.
+            target[valid] = data[valid]
+        block[~inside] = self.nodata
+        return window, block, int(inside.sum())
+
+
+def bounded_map(pool, fn, items, limit):
+    """pool.map(fn, items) in order, but with at most `limit` calls in flight.
+
+    Executor.map submits every item up front, so finished blocks pile up in
+    memory whenever the writer falls behind the readers.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def windows_for(width, height, block):
+    from rasterio.windows import Window
+
+    for row in range(0, height, block):
+        for col in range(0, width, block):
+            yield Window(col, row, min(block, width - col), min(block, height - row))
+
+
+@traced("build overviews")
+def build_overviews(path):
+    import rasterio
+    from rasterio.enums import Resampling
+
+    with rasterio.open(path, "r+") as ds:
+        ds.build_overviews(OVERVIEW_FACTORS, Resampling.average)
+        ds.update_tags(ns="rio_overview", resampling="average")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--tiles", required=True, help="Directory of DEM tiles (GeoTIFF or SRTM .hgt).")
+    parser.add_argument("--corridor", default=None,
+                        help="Polygon GeoJSON to clip to. Defaults to build/<trail>/corridor.geojson.")
+    parser.add_argument("--out", default=None, help="Override output GeoTIFF path.")
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1))
+    parser.add_argument("--block", type=int, default=BLOCK_PIXELS, help="Window size in pixels.")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    import rasterio
+    from rasterio.transform import from_origin
+
+    corridor_path = Path(args.corridor or trail_build_dir(args.trail) / "corridor.geojson")
+    out_path = Path(args.out or corridor_dem_path(args.trail))
+    if not corridor_path.exists():
+        sys.exit(f"Missing corridor: {corridor_path}")
+
+    start = time.perf_counter()
+    geometries, bbox = corridor_geometries(corridor_path)
+    grid, overlapping = scan_tiles(args.tiles, bbox)
+    out_west, out_north, width, height = output_grid(grid, bbox)
+    tiles = place_tiles(overlapping, grid, out_west, out_north)
+    transform = from_origin(out_west, out_north, grid["xres"], grid["yres"])
+    dtype = grid["dtype"]
+    nodata = grid["nodata"] if grid["nodata"] is not None else DEFAULT_NODATA.get(dtype, -9999)
+
+    print(f"Trail:    {args.trail}")
+    print(f"Corridor: {corridor_path}")
+    print(f"Tiles:    {len(tiles)} overlapping the corridor bbox")
+    print(f"Grid:     {width} x {height} px at {grid['xres']:.6g} deg, {dtype}, nodata {nodata}")
+    print(f"Out:      {out_path}")
+
+    profile = {
+        "driver": "GTiff", "width": width, "height": height, "count": 1, "dtype": dtype,
+        "crs": "EPSG:4326", "transform": transform, "nodata": nodata,
+        "tiled": True, "blockxsize": 256, "blockysize": 256,
+        "compress": "deflate", "predictor": 3 if dtype.startswith("float") else 2,
+        "BIGTIFF": "IF_SAFER",
+    }
+    reader = BlockReader(tiles, geometries, transform, dtype, nodata)
+    windows = list(windows_for(width, height, args.block))
+    read = inside_px = 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with span("read + write windows", windows=len(windows)), rasterio.open(out_path, "w", **profile) as dst, \
+                ThreadPoolExecutor(max_workers=args.workers) as pool:
+            # Reads (and the GIL-free GDAL decoding) run in the pool; the
+            # output dataset is only written from this thread, and at most
+            # workers * 2 blocks are held in memory at once.
+            for window, block, count in bounded_map(pool, reader, windows, args.workers * 2):
+                if block is None:
+                    continue
+                dst.write(block, 1, window=window)
+                read += 1
+                inside_px += count
+    finally:
+        reader.close()
+    build_overviews(out_path)
+
+    size_mb = out_path.stat().st_size / (1024 * 1024)
+    print(f"\n✓ {out_path} ({size_mb:.1f} MB) in {time.perf_counter() - start:.1f} s")
+    print(f"  Read {read} of {len(windows)} windows; {inside_px / (width * height):.0%} of the bbox is corridor")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Build the normalized data bundle for a trail, or verify it round-trips.
+
+Reads waypoints.json and the category files for the trail and writes
+data-bundle.json next to them: a shared columnar record table plus per-file ID
+lists and file-specific columns (see buildlib/bundle.py). The bundle is always
+expanded and compared with the published files, field order included, before
+it is written; `--check` stops after that comparison.
+
+Run:
+    python3 scripts/build-data-bundle.py --trail odt|nnml [--check] [--expand OUT_DIR]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from buildlib import trail_public_dir
+from buildlib.bundle import build_bundle, expand
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", default="odt", help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--check", action="store_true",
+                        help="Verify the bundle reproduces the published files without writing it.")
+    parser.add_argument("--expand", default=None, metavar="OUT_DIR",
+                        help="Expand the existing data-bundle.json into OUT_DIR.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    bundle_path = data_dir / "data-bundle.json"
+
+    if args.expand:
+        bundle = json.loads(bundle_path.read_text())
+        out_dir = Path(args.expand)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for filename, items in expand(bundle).items():
+            (out_dir / filename).write_text(json.dumps(items, indent=2) + "\n")
+            print(f"{out_dir / filename}: {len(items)} entries")
+        return
+
+    bundle = build_bundle(data_dir)
+    encoded = json.dumps(bundle, separators=(",", ":"))
+    original_kb = sum((data_dir / f).stat().st_size for f in bundle["files"]) / 1024
+    print(f"{len(bundle['records']['name'])} shared records across {len(bundle['files'])} files; "
+          f"bundle {len(encoded) / 1024:.0f} KB vs {original_kb:.0f} KB of files")
+    if args.check:
+        print("Round trip OK")
+        return
+
+    publish({bundle_path: encoded + "\n"}, args.allow_size_change)
+    print(f"Wrote {bundle_path}")
+
+
+if __name__ == "__main__":
+    main()
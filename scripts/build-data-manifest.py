@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Rebuild public/data-manifest.json from every published data asset.
+
+The individual build scripts keep the manifest current for the files they
+write; run this after hand edits, or with --check to verify the committed
+manifest matches the tree (exits non-zero on any mismatch).
+
+Run:
+    python3 scripts/build-data-manifest.py [--check] [--max-size-change 0.5]
+"""
+
+import argparse
+
+from buildlib.manifest import (
+    MAX_SIZE_CHANGE,
+    build_manifest,
+    diff_manifests,
+    load_manifest,
+    size_violations,
+    write_manifest,
+)
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true",
+                        help="Compare against the existing manifest without writing it.")
+    parser.add_argument("--max-size-change", type=float, default=MAX_SIZE_CHANGE,
+                        help="Fail if a changed asset's size moves by more than this fraction.")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    old = load_manifest()
+    new = build_manifest()
+    changes = diff_manifests(old, new)
+
+    for kind in ("added", "removed", "changed"):
+        for key in changes[kind]:
+            print(f"  {kind:<8} {key}")
+    print(f"{len(new['assets'])} assets, "
+          f"{sum(e['bytes'] for e in new['assets'].values()) / 1024:.0f} KB total")
+
+    problems = size_violations(old, new, args.max_size_change)
+    if problems:
+        raise SystemExit("Unexpected output size change:\n  " + "\n  ".join(problems))
+
+    if args.check:
+        if any(changes.values()):
+            raise SystemExit("data-manifest.json is out of date")
+        print("data-manifest.json is up to date")
+        return
+
+    write_manifest(new)
+    print("Wrote public/data-manifest.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Build delta patches between two releases of the category data files.
+
+Offline clients that already hold a release only need the records that
+changed. `diff` compares each data file against a previous release (a git ref,
+HEAD by default, or a directory laid out like public/) and writes one patch per
+changed file. Every patch is applied back to the old release and compared with
+the new one before it is written, so a patch that does not round-trip exactly
+fails the build. `apply` applies a patch file to a data file, refusing one
+whose recorded base (record count and SHA-256) is not that file, and writes
+the result in the data file's own layout only if it hashes to the patch's
+target SHA-256.
+
+Run:
+    python3 scripts/build-data-patch.py diff [--base-ref v1.2 | --base-dir old/public] [--out build/patches]
+    python3 scripts/build-data-patch.py apply water.json build/patches/water.json.patch.json [--out new.json]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from buildlib import PUBLIC_DIR, ROOT
+from buildlib.datapatch import apply_patch, check_target, dump_like, is_empty, make_patch, release_info, same_value
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+DATA_FILES = [
+    "waypoints.json",
+    "water.json",
+    "navigation.json",
+    "towns.json",
+    "toilets.json",
+    "trails/nnml/waypoints.json",
+    "trails/nnml/water.json",
+    "trails/nnml/navigation.json",
+    "trails/nnml/towns.json",
+    "trails/nnml/toilets.json",
+]
+
+
+def read_base(rel, base_ref, base_dir):
+    """Raw bytes of `rel` in the previous release, or None if it did not exist."""
+    if base_dir:
+        path = Path(base_dir) / rel
+        return path.read_bytes() if path.exists() else None
+    result = subprocess.run(
+        ["git", "show", f"{base_ref}:public/{rel}"],
+        cwd=ROOT, capture_output=True,
+    )
+    return result.stdout if result.returncode == 0 else None
+
+
+def diff(args):
+    out_dir = Path(args.out)
+    total_bytes = 0
+    total_patch_bytes = 0
+    for rel in DATA_FILES:
+        new_path = PUBLIC_DIR / rel
+        if not new_path.exists():
+            continue
+        old_raw = read_base(rel, args.base_ref, args.base_dir)
+        if old_raw is None:
+            print(f"{rel}: not in base release, skipping")
+            continue
+        new_raw = new_path.read_bytes()
+        old_records = json.loads(old_raw)
+        new_records = json.loads(new_raw)
+
+        patch = make_patch(
+            old_records, new_records,
+            base=release_info(old_raw, old_records),
+            target=release_info(new_raw, new_records),
+        )
+        if is_empty(patch):
+            print(f"{rel}: unchanged")
+            continue
+        patched = apply_patch(old_records, patch, old_raw)
+        if not same_value(patched, new_records):
+            sys.exit(f"{rel}: patch does not round-trip to the new release")
+        try:
+            check_target(dump_like(old_raw, patched), patch)
+        except ValueError as exc:
+            sys.exit(f"{rel}: {exc}; the base and new files are laid out differently")
+
+        out_path = out_dir / f"{rel}.patch.json"
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        encoded = json.dumps(patch, separators=(",", ":"))
+        out_path.write_text(encoded + "\n")
+        total_bytes += len(new_raw)
+        total_patch_bytes += len(encoded)
+        print(
+            f"{rel}: +{len(patch['added'])} -{len(patch['removed'])} "
+            f"~{len(patch['changed'])}  {len(encoded) / 1024:.1f} KB "
+            f"(full file {len(new_raw) / 1024:.1f} KB)"
+        )
+
+    if total_bytes:
+        print(f"\nPatches: {total_patch_bytes / 1024:.1f} KB vs "
+              f"{total_bytes / 1024:.1f} KB of full files -> {out_dir}")
+
+
+def apply(args):
+    raw = Path(args.data).read_bytes()
+    records = json.loads(raw)
+    patch = json.loads(Path(args.patch).read_text())
+    try:
+        result = apply_patch(records, patch, raw)
+        encoded = dump_like(raw, result)
+        check_target(encoded, patch)
+    except ValueError as exc:
+        sys.exit(f"{args.data}: {exc}")
+    out_path = Path(args.out or args.data)
+    out_path.write_bytes(encoded)
+    print(f"{out_path}: {len(records)} -> {len(result)} records")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_diff = sub.add_parser("diff", help="Write patches from a base release to the working tree.")
+    p_diff.add_argument("--base-ref", default="HEAD", help="Git ref of the previous release.")
+    p_diff.add_argument("--base-dir", default=None,
+                        help="Directory laid out like public/ holding the previous release.")
+    p_diff.add_argument("--out", default=str(ROOT / "build" / "patches"))
+    p_diff.set_defaults(func=diff)
+
+    p_apply = sub.add_parser("apply", help="Apply a patch file to a data file.")
+    p_apply.add_argument("data")
+    p_apply.add_argument("patch")
+    p_apply.add_argument("--out", default=None, help="Output path (defaults to rewriting data).")
+    p_apply.set_defaults(func=apply)
+
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ Sample format mirrors the ODT one:
     [{ "lon": -106.0, "lat": 35.7, "distance": 0.0, "elevation": 6985 }, ...]
 - `distance` is cumulative miles from the start of the route
 - `elevation` is feet (float meters → int feet via *3.28084)
+- `grade` is the smoothed percent grade (buildlib/grades.py); the steep
+  climbs/descents per section go to steep-segments.json next to the profile
+- hiking-times.json beside it holds cumulative NOBO/SOBO hours aligned with
+  the samples (buildlib/pace.py, --pace-model tobler|naismith)
 
 Run:
     python3 scripts/build-elevation-profile.py --trail nnml
@@ -22,7 +26,12 @@ import os
 import sys
 from pathlib import Path
 
-import rasterio
+from buildlib import corridor_dem_path
+from buildlib.grades import GRADE_WINDOW_MILES, GRADES_FILE, STEEP_GRADE_PCT, grade_profile
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.pace import DEFAULT_PACE_MODEL, PACE_MODELS, TIMES_FILE, hiking_times
+from buildlib.routestore import open_store
+from buildlib.trace import add_trace_arguments, enable_from_args, span, traced
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
@@ -31,81 +40,51 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 # distance-from-trail perpendicular projection still works fine.
 TARGET_SPACING_METERS = 25.0
 
-EARTH_RADIUS_M = 6_371_008.8
 METERS_TO_MILES = 1.0 / 1609.344
 METERS_TO_FEET = 3.28084
 
 
-def haversine_m(lon1, lat1, lon2, lat2):
-    """Great-circle distance between two WGS84 points, in meters."""
-    rlat1, rlat2 = math.radians(lat1), math.radians(lat2)
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon / 2) ** 2
-    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+@traced("load route")
+def load_route(geojson_path):
+    """Memory-map the main route's columns (buildlib.routestore).
 
-
-def walk_route(coordinates):
-    """Yield (lon, lat, cumulative_meters) for every input vertex."""
-    cum = 0.0
-    prev = None
-    for lon, lat in coordinates:
-        if prev is not None:
-            cum += haversine_m(prev[0], prev[1], lon, lat)
-        prev = (lon, lat)
-        yield lon, lat, cum
-
-
-def densify_or_subsample(vertices):
-    """Walk input vertices, emit points roughly every TARGET_SPACING_METERS.
-
-    We don't insert new points between vertices (the route is already dense
-    enough that this just thins it). We always keep the first vertex and the
-    last vertex of each segment.
+    The route_line.geojson written by parse-nnml-gpx.js / parse-kml-tracks.js
+    holds one Feature, a LineString or a MultiLineString whose segments are in
+    through-hike order (s1, s2, ...). The store keeps its vertices in that
+    order with cumulative meters along them, so nothing is re-parsed once the
+    store exists.
     """
-    last_emitted_m = -math.inf
-    last_vertex = None
-    for lon, lat, cum in vertices:
-        last_vertex = (lon, lat, cum)
-        if cum - last_emitted_m >= TARGET_SPACING_METERS:
-            yield lon, lat, cum
-            last_emitted_m = cum
-    if last_vertex is not None and last_vertex[2] - last_emitted_m > 0:
-        # Always emit the terminal vertex.
-        yield last_vertex
+    route = open_store(geojson_path)
+    if not len(route):
+        raise SystemExit(f"No route vertices in {geojson_path}")
+    return route
 
 
-def load_main_route_coords(geojson_path):
-    """Return a flat list of (lon, lat) along the main route, in order.
+def subsample(meters, spacing):
+    """Indices of vertices at least `spacing` meters apart, plus the terminal vertex.
 
-    The route_line.geojson written by parse-nnml-gpx.js / parse-kml-tracks.js
-    contains a single Feature whose geometry is either LineString or
-    MultiLineString. For MultiLineString we concatenate segments in the order
-    they appear (sections are emitted s1, s2, ... so this is the through-hike
-    order).
+    We don't insert new points between vertices (the route is already dense
+    enough that this just thins it).
     """
-    with open(geojson_path) as f:
-        gj = json.load(f)
-    feats = gj.get("features") or []
-    if not feats:
-        raise SystemExit(f"No features in {geojson_path}")
-    geom = feats[0]["geometry"]
-    if geom["type"] == "LineString":
-        return [tuple(pt) for pt in geom["coordinates"]]
-    if geom["type"] == "MultiLineString":
-        out = []
-        for seg in geom["coordinates"]:
-            for pt in seg:
-                out.append(tuple(pt))
-        return out
-    raise SystemExit(f"Unexpected geometry type: {geom['type']}")
+    keep = []
+    last_emit = -math.inf
+    for i, cum in enumerate(meters):
+        if cum - last_emit >= spacing:
+            keep.append(i)
+            last_emit = cum
+    if keep and meters[-1] - last_emit > 0:
+        keep.append(len(meters) - 1)
+    return keep
 
 
+@traced("sample dem")
 def sample_dem(dem_path, points):
     """Sample DEM elevations (meters) at WGS84 (lon, lat) points.
 
     rasterio.sample is vectorized — pass all coords in one call.
     """
+    import rasterio  # heavy; imported only when sampling
+
     with rasterio.open(dem_path) as ds:
         nodata = ds.nodata
         # rasterio.sample expects (x, y) iterable
@@ -119,6 +98,7 @@ def sample_dem(dem_path, points):
     return elevations_m
 
 
+@traced("fill nans")
 def fill_nans(values):
     """Linear-interpolate any NaN holes so the output is consumable as numbers."""
     n = len(values)
@@ -157,15 +137,21 @@ def main():
         help="Override output JSON path."
     )
     parser.add_argument("--spacing", type=float, default=TARGET_SPACING_METERS)
+    parser.add_argument("--grade-window", type=float, default=GRADE_WINDOW_MILES,
+                        help="Window (miles) the per-sample grade is averaged over.")
+    parser.add_argument("--steep-grade", type=float, default=STEEP_GRADE_PCT,
+                        help="Percent grade at which a run counts as a steep segment.")
+    parser.add_argument("--pace-model", choices=PACE_MODELS, default=DEFAULT_PACE_MODEL,
+                        help="Model for the cumulative hiking-time arrays.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
     args = parser.parse_args()
+    enable_from_args(args)
 
     trail = args.trail
     build_dir = PROJECT_ROOT / "build" / trail if trail != "odt" else PROJECT_ROOT / "build"
     route_path = build_dir / "route_line.geojson"
-    dem_path = Path(
-        args.dem
-        or (PROJECT_ROOT / "data" / ("corridor_dem.tif" if trail == "odt" else f"{trail}_corridor_dem.tif"))
-    )
+    dem_path = Path(args.dem or corridor_dem_path(trail))
     if trail == "odt":
         out_path = Path(args.out or (PROJECT_ROOT / "public" / "elevation-profile.json"))
     else:
@@ -174,7 +160,8 @@ def main():
     if not route_path.exists():
         sys.exit(f"Missing route_line: {route_path}")
     if not dem_path.exists():
-        sys.exit(f"Missing DEM: {dem_path}")
+        sys.exit(f"Missing DEM: {dem_path} (build it from local tiles with "
+                 f"scripts/build-corridor-dem.py --trail {trail} --tiles DIR)")
 
     print(f"Trail: {trail}")
     print(f"Route: {route_path}")
@@ -183,23 +170,17 @@ def main():
     print(f"Subsample spacing: {args.spacing} m")
     print()
 
-    print("1) Loading main-route vertices...")
-    coords = load_main_route_coords(route_path)
-    print(f"   {len(coords)} vertices in main route")
+    print("1) Opening main-route store...")
+    route = load_route(route_path)
+    print(f"   {len(route)} vertices in main route")
 
-    print("\n2) Walking + subsampling...")
-    walked = list(walk_route(coords))
-    samples = []
-    last_emit = -math.inf
-    for lon, lat, cum in walked:
-        if cum - last_emit >= args.spacing:
-            samples.append((lon, lat, cum))
-            last_emit = cum
-    # Always include terminal vertex
-    if walked and walked[-1][2] - last_emit > 0:
-        samples.append(walked[-1])
-    print(f"   Kept {len(samples)} of {len(walked)} vertices")
-    print(f"   Total length: {walked[-1][2] * METERS_TO_MILES:.2f} mi")
+    print("\n2) Subsampling...")
+    with span("subsample"):
+        meters = route.meters.tolist()
+        keep = subsample(meters, args.spacing)
+        samples = list(zip(route.lon[keep].tolist(), route.lat[keep].tolist(), route.meters[keep].tolist()))
+    print(f"   Kept {len(samples)} of {len(route)} vertices")
+    print(f"   Total length: {meters[-1] * METERS_TO_MILES:.2f} mi")
 
     print("\n3) Sampling DEM...")
     elevations_m = sample_dem(dem_path, [(p[0], p[1]) for p in samples])
@@ -218,13 +199,30 @@ def main():
             "elevation": int(round(ele_m * METERS_TO_FEET)),
         })
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w") as f:
+    with span("grades + times"):
+        steep = grade_profile(trail, out, args.grade_window, args.steep_grade)
+        times = hiking_times(out, args.pace_model)
+    steep_path = out_path.parent / GRADES_FILE
+    times_path = out_path.parent / TIMES_FILE
+
+    outputs = {
         # Mirror ODT compact one-record-per-line-ish formatting (single line is fine; the file is small)
-        json.dump(out, f, separators=(",", ":"))
+        out_path: json.dumps(out, separators=(",", ":")),
+        steep_path: json.dumps(steep, separators=(",", ":")) + "\n",
+        times_path: json.dumps(times, separators=(",", ":")) + "\n",
+    }
+    with span("write json"):
+        if args.out is None:
+            publish(outputs, args.allow_size_change)
+        else:
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            for path, text in outputs.items():
+                path.write_text(text)
 
     size_kb = out_path.stat().st_size / 1024
     print(f"\n✓ {out_path} ({size_kb:.1f} KB, {len(out)} samples)")
+    print(f"✓ {steep_path} ({sum(len(s['climbs']) for s in steep['sections'])} steep climbs)")
+    print(f"✓ {times_path} ({args.pace_model}: {times['hours'][-1]} h NOBO, {times['hoursSobo'][-1]} h SOBO)")
     print(f"  First: {out[0]}")
     print(f"  Last:  {out[-1]}")
 
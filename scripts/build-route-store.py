@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Convert a trail's route_line.geojson and alternates.geojson to the columnar
+route store (.npy columns + JSON sidecar under build/<trail>/route-store/; see
+buildlib/routestore.py).
+
+Consumers build a missing or stale store on first use, so this is only needed
+to prebuild it (e.g. right after the JS route scripts) or to force a rebuild.
+
+Run:
+    python3 scripts/build-route-store.py [--trail odt] [--trail nnml] [--force]
+"""
+
+import argparse
+
+from buildlib import trail_build_dir
+from buildlib.geo import METERS_PER_MILE
+from buildlib.routestore import RouteStore, build_store, is_current
+from buildlib.trace import add_trace_arguments, enable_from_args, span
+
+TRAILS = ["odt", "nnml"]
+SOURCES = ["route_line.geojson", "alternates.geojson"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", action="append", choices=TRAILS, help="Trail to convert (repeatable; default all).")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the store is current.")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    for trail in args.trail or TRAILS:
+        for name in SOURCES:
+            path = trail_build_dir(trail) / name
+            if not path.exists():
+                continue
+            if args.force or not is_current(path):
+                with span(f"store {trail} {name}"):
+                    sidecar = build_store(path)
+                status = f"wrote {sidecar.parent}"
+            else:
+                status = "current"
+            store = RouteStore(path)
+            print(f"{trail:5s} {name:20s} {len(store):>7,} vertices  {len(store.segment_slices()):>3} segments  "
+                  f"{store.length_meters / METERS_PER_MILE:7.1f} mi  ({status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Split a trail's category data and elevation profile into per-section bundles.
+
+Each bundle is self-contained: the section's mile range plus every waypoint,
+water, town, navigation and toilet record and the profile samples that fall in
+it, so the app can parse only the current and adjacent sections at startup.
+A small index.json lists each section's mile range, record counts and size.
+
+Section starts come from build/sections.geojson (ODT) or
+public/trails/<trail>/sections.json (NNML). Records without a mainline mile
+(alternates are published with mile 0) are assigned to the section of the
+nearest profile sample instead.
+
+Outputs:
+    public/sections/index.json, public/sections/s<N>.json            (odt)
+    public/trails/<trail>/sections/index.json, .../s<N>.json          (others)
+
+Run:
+    python3 scripts/build-section-bundles.py --trail odt|nnml
+"""
+
+import argparse
+import bisect
+import json
+import sys
+
+from buildlib import trail_public_dir
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.sections import section_index, section_ranges
+from buildlib.spatial import GridIndex
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+CATEGORY_FILES = ["waypoints", "water", "towns", "navigation", "toilets"]
+# An alternate must be this close to the mainline to borrow a profile mile.
+MAX_SNAP_MILES = 25.0
+
+
+def record_mile(item, profile_index):
+    """Mile used to place a record: its own, or the nearest profile sample's."""
+    if item.get("mile"):
+        return item["mile"]
+    hit = profile_index.nearest(item["lat"], item["lon"], MAX_SNAP_MILES)
+    return hit[1]["distance"] if hit else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    out_dir = data_dir / "sections"
+
+    with open(data_dir / "elevation-profile.json") as f:
+        profile = json.load(f)
+    if not profile:
+        sys.exit("Empty elevation profile")
+    ranges = section_ranges(args.trail, profile[-1]["distance"])
+    print(f"Trail: {args.trail}  ({len(ranges)} sections, {profile[-1]['distance']:.1f} mi)")
+    profile_index = GridIndex.from_items(profile, cell_miles=1.0)
+
+    bundles = [dict(r, **{name: [] for name in CATEGORY_FILES}, profile=[]) for r in ranges]
+    for name in CATEGORY_FILES:
+        path = data_dir / f"{name}.json"
+        if not path.exists():
+            continue
+        with open(path) as f:
+            items = json.load(f)
+        for item in items:
+            bundles[section_index(ranges, record_mile(item, profile_index))][name].append(item)
+
+    # Profile samples are split at section starts; each bundle also keeps the
+    # first sample of the next section so its chart reaches the boundary.
+    sample_miles = [p["distance"] for p in profile]
+    for bundle in bundles:
+        lo = bisect.bisect_left(sample_miles, bundle["startMile"])
+        hi = bisect.bisect_left(sample_miles, bundle["endMile"])
+        bundle["profile"] = profile[lo:min(hi + 1, len(profile))]
+
+    index = []
+    written = {}
+    for bundle in bundles:
+        path = out_dir / f"s{bundle['section']}.json"
+        encoded = json.dumps(bundle, separators=(",", ":"))
+        written[path] = encoded + "\n"
+        entry = {
+            "section": bundle["section"],
+            "name": bundle["name"],
+            "startMile": bundle["startMile"],
+            "endMile": bundle["endMile"],
+            "file": path.name,
+            "bytes": len(encoded) + 1,
+            "counts": {name: len(bundle[name]) for name in CATEGORY_FILES + ["profile"]},
+        }
+        index.append(entry)
+        print(f"  s{bundle['section']:<3} {bundle['startMile']:>6} - {bundle['endMile']:<6} "
+              f"{entry['bytes'] / 1024:7.1f} KB  {entry['counts']}")
+
+    index_path = out_dir / "index.json"
+    written[index_path] = json.dumps(index, indent=2) + "\n"
+    publish(written, args.allow_size_change)
+    print(f"\n✓ {index_path} ({len(index)} sections)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Cut the trail's basemap and contour PMTiles into one small archive per section.
+
+The service worker used to precache the whole basemap and contours archives
+(tens of MB each) in one install step. This extracts, for every section and
+every zoom the source archive has, only the tiles that intersect
+build/<trail>/corridor.geojson (or the route line) and whose span of trail
+miles overlaps the section -- the same per-section tile sets that
+build-tile-index.py counts (buildlib/tilecover.py) -- and writes them as a
+self-contained PMTiles archive. Tile bytes are copied as stored, so extracts
+render exactly like the source; tiles shared by neighbouring sections appear
+in both. Contour tiles outside the corridor are not carried into the extracts.
+
+Outputs, next to the section bundles:
+    public/sections/s<N>.<layer>.pmtiles, public/sections/tiles.json     (odt)
+    public/trails/<trail>/sections/...                                    (others)
+
+tiles.json:
+    {"bufferMiles": 3.11,
+     "layers": {"basemap": {"source": "basemap.pmtiles", "minZoom": 0, "maxZoom": 13, "bytes": ...}},
+     "sections": [{"section": 1, "name": ..., "startMile": 0, "endMile": 61.2,
+                   "bounds": [w, s, e, n],
+                   "files": {"basemap": {"file": "s1.basemap.pmtiles", "bytes": ..., "tiles": ...,
+                                         "sha256": ...}}}]}
+
+Run:
+    python3 scripts/build-section-tiles.py --trail odt|nnml [--archive public/basemap.pmtiles ...]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+from buildlib import pmtiles, pmtiles_layer, trail_build_dir, trail_pmtiles_path, trail_public_dir
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.routestore import open_store
+from buildlib.sections import section_ranges
+from buildlib.spatial import GridIndex
+from buildlib.tilecover import corridor_buffer_miles, corridor_rings, section_tiles, tiles_bounds, zoom_tiles
+from buildlib.trace import add_trace_arguments, enable_from_args, span
+
+LAYERS = ["basemap", "contours"]
+INDEX_FILE = "tiles.json"
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract(reader: pmtiles.Reader, tiles_by_zoom: dict[int, list[tuple[int, int]]], bounds,
+            out_path: Path) -> dict:
+    """Write the given z -> [(x, y)] tiles from reader to out_path; returns counts."""
+    header = reader.header
+    wanted = []
+    for z in range(header.min_zoom, header.max_zoom + 1):
+        for x, y in tiles_by_zoom.get(z, ()):
+            tile_id = pmtiles.zxy_to_tile_id(z, x, y)
+            location = reader.locate(tile_id)
+            if location is not None:
+                wanted.append((tile_id, location))
+    wanted.sort()
+    tiles = ((tile_id, location, reader.read_at(location)) for tile_id, location in wanted)
+    return pmtiles.write_archive(out_path, tiles, reader.metadata(), header, bounds=bounds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--archive", type=Path, action="append",
+                        help="Source PMTiles archive (repeatable); defaults to the trail's basemap and contours.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    archives = args.archive or [trail_pmtiles_path(args.trail, layer) for layer in LAYERS]
+    missing = [str(p) for p in archives if not p.exists()]
+    if missing:
+        sys.exit(f"Missing archive(s): {', '.join(missing)}")
+    readers = [(pmtiles_layer(args.trail, archive), pmtiles.Reader(archive)) for archive in archives]
+    max_zoom = max(reader.header.max_zoom for _, reader in readers)
+    min_zoom = min(reader.header.min_zoom for _, reader in readers)
+
+    data_dir = trail_public_dir(args.trail)
+    with open(data_dir / "elevation-profile.json") as f:
+        profile = json.load(f)
+    if not profile:
+        sys.exit("Empty elevation profile")
+    ranges = section_ranges(args.trail, profile[-1]["distance"])
+    radius = corridor_buffer_miles(args.trail)
+    rings = corridor_rings(args.trail)
+    route_parts = open_store(trail_build_dir(args.trail) / "route_line.geojson").parts()
+    profile_index = GridIndex.from_items(profile, cell_miles=1.0)
+    print(f"Trail: {args.trail}  ({len(ranges)} sections, buffer {radius:.2f} mi, z{min_zoom}-{max_zoom})")
+
+    # section -> zoom -> tiles, shared by every layer.
+    per_section: list[dict[int, list[tuple[int, int]]]] = [{} for _ in ranges]
+    with span("cover", zooms=max_zoom - min_zoom + 1):
+        for z in range(min_zoom, max_zoom + 1):
+            rows = zoom_tiles(z, rings, route_parts, profile, profile_index, radius)
+            for tiles_by_zoom, tiles in zip(per_section, section_tiles(rows, ranges)):
+                tiles_by_zoom[z] = tiles
+
+    out_dir = data_dir / "sections"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = {"bufferMiles": round(radius, 2), "layers": {}, "sections": []}
+    for r, tiles_by_zoom in zip(ranges, per_section):
+        index["sections"].append({
+            "section": r["section"], "name": r["name"], "startMile": r["startMile"], "endMile": r["endMile"],
+            "bounds": tiles_bounds(tiles_by_zoom), "files": {},
+        })
+
+    start = time.perf_counter()
+    for (layer, reader), archive in zip(readers, archives):
+        header = reader.header
+        index["layers"][layer] = {"source": archive.name, "minZoom": header.min_zoom,
+                                  "maxZoom": header.max_zoom, "bytes": archive.stat().st_size}
+        total = 0
+        with span("extract", layer=layer, sections=len(ranges)):
+            for entry, tiles_by_zoom in zip(index["sections"], per_section):
+                out_path = out_dir / f"s{entry['section']}.{layer}.pmtiles"
+                counts = extract(reader, tiles_by_zoom, entry["bounds"], out_path)
+                entry["files"][layer] = {"file": out_path.name, "bytes": counts["bytes"],
+                                         "tiles": counts["tiles"], "sha256": sha256_file(out_path)}
+                total += counts["bytes"]
+                print(f"  s{entry['section']:<3} {layer:<9} {counts['tiles']:>6} tiles "
+                      f"{counts['bytes'] / 1024:>9.1f} KB")
+        reader.close()
+        source_mb = archive.stat().st_size / 1024 / 1024
+        print(f"✓ {layer}: {source_mb:.1f} MB -> {len(ranges)} extracts, {total / 1024 / 1024:.1f} MB total")
+    elapsed = time.perf_counter() - start
+
+    index_path = out_dir / INDEX_FILE
+    publish({index_path: json.dumps(index, separators=(",", ":")) + "\n"}, args.allow_size_change)
+    print(f"✓ {index_path} ({index_path.stat().st_size / 1024:.1f} KB) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Add smoothed grades to a trail's published elevation profile and rebuild
+its steep-segment index and hiking-time arrays (steep-segments.json and
+hiking-times.json next to the profile; see buildlib/grades.py and
+buildlib/pace.py for the formats).
+
+The profile builders do this themselves; this script regrades an existing
+profile without resampling the DEM or re-querying USGS, e.g. after changing
+the window or threshold.
+
+Run:
+    python3 scripts/build-steep-segments.py --trail odt|nnml [--grade-window 0.2] [--steep-grade 10] [--pace-model tobler]
+"""
+
+import argparse
+import json
+
+from buildlib import trail_public_dir
+from buildlib.grades import GRADE_WINDOW_MILES, GRADES_FILE, MIN_STEEP_MILES, STEEP_GRADE_PCT, grade_profile
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.pace import DEFAULT_PACE_MODEL, PACE_MODELS, TIMES_FILE, hiking_times
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--grade-window", type=float, default=GRADE_WINDOW_MILES,
+                        help="Window (miles) the per-sample grade is averaged over.")
+    parser.add_argument("--steep-grade", type=float, default=STEEP_GRADE_PCT,
+                        help="Percent grade at which a run counts as a steep segment.")
+    parser.add_argument("--min-miles", type=float, default=MIN_STEEP_MILES,
+                        help="Shortest steep segment to index.")
+    parser.add_argument("--pace-model", choices=PACE_MODELS, default=DEFAULT_PACE_MODEL,
+                        help="Model for the cumulative hiking-time arrays.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    profile_path = data_dir / "elevation-profile.json"
+    with open(profile_path) as f:
+        profile = json.load(f)
+    index = grade_profile(args.trail, profile, args.grade_window, args.steep_grade, args.min_miles)
+    times = hiking_times(profile, args.pace_model)
+
+    print(f"Trail: {args.trail}  {len(profile)} samples, {args.grade_window} mi window, >= {args.steep_grade}%")
+    for section in index["sections"]:
+        biggest = max(section["climbs"], key=lambda s: s["gainFt"], default=None)
+        note = (f"  biggest +{biggest['gainFt']} ft over {biggest['miles']} mi at mile {biggest['startMile']}"
+                if biggest else "")
+        print(f"  section {section['section']:>2}: {len(section['climbs']):>2} climbs, "
+              f"{len(section['descents']):>2} descents{note}")
+
+    out_path = data_dir / GRADES_FILE
+    times_path = data_dir / TIMES_FILE
+    publish({
+        profile_path: json.dumps(profile, separators=(",", ":")),
+        out_path: json.dumps(index, separators=(",", ":")) + "\n",
+        times_path: json.dumps(times, separators=(",", ":")) + "\n",
+    }, args.allow_size_change)
+    print(f"\n✓ {profile_path} ({profile_path.stat().st_size / 1024:.1f} KB)")
+    print(f"✓ {out_path} ({out_path.stat().st_size / 1024:.1f} KB)")
+    print(f"✓ {times_path} ({args.pace_model}: {times['hours'][-1]} h NOBO, {times['hoursSobo'][-1]} h SOBO)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Precompute sunrise, sunset and civil twilight per section for offline use.
+
+Each section is represented by the elevation-profile sample at its middle
+mile. For every day in the range the table holds civil dawn, sunrise, sunset
+and civil dusk as minutes after 00:00 UTC of that date (see
+buildlib/suntimes.py; values match public/js/moon.js's getSunData). Writes
+sun-times.json next to the trail's water.json:
+
+    {"year": 2026, "startDay": 60, "days": 275,
+     "events": ["civilDawn", "sunrise", "sunset", "civilDusk"],
+     "sections": [{"section": 1, "name": ..., "mile": 30.6, "lat": ..., "lon": ...,
+                   "civilDawn": [...], "sunrise": [...], "sunset": [...], "civilDusk": [...]}]}
+
+Arrays are indexed by day-of-year minus startDay (day-of-year is 1-based);
+null means the sun never reaches that altitude on that day.
+
+Run:
+    python3 scripts/build-sun-times.py --trail odt|nnml [--start 2026-03-01] [--end 2026-11-30]
+"""
+
+import argparse
+import bisect
+import json
+import time
+from datetime import date, timedelta
+
+from buildlib import trail_public_dir
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.sections import section_ranges
+from buildlib.suntimes import EVENTS, sun_table
+from buildlib.trace import add_trace_arguments, enable_from_args, span
+
+SUN_TIMES_FILE = "sun-times.json"
+
+
+def representative_points(profile: list[dict], ranges: list[dict]) -> list[dict]:
+    """The profile sample nearest each section's middle mile."""
+    distances = [p["distance"] for p in profile]
+    points = []
+    for section in ranges:
+        mid = (section["startMile"] + section["endMile"]) / 2
+        i = min(bisect.bisect_left(distances, mid), len(profile) - 1)
+        if i and abs(distances[i - 1] - mid) < abs(distances[i] - mid):
+            i -= 1
+        sample = profile[i]
+        points.append({"section": section["section"], "name": section["name"], "mile": sample["distance"],
+                       "lat": sample["lat"], "lon": sample["lon"]})
+    return points
+
+
+def main():
+    this_year = date.today().year
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(this_year, 1, 1),
+                        help="First date (YYYY-MM-DD); defaults to Jan 1 of this year.")
+    parser.add_argument("--end", type=date.fromisoformat, default=None,
+                        help="Last date (YYYY-MM-DD, same year as --start); defaults to Dec 31.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    end = args.end or date(args.start.year, 12, 31)
+    if end.year != args.start.year or end < args.start:
+        parser.error("--end must fall in the same year as --start, on or after it")
+    days = [args.start + timedelta(days=i) for i in range((end - args.start).days + 1)]
+
+    data_dir = trail_public_dir(args.trail)
+    with open(data_dir / "elevation-profile.json") as f:
+        profile = json.load(f)
+    points = representative_points(profile, section_ranges(args.trail, profile[-1]["distance"]))
+
+    start = time.perf_counter()
+    with span("sun table", places=len(points), days=len(days)):
+        table = sun_table([p["lat"] for p in points], [p["lon"] for p in points], days)
+    elapsed = time.perf_counter() - start
+    for i, point in enumerate(points):
+        for name in EVENTS:
+            point[name] = table[name][i]
+
+    out = {
+        "year": args.start.year,
+        "startDay": args.start.timetuple().tm_yday,
+        "days": len(days),
+        "events": list(EVENTS),
+        "sections": points,
+    }
+    out_path = data_dir / SUN_TIMES_FILE
+    publish({out_path: json.dumps(out, separators=(",", ":")) + "\n"}, args.allow_size_change)
+    print(f"Trail: {args.trail}  {len(points)} sections x {len(days)} days ({args.start} - {end}) "
+          f"in {elapsed * 1000:.0f} ms")
+    print(f"✓ {out_path} ({out_path.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
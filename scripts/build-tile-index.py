@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Index the map tiles a hiker needs along the trail, in hiking order.
+
+Rasterizes build/<trail>/corridor.geojson and the route line into the z/x/y
+tiles they touch at each zoom (buildlib/tilecover.py) and annotates every
+tile with the span of trail miles whose corridor buffer reaches it. Tiles
+that only the corridor around a distant alternate reaches take the mile of
+the nearest profile sample. Writes tile-index.json next to water.json:
+
+    {"trailEnd": 639.2, "bufferMiles": 3.11, "minZoom": 0, "maxZoom": 14,
+     "zooms": [{"z": 14, "count": 5321,
+                "x": [...], "y": [...], "startMile": [...], "endMile": [...]}],
+     "layers": {"basemap": {"source": "basemap-nnml.pmtiles", "minZoom": 0, "maxZoom": 13}},
+     "sections": [{"section": 1, "name": ..., "startMile": 0, "endMile": 61.2, "tiles": 2210,
+                   "layers": {"basemap": {"tiles": 1804, "bytes": 3145728}}}]}
+
+Within a zoom the columns are sorted by startMile, then endMile, so a
+northbound prefetcher at mile m skips tiles whose endMile < m and fetches the
+rest in order (southbound: walk backwards from the last startMile <= m).
+
+Per-section counts cover the tiles whose mile span overlaps the section (the
+same sets build-section-tiles.py extracts), and bytes add up those tiles'
+lengths from each archive's PMTiles directory (no tile data is read). The trail's basemap and contour archives are used when
+they are real PMTiles files; in a checkout without Git LFS content they are
+skipped with a note.
+
+Run:
+    python3 scripts/build-tile-index.py --trail odt|nnml [--max-zoom 14] [--archive public/basemap.pmtiles ...]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from buildlib import pmtiles, pmtiles_layer, trail_build_dir, trail_pmtiles_path, trail_public_dir
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.routestore import open_store
+from buildlib.sections import section_ranges
+from buildlib.spatial import GridIndex
+from buildlib.tilecover import corridor_buffer_miles, corridor_rings, section_tiles, zoom_tiles
+from buildlib.trace import add_trace_arguments, enable_from_args, span
+
+INDEX_FILE = "tile-index.json"
+LAYERS = ["basemap", "contours"]
+DEFAULT_MAX_ZOOM = 14
+
+
+def open_archives(trail: str, explicit: list[Path] | None) -> list[tuple[str, pmtiles.Reader]]:
+    readers = []
+    for path in explicit or [trail_pmtiles_path(trail, layer) for layer in LAYERS]:
+        if not explicit and not pmtiles.is_archive(path):
+            print(f"  (skipping {path.name}: not a PMTiles archive; run `git lfs pull` for byte estimates)")
+            continue
+        readers.append((pmtiles_layer(trail, path), pmtiles.Reader(path)))
+    return readers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--min-zoom", type=int, default=0)
+    parser.add_argument("--max-zoom", type=int, default=DEFAULT_MAX_ZOOM)
+    parser.add_argument("--archive", type=Path, action="append",
+                        help="PMTiles archive to estimate bytes from (repeatable); "
+                             "defaults to the trail's basemap and contours.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    with open(data_dir / "elevation-profile.json") as f:
+        profile = json.load(f)
+    if not profile:
+        sys.exit("Empty elevation profile")
+    trail_end = profile[-1]["distance"]
+    ranges = section_ranges(args.trail, trail_end)
+    radius = corridor_buffer_miles(args.trail)
+    rings = corridor_rings(args.trail)
+    route_parts = open_store(trail_build_dir(args.trail) / "route_line.geojson").parts()
+    profile_index = GridIndex.from_items(profile, cell_miles=1.0)
+    archives = open_archives(args.trail, args.archive)
+    print(f"Trail: {args.trail}  ({len(ranges)} sections, buffer {radius:.2f} mi, "
+          f"z{args.min_zoom}-{args.max_zoom})")
+
+    sections = [{"section": r["section"], "name": r["name"], "startMile": r["startMile"],
+                 "endMile": r["endMile"], "tiles": 0,
+                 "layers": {layer: {"tiles": 0, "bytes": 0} for layer, _ in archives}} for r in ranges]
+    zooms = []
+    for z in range(args.min_zoom, args.max_zoom + 1):
+        with span("zoom", z=z):
+            rows = zoom_tiles(z, rings, route_parts, profile, profile_index, radius)
+        zooms.append({"z": z, "count": len(rows), "x": [r[2] for r in rows], "y": [r[3] for r in rows],
+                      "startMile": [r[0] for r in rows], "endMile": [r[1] for r in rows]})
+        with span("estimate", z=z):
+            for section, tiles in zip(sections, section_tiles(rows, ranges)):
+                section["tiles"] += len(tiles)
+                for layer, reader in archives:
+                    if not reader.header.min_zoom <= z <= reader.header.max_zoom:
+                        continue
+                    for x, y in tiles:
+                        location = reader.locate(pmtiles.zxy_to_tile_id(z, x, y))
+                        if location is not None:
+                            section["layers"][layer]["tiles"] += 1
+                            section["layers"][layer]["bytes"] += location[1]
+        print(f"  z{z:<2} {len(rows):>7} tiles")
+
+    for s in sections:
+        sizes = "  ".join(f"{layer} {v['tiles']} tiles {v['bytes'] / 1024:,.0f} KB"
+                          for layer, v in s["layers"].items())
+        print(f"  s{s['section']:<3} {s['startMile']:>6} - {s['endMile']:<6} {s['tiles']:>7} tiles  {sizes}")
+
+    out = {
+        "trailEnd": trail_end,
+        "bufferMiles": round(radius, 2),
+        "minZoom": args.min_zoom,
+        "maxZoom": args.max_zoom,
+        "zooms": zooms,
+        "layers": {layer: {"source": reader.path.name, "minZoom": reader.header.min_zoom,
+                           "maxZoom": reader.header.max_zoom} for layer, reader in archives},
+        "sections": sections,
+    }
+    for _, reader in archives:
+        reader.close()
+    out_path = data_dir / INDEX_FILE
+    publish({out_path: json.dumps(out, separators=(",", ":")) + "\n"}, args.allow_size_change)
+    print(f"✓ {out_path} ({out_path.stat().st_size / 1024:.1f} KB, {sum(z['count'] for z in zooms)} tiles)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Precompute the water-carry index for a trail.
+
+Writes water-gaps.json next to the trail's water.json: distances to the next
+reliable / seasonal / any water northbound and southbound for every mainline
+source and every profile mile bucket, plus the longest dry stretches in each
+section (see buildlib/watergaps.py for the format).
+
+Run:
+    python3 scripts/build-water-gaps.py --trail odt|nnml [--bucket 0.5]
+"""
+
+import argparse
+import json
+
+from buildlib import trail_public_dir
+from buildlib.manifest import add_manifest_arguments, publish
+from buildlib.sections import section_ranges
+from buildlib.trace import add_trace_arguments, enable_from_args
+from buildlib.watergaps import FILTERS, build_index
+
+BUCKET_MILES = 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", required=True, help="Trail id (e.g. odt, nnml)")
+    parser.add_argument("--bucket", type=float, default=BUCKET_MILES,
+                        help="Profile bucket size in miles.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    data_dir = trail_public_dir(args.trail)
+    with open(data_dir / "water.json") as f:
+        water = json.load(f)
+    with open(data_dir / "elevation-profile.json") as f:
+        profile = json.load(f)
+
+    trail_end = profile[-1]["distance"]
+    start = (profile[0]["lat"], profile[0]["lon"])
+    index = build_index(water, trail_end, start, section_ranges(args.trail, trail_end), args.bucket)
+
+    print(f"Trail: {args.trail}  {len(index['sources'])} mainline sources "
+          f"(of {len(water)}), {len(index['bucketGaps']['any']['nobo'])} buckets")
+    for name in FILTERS:
+        longest = max(
+            (s for section in index["dryStretches"] for s in section[name]),
+            key=lambda s: s["miles"], default=None,
+        )
+        if longest:
+            print(f"  longest {name:<8} dry stretch: {longest['miles']:5.1f} mi "
+                  f"({longest['startMile']} - {longest['endMile']})")
+
+    out_path = data_dir / "water-gaps.json"
+    publish({out_path: json.dumps(index, separators=(",", ":")) + "\n"}, args.allow_size_change)
+    print(f"\n✓ {out_path} ({out_path.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Shared helpers for the Python data build scripts.
+
+The build scripts are standalone files (several with hyphenated names), so this
+package is imported by path: scripts under scripts/ find it automatically, and
+the root-level scripts put scripts/ on sys.path before importing it.
+"""
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+PUBLIC_DIR = ROOT / "public"
+BUILD_DIR = ROOT / "build"
+DATA_DIR = ROOT / "data"
+
+
+def trail_public_dir(trail: str) -> Path:
+    """Published data directory for a trail (ODT keeps the legacy public/ root)."""
+    return PUBLIC_DIR if trail == "odt" else PUBLIC_DIR / "trails" / trail
+
+
+def trail_build_dir(trail: str) -> Path:
+    """Intermediate build directory for a trail (ODT keeps the legacy build/ root)."""
+    return BUILD_DIR if trail == "odt" else BUILD_DIR / trail
+
+
+def corridor_dem_path(trail: str) -> Path:
+    """Corridor DEM GeoTIFF for a trail (ODT keeps the legacy data/corridor_dem.tif)."""
+    return DATA_DIR / ("corridor_dem.tif" if trail == "odt" else f"{trail}_corridor_dem.tif")
+
+
+def trail_pmtiles_path(trail: str, layer: str) -> Path:
+    """Published PMTiles archive for a layer (ODT keeps the unsuffixed names, e.g. basemap.pmtiles)."""
+    return PUBLIC_DIR / (f"{layer}.pmtiles" if trail == "odt" else f"{layer}-{trail}.pmtiles")
+
+
+def pmtiles_layer(trail: str, path: Path) -> str:
+    """Layer name of an archive path: basemap-nnml.pmtiles -> basemap."""
+    stem = Path(path).stem
+    return stem[: -len(trail) - 1] if stem.endswith(f"-{trail}") else stem
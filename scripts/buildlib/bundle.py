@@ -0,0 +1,156 @@
+"""Normalized data bundle: one shared record table plus per-file columns.
+
+Every category record also appears, with the same mile/lat/lon/name/landmark,
+in waypoints.json. The bundle stores those shared fields once, in a columnar
+table addressed by integer ID, and reduces each published file to a list of IDs
+plus columns for the fields that only that file carries (onTrail, distToNext,
+services, ...).
+
+Bundle format:
+    {
+      "version": 1,
+      "records": {"mile": [...], "lat": [...], "lon": [...], "name": [...], "landmark": [...]},
+      "files": {
+        "water.json": {
+          "ids": [...],                      # row in `records` for each entry
+          "fields": ["mile", ..., "distToNext"],  # key order of the entries
+          "columns": {"onTrail": [...], ...},     # file-specific fields
+          "overrides": {"landmark": {"3": "..."}},  # shared fields that differ
+          "absent": {"sheetComments": [4, 9]}       # optional fields not present
+        }, ...
+      }
+    }
+
+IDs follow waypoints.json order, with records that only exist in a category
+file appended after it, so they are stable for a given release. expand()
+rebuilds every file exactly, including field order.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+BUNDLE_VERSION = 1
+SHARED_FIELDS = ["mile", "lat", "lon", "name", "landmark"]
+# waypoints.json comes first so its entries define the record table order.
+BUNDLE_FILES = ["waypoints.json", "water.json", "towns.json", "navigation.json", "toilets.json"]
+
+
+def record_key(item: dict) -> tuple:
+    return (item.get("name"), item.get("mile"), item.get("lat"), item.get("lon"))
+
+
+def field_order(items: list[dict]) -> list[str]:
+    """Merge the key orders of all entries into one order (first-seen wins)."""
+    order: list[str] = []
+    seen = set()
+    for item in items:
+        for field in item:
+            if field not in seen:
+                seen.add(field)
+                order.append(field)
+    return order
+
+
+def normalize(files: dict[str, list[dict]]) -> dict:
+    """Build a bundle from {filename: entries}, processed in BUNDLE_FILES order."""
+    table = {field: [] for field in SHARED_FIELDS}
+    ids_by_key: dict[tuple, int] = {}
+
+    def row_id(item: dict) -> int:
+        key = record_key(item)
+        rid = ids_by_key.get(key)
+        if rid is None:
+            rid = len(table["name"])
+            ids_by_key[key] = rid
+            for field in SHARED_FIELDS:
+                table[field].append(item.get(field))
+        return rid
+
+    out_files = {}
+    ordered = [f for f in BUNDLE_FILES if f in files] + sorted(f for f in files if f not in BUNDLE_FILES)
+    for filename in ordered:
+        items = files[filename]
+        fields = field_order(items)
+        ids = [row_id(item) for item in items]
+        columns = {field: [] for field in fields if field not in SHARED_FIELDS}
+        overrides: dict[str, dict[str, object]] = {}
+        absent: dict[str, list[int]] = {}
+        for pos, (rid, item) in enumerate(zip(ids, items)):
+            present = [field for field in fields if field in item]
+            if present != list(item):
+                raise ValueError(f"{filename}[{pos}]: field order differs from {fields}")
+            for field in fields:
+                if field not in item:
+                    absent.setdefault(field, []).append(pos)
+                    if field in columns:
+                        columns[field].append(None)
+                elif field in columns:
+                    columns[field].append(item[field])
+                elif item[field] != table[field][rid] or type(item[field]) is not type(table[field][rid]):
+                    overrides.setdefault(field, {})[str(pos)] = item[field]
+
+        entry: dict = {"ids": ids, "fields": fields, "columns": columns}
+        if overrides:
+            entry["overrides"] = overrides
+        if absent:
+            entry["absent"] = absent
+        out_files[filename] = entry
+
+    return {"version": BUNDLE_VERSION, "records": table, "files": out_files}
+
+
+def expand(bundle: dict) -> dict[str, list[dict]]:
+    """Rebuild every published file from a bundle."""
+    if bundle.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version: {bundle.get('version')}")
+    table = bundle["records"]
+    files = {}
+    for filename, entry in bundle["files"].items():
+        columns = entry["columns"]
+        overrides = entry.get("overrides", {})
+        absent = {field: set(positions) for field, positions in entry.get("absent", {}).items()}
+        items = []
+        for pos, rid in enumerate(entry["ids"]):
+            item = {}
+            for field in entry["fields"]:
+                if pos in absent.get(field, ()):
+                    continue
+                if field in columns:
+                    item[field] = columns[field][pos]
+                elif str(pos) in overrides.get(field, {}):
+                    item[field] = overrides[field][str(pos)]
+                else:
+                    item[field] = table[field][rid]
+            items.append(item)
+        files[filename] = items
+    return files
+
+
+def load_files(data_dir: Path) -> dict[str, list[dict]]:
+    return {
+        filename: json.loads((data_dir / filename).read_text())
+        for filename in BUNDLE_FILES
+        if (data_dir / filename).exists()
+    }
+
+
+def mismatched_files(bundle: dict, files: dict[str, list[dict]]) -> list[str]:
+    """Names of files whose expansion differs from the original, field order included."""
+    expanded = expand(bundle)
+    return [
+        filename for filename, items in files.items()
+        if filename not in expanded
+        or [list(i.items()) for i in expanded[filename]] != [list(i.items()) for i in items]
+    ]
+
+
+def build_bundle(data_dir: Path) -> dict:
+    """Normalize the files in data_dir, refusing a bundle that does not round-trip."""
+    files = load_files(data_dir)
+    bundle = normalize(files)
+    mismatched = mismatched_files(bundle, files)
+    if mismatched:
+        raise SystemExit(f"Bundle does not reproduce: {', '.join(mismatched)}")
+    return bundle
@@ -0,0 +1,139 @@
+"""Keyword rules that sort ODT waypoints into categories and subcategories.
+
+categorize-csv.py, build-water-sources.py and build-data.py all classify rows
+by keywords in the CSV's Landmark and Water Details columns. The rules live
+here once, as priority-ordered tables, and classify() reports which rule fired
+so auto-categorized rows can be reviewed.
+
+Keywords match as substrings of the lowercased text ("town" matches
+"downtown"), and each table is walked in order until the first hit, exactly
+like the hard-coded loops the tables replaced.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+TOWN_KEYWORDS = ["services", "town", "city", "ranch", "store", "resupply"]
+WATER_KEYWORDS = ["water", "spring", "creek", "river", "lake", "reservoir",
+                  "trough", "canal", "spigot", "campground", "pond", "marsh"]
+
+# (subcategory, keywords, field) in priority order; first hit wins. field is
+# "landmark", "details" or "either".
+TOWN_RULES = [
+    ("full", ["all services"], "landmark"),
+    ("none", ["no resupply", "no services"], "landmark"),
+    ("limited", ["limited", "some services"], "landmark"),
+    ("limited", ["store", "camp store"], "landmark"),
+]
+TOWN_DEFAULT = "limited"
+WATER_RULES = [
+    ("unreliable", ["unreliable"], "either"),
+    ("seasonal", ["seasonal"], "details"),
+    ("reliable", ["reliable"], "details"),
+]
+WATER_DEFAULT = "seasonal"
+NAVIGATION_RULES = [
+    ("junction", ["junction", "jct"], "landmark"),
+    ("gate", ["gate", "fence"], "landmark"),
+    ("road-crossing", ["road", "highway", "paved"], "landmark"),
+]
+NAVIGATION_DEFAULT = "other"
+# towns.json `services` level; published values, so the order differs from
+# TOWN_RULES ("limited" is checked before "no services").
+TOWN_SERVICE_RULES = [
+    ("all", ["all services"]),
+    ("limited", ["limited", "some services"]),
+    ("none", ["no resupply", "no services"]),
+    ("store", ["store", "camp store"]),
+]
+TOWN_SERVICE_DEFAULT = "limited"
+OFF_TRAIL_KEYWORDS = ["off trail", "off-trail"]
+
+OFF_TRAIL_PATTERN = re.compile(r"(\d+\.?\d*)\s*(mile|mi|m)\s*(off|away|to|from)")
+
+
+class Classification(NamedTuple):
+    category: str
+    subcategory: str
+    rule: str  # human-readable reason, for review output
+
+
+def _hit(keywords: list[str], text: str) -> str | None:
+    """The first of keywords (in table order) that occurs in text."""
+    for kw in keywords:
+        if kw in text:
+            return kw
+    return None
+
+
+def _first_rule(fields: dict[str, str], rules, default: str, category: str, reason: str) -> Classification:
+    for subcategory, keywords, field in rules:
+        names = ("landmark", "details") if field == "either" else (field,)
+        for name in names:
+            hit = _hit(keywords, fields[name])
+            if hit:
+                return Classification(category, subcategory, f"{reason}; '{hit}' in {name}")
+    return Classification(category, default, f"{reason}; default {default}")
+
+
+def _fields(landmark: str, details: str) -> dict[str, str]:
+    return {"landmark": landmark.lower(), "details": details.lower()}
+
+
+def _town(fields: dict[str, str]) -> str | None:
+    # Town keywords contain no spaces, so none can straddle the join.
+    return _hit(TOWN_KEYWORDS, fields["landmark"] + " " + fields["details"])
+
+
+def _water(details: str, fields: dict[str, str]) -> str | None:
+    if details.strip():
+        return "details"
+    return _hit(WATER_KEYWORDS, fields["landmark"])
+
+
+def is_town(landmark: str, details: str) -> str | None:
+    """The town keyword that fired, if any."""
+    return _town(_fields(landmark, details))
+
+
+def is_water(landmark: str, details: str) -> str | None:
+    """Why the row counts as water ("details" or the keyword), if it does."""
+    return _water(details, _fields(landmark, details))
+
+
+def town_services(landmark: str) -> str:
+    """towns.json services level ("all", "limited", "none" or "store") from a landmark."""
+    landmark_lower = landmark.lower()
+    for services, keywords in TOWN_SERVICE_RULES:
+        if _hit(keywords, landmark_lower):
+            return services
+    return TOWN_SERVICE_DEFAULT
+
+
+def classify(landmark: str, details: str) -> Classification:
+    """Category, subcategory and the rule that fired for one CSV row.
+
+    Towns win over water, water over navigation; toilets are tagged by hand.
+    """
+    fields = _fields(landmark, details)
+    town = _town(fields)
+    if town:
+        return _first_rule(fields, TOWN_RULES, TOWN_DEFAULT, "towns", f"town: '{town}'")
+    water = _water(details, fields)
+    if water:
+        reason = "water: has details" if water == "details" else f"water: '{water}' in landmark"
+        return _first_rule(fields, WATER_RULES, WATER_DEFAULT, "water", reason)
+    return _first_rule(fields, NAVIGATION_RULES, NAVIGATION_DEFAULT, "navigation", "navigation")
+
+
+def on_trail_status(landmark: str) -> tuple[bool, str]:
+    """(on trail, off-trail distance) parsed from a landmark description."""
+    landmark_lower = landmark.lower()
+    match = OFF_TRAIL_PATTERN.search(landmark_lower)
+    if match:
+        return False, match.group(1) + " mi"
+    if any(kw in landmark_lower for kw in OFF_TRAIL_KEYWORDS):
+        return False, "off trail"
+    return True, ""
@@ -0,0 +1,126 @@
+"""Zoom-indexed point clusters, computed the way MapLibre clusters GeoJSON.
+
+MapLibre's `cluster: true` runs supercluster on the phone every time a
+source's data is set. cluster_hierarchy() does the same greedy clustering at
+build time: points are projected to web-mercator [0, 1) coordinates, and for
+each zoom from max_zoom down to 0 every node not yet taken (in input order)
+absorbs the untaken nodes within radius_px / (tile_size * 2^z) of it. A node
+with at least min_points points becomes a cluster at the weighted centre of
+its children; a lone node is carried down to the next zoom unchanged.
+
+Every node is therefore visible over one contiguous zoom range:
+
+    minZoom  one more than the zoom its parent cluster formed at (0 if never absorbed)
+    maxZoom  the zoom it formed at (clusters) or MAX_ZOOM (input points)
+
+so the map can draw one plain GeoJSON source filtered on
+minZoom <= zoom <= maxZoom, and a cluster tap zooms to maxZoom + 1, where its
+children appear.
+"""
+
+from __future__ import annotations
+
+import math
+
+TILE_SIZE = 512  # MapLibre GeoJSON sources cluster against 512-px tiles
+MIN_POINTS = 2
+MAX_ZOOM = 24
+
+
+def project(lon: float, lat: float) -> tuple[float, float]:
+    """Web-mercator x, y in [0, 1)."""
+    sin = math.sin(math.radians(max(min(lat, 85.0511), -85.0511)))
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return lon / 360 + 0.5, min(max(y, 0.0), 1.0)
+
+
+def unproject(x: float, y: float) -> tuple[float, float]:
+    """(lon, lat) of web-mercator x, y."""
+    return (x - 0.5) * 360, math.degrees(2 * math.atan(math.exp((1 - 2 * y) * math.pi)) - math.pi / 2)
+
+
+def _neighbours(nodes: list[int], xs: list[float], ys: list[float], r: float):
+    """For each node, the other nodes within r, in input order (grid hash with cell size r)."""
+    cells: dict[tuple[int, int], list[int]] = {}
+    for i in nodes:
+        cells.setdefault((int(xs[i] // r), int(ys[i] // r)), []).append(i)
+    r2 = r * r
+    found = {}
+    for i in nodes:
+        cx, cy = int(xs[i] // r), int(ys[i] // r)
+        near = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in cells.get((gx, gy), ()):
+                    if j != i and (xs[j] - xs[i]) ** 2 + (ys[j] - ys[i]) ** 2 <= r2:
+                        near.append(j)
+        found[i] = sorted(near)
+    return found
+
+
+def cluster_hierarchy(coords: list[tuple[float, float]], radius_px: float, max_zoom: int,
+                      min_zoom: int = 0, min_points: int = MIN_POINTS, tile_size: int = TILE_SIZE) -> dict:
+    """Cluster (lon, lat) points; returns columnar nodes (see the module docstring).
+
+    Node i < len(coords) is input point i; clusters follow, and
+    children[i - len(coords)] lists cluster i's child node ids.
+    """
+    xs, ys, counts = [], [], []
+    for lon, lat in coords:
+        x, y = project(lon, lat)
+        xs.append(x)
+        ys.append(y)
+        counts.append(1)
+    n = len(coords)
+    min_z = [min_zoom] * n
+    max_z = [MAX_ZOOM] * n
+    children: list[list[int]] = []
+
+    level = list(range(n))
+    for z in range(max_zoom, min_zoom - 1, -1):
+        r = radius_px / (tile_size * 2 ** z)
+        near = _neighbours(level, xs, ys, r)
+        taken = set()
+        next_level = []
+        for i in level:
+            if i in taken:
+                continue
+            taken.add(i)
+            group = [j for j in near[i] if j not in taken]
+            total = counts[i] + sum(counts[j] for j in group)
+            if not group or total < min_points:
+                next_level.append(i)
+                continue
+            members = [i] + group
+            taken.update(group)
+            node = len(xs)
+            xs.append(sum(xs[j] * counts[j] for j in members) / total)
+            ys.append(sum(ys[j] * counts[j] for j in members) / total)
+            counts.append(total)
+            min_z.append(min_zoom)
+            max_z.append(z)
+            children.append(members)
+            for j in members:
+                min_z[j] = z + 1
+            next_level.append(node)
+        level = next_level
+
+    lons, lats = [], []
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        lon, lat = coords[i] if i < n else unproject(x, y)
+        lons.append(round(lon, 5))
+        lats.append(round(lat, 5))
+    return {
+        "points": n,
+        "lon": lons,
+        "lat": lats,
+        "count": counts,
+        "minZoom": min_z,
+        "maxZoom": max_z,
+        "children": children,
+    }
+
+
+def visible(hierarchy: dict, zoom: int) -> list[int]:
+    """Node ids drawn at an integer zoom."""
+    return [i for i, (lo, hi) in enumerate(zip(hierarchy["minZoom"], hierarchy["maxZoom"])) if lo <= zoom <= hi]
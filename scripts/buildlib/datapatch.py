@@ -0,0 +1,202 @@
+"""Record-level delta patches between two releases of a category data file.
+
+Records are matched on their stable key (name + mile). A patch lists the keys
+that were removed, the records that were added (with their position in the new
+file) and, for records present in both releases, only the fields that changed.
+Generation is a single pass over each release using dict lookups, so it stays
+linear in the number of records.
+
+Patch format (one per data file):
+    {
+      "version": 1,
+      "key": ["name", "mile"],
+      "base": {"sha256": ..., "records": N},     # release the patch applies to
+      "target": {"sha256": ..., "records": M},   # release it produces
+      "removed": [[name, mile, n], ...],
+      "changed": [{"key": [name, mile, n], "set": {...}, "unset": [...]}, ...],
+      "added": [[index, record], ...],           # ascending new-file index
+      "order": [[name, mile, n], ...]            # only if kept records moved
+    }
+
+`n` is the occurrence number of the (name, mile) pair, so the rare duplicate
+pairs in the data still get distinct keys. Values are compared by JSON type
+as well as value, so 1 -> 1.0 or 1 -> true is a change.
+
+The patched records are written back in the base file's layout (dump_like),
+and the bytes must hash to the target sha256 (check_target).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+
+PATCH_VERSION = 1
+KEY_FIELDS = ("name", "mile")
+
+
+def record_keys(records: list[dict]) -> list[tuple]:
+    """Stable (name, mile, occurrence) key for every record, in file order."""
+    seen: dict[tuple, int] = {}
+    keys = []
+    for record in records:
+        base = tuple(record.get(field) for field in KEY_FIELDS)
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        keys.append(base + (n,))
+    return keys
+
+
+def release_info(raw: bytes, records: list[dict]) -> dict:
+    return {"sha256": hashlib.sha256(raw).hexdigest(), "records": len(records)}
+
+
+def dump_like(raw: bytes, records) -> bytes:
+    """Serialize records in raw's layout: indent, separators and trailing newline.
+
+    The published files differ (build-data.py writes indent=2 with no final
+    newline, the NNML pipeline adds one), so a patched file only matches the
+    target release byte for byte when written the way its base was.
+    """
+    text = raw.decode()
+    body = text.rstrip("\n")
+    indent = re.match(r"[\[{]\n([ \t]+)", body)
+    if indent:
+        unit = indent.group(1)
+        dumped = json.dumps(records, indent=unit if "\t" in unit else len(unit))
+    else:
+        separators = (", ", ": ") if re.search(r'", |": ', body) else (",", ":")
+        dumped = json.dumps(records, separators=separators)
+    return (dumped + text[len(body):]).encode()
+
+
+def check_target(raw: bytes, patch: dict) -> None:
+    """Raise ValueError unless raw (the patched file's bytes) is the patch's target release."""
+    target = patch.get("target") or {}
+    if target.get("sha256") and hashlib.sha256(raw).hexdigest() != target["sha256"]:
+        raise ValueError("Patched file does not match the target release (sha256 mismatch)")
+
+
+def same_value(a, b) -> bool:
+    """JSON equality that also compares types (Python's == has 1 == 1.0 == True)."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_value(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(same_value(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def field_changes(old: dict, new: dict) -> dict | None:
+    """Return {"set": ..., "unset": ...} for two versions of a record, or None."""
+    if same_value(old, new):
+        return None
+    changes: dict = {}
+    updated = {field: value for field, value in new.items()
+               if field not in old or not same_value(old[field], value)}
+    if updated:
+        changes["set"] = updated
+    dropped = [field for field in old if field not in new]
+    if dropped:
+        changes["unset"] = dropped
+    return changes
+
+
+def make_patch(old_records: list[dict], new_records: list[dict],
+               base: dict | None = None, target: dict | None = None) -> dict:
+    old_keys = record_keys(old_records)
+    new_keys = record_keys(new_records)
+    old_by_key = dict(zip(old_keys, old_records))
+    new_key_set = set(new_keys)
+
+    removed = [list(key) for key in old_keys if key not in new_key_set]
+    changed = []
+    added = []
+    kept_in_new_order = []
+    for index, (key, record) in enumerate(zip(new_keys, new_records)):
+        previous = old_by_key.get(key)
+        if previous is None:
+            added.append([index, record])
+            continue
+        kept_in_new_order.append(key)
+        changes = field_changes(previous, record)
+        if changes:
+            changed.append({"key": list(key), **changes})
+
+    patch = {
+        "version": PATCH_VERSION,
+        "key": list(KEY_FIELDS),
+        "base": base,
+        "target": target,
+        "removed": removed,
+        "changed": changed,
+        "added": added,
+    }
+    kept_in_old_order = [key for key in old_keys if key in new_key_set]
+    if kept_in_new_order != kept_in_old_order:
+        patch["order"] = [list(key) for key in kept_in_new_order]
+    return patch
+
+
+def is_empty(patch: dict) -> bool:
+    return not (patch["removed"] or patch["changed"] or patch["added"] or patch.get("order"))
+
+
+def check_base(old_records: list[dict], patch: dict, raw: bytes | None = None) -> None:
+    """Raise ValueError unless old_records (and raw, when given) are the patch's base release."""
+    base = patch.get("base") or {}
+    if base.get("records") is not None and len(old_records) != base["records"]:
+        raise ValueError(f"Patch expects a base of {base['records']} records, got {len(old_records)}")
+    if raw is not None and base.get("sha256") and hashlib.sha256(raw).hexdigest() != base["sha256"]:
+        raise ValueError("Patch was made against a different base release (sha256 mismatch)")
+
+
+def apply_patch(old_records: list[dict], patch: dict, raw: bytes | None = None) -> list[dict]:
+    """Rebuild the new release from the old one. Does not mutate old_records.
+
+    raw is the old file's bytes; pass it so the base sha256 is checked too.
+    """
+    if patch.get("version") != PATCH_VERSION:
+        raise ValueError(f"Unsupported patch version: {patch.get('version')}")
+    check_base(old_records, patch, raw)
+
+    keys = record_keys(old_records)
+    by_key = {key: dict(record) for key, record in zip(keys, old_records)}
+
+    for key in patch["removed"]:
+        by_key.pop(tuple(key), None)
+    for change in patch["changed"]:
+        record = by_key.get(tuple(change["key"]))
+        if record is None:
+            raise ValueError(f"Patch changes missing record {change['key']}")
+        record.update(change.get("set", {}))
+        for field in change.get("unset", []):
+            record.pop(field, None)
+
+    if "order" in patch:
+        kept = [by_key[tuple(key)] for key in patch["order"]]
+    else:
+        kept = [by_key[key] for key in keys if key in by_key]
+
+    # Merge the kept records with the additions (ascending new-file indexes) in one pass.
+    result: list[dict] = []
+    position = 0
+    for index, record in patch["added"]:
+        if index < len(result):
+            raise ValueError(f"Patch additions are not in ascending order at index {index}")
+        take = index - len(result)
+        if position + take > len(kept):
+            raise ValueError(f"Patch adds a record at index {index}, past the end of the file")
+        result.extend(kept[position:position + take])
+        position += take
+        result.append(record)
+    result.extend(kept[position:])
+
+    target = patch.get("target")
+    if target and target.get("records") is not None and len(result) != target["records"]:
+        raise ValueError(
+            f"Patched file has {len(result)} records, expected {target['records']}"
+        )
+    return result
@@ -0,0 +1,29 @@
+"""Distance helpers shared by the build scripts."""
+
+from __future__ import annotations
+
+import math
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_MILE = 1609.344
+EARTH_RADIUS_MI = EARTH_RADIUS_M / METERS_PER_MILE
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """Great-circle distance between two WGS84 points, in meters."""
+    rlat1, rlat2 = math.radians(lat1), math.radians(lat2)
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def local_miles(lat1, lon1, lat2, lon2):
+    """Equirectangular distance in miles, scaled by the cosine of the mean latitude.
+
+    Accurate to well under 1% over the few-mile spans the matchers work with and
+    several times cheaper than haversine.
+    """
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return EARTH_RADIUS_MI * math.hypot(x, y)
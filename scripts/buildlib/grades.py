@@ -0,0 +1,101 @@
+"""Smoothed grade per elevation-profile sample and an index of steep segments.
+
+The grade of a sample is the mean slope over a window centred on it:
+(elevation at d + w/2 - elevation at d - w/2) / w, with elevations linearly
+interpolated on distance and the window clipped at the trail ends. That
+smooths DEM noise without shifting climbs, and it is one vectorized
+np.interp pass over the whole profile. Grades are percent, one decimal, and
+positive northbound (increasing mile).
+
+Steep segments are maximal runs of samples whose grade is at least
+steep_pct in one direction, at least min_miles long. The index groups them by
+section in mile order:
+
+    {"gradeWindowMiles": 0.2, "steepGradePct": 10.0, "minMiles": 0.1,
+     "trailEnd": 480.398,
+     "sections": [{"section": 1, "startMile": 0, "endMile": 61.2,
+                   "climbs": [{"startMile", "endMile", "miles", "gainFt", "maxGradePct"}],
+                   "descents": [...]}]}
+
+gainFt is signed (negative for descents) and maxGradePct is the steepest
+sample in the run, so southbound hikers read descents as climbs.
+"""
+
+from __future__ import annotations
+
+from .sections import section_index, section_ranges
+
+GRADES_FILE = "steep-segments.json"
+GRADE_WINDOW_MILES = 0.2  # ~320 m; 0.1 mi still lets single DEM spikes read as 45%+
+STEEP_GRADE_PCT = 10.0
+MIN_STEEP_MILES = 0.1
+FEET_PER_MILE = 5280
+
+
+def smoothed_grades(distances: list[float], elevations: list[float], window_miles: float) -> list[float]:
+    """Percent grade at every sample over a window_miles-wide centred window."""
+    import numpy as np
+
+    d = np.asarray(distances, dtype=float)
+    e = np.asarray(elevations, dtype=float)
+    half = window_miles / 2
+    lo = np.maximum(d - half, d[0])
+    hi = np.minimum(d + half, d[-1])
+    run_ft = (hi - lo) * FEET_PER_MILE
+    rise_ft = np.interp(hi, d, e) - np.interp(lo, d, e)
+    grades = np.divide(rise_ft, run_ft, out=np.zeros_like(rise_ft), where=run_ft > 0) * 100
+    return np.round(grades, 1).tolist()
+
+
+def steep_segments(distances: list[float], elevations: list[float], grades: list[float],
+                   steep_pct: float, min_miles: float) -> list[dict]:
+    """Runs of samples at or beyond steep_pct (either sign), in mile order."""
+    import numpy as np
+
+    g = np.asarray(grades, dtype=float)
+    direction = np.where(g >= steep_pct, 1, np.where(g <= -steep_pct, -1, 0))
+    breaks = np.flatnonzero(np.diff(direction)) + 1
+    starts = [0] + breaks.tolist()
+    ends = [b - 1 for b in breaks.tolist()] + [len(g) - 1]
+    segments = []
+    for start, end in zip(starts, ends):
+        sign = int(direction[start])
+        miles = distances[end] - distances[start]
+        if sign == 0 or miles < min_miles:
+            continue
+        run = g[start:end + 1]
+        segments.append({
+            "startMile": distances[start],
+            "endMile": distances[end],
+            "miles": round(miles, 2),
+            "gainFt": int(round(elevations[end] - elevations[start])),
+            "maxGradePct": float(run.max() if sign > 0 else run.min()),
+        })
+    return segments
+
+
+def grade_profile(trail: str, profile: list[dict], window_miles: float = GRADE_WINDOW_MILES,
+                  steep_pct: float = STEEP_GRADE_PCT, min_miles: float = MIN_STEEP_MILES) -> dict:
+    """Set "grade" on every profile sample (in place) and return the steep-segment index."""
+    distances = [p["distance"] for p in profile]
+    elevations = [p["elevation"] for p in profile]
+    grades = smoothed_grades(distances, elevations, window_miles)
+    for sample, grade in zip(profile, grades):
+        sample["grade"] = grade
+
+    trail_end = distances[-1]
+    ranges = section_ranges(trail, trail_end)
+    sections = [
+        {"section": r["section"], "startMile": r["startMile"], "endMile": r["endMile"], "climbs": [], "descents": []}
+        for r in ranges
+    ]
+    for segment in steep_segments(distances, elevations, grades, steep_pct, min_miles):
+        entry = sections[section_index(ranges, segment["startMile"])]
+        entry["climbs" if segment["maxGradePct"] > 0 else "descents"].append(segment)
+    return {
+        "gradeWindowMiles": window_miles,
+        "steepGradePct": steep_pct,
+        "minMiles": min_miles,
+        "trailEnd": trail_end,
+        "sections": sections,
+    }
@@ -0,0 +1,212 @@
+"""Content-hash manifest for the published data assets.
+
+public/data-manifest.json lists every JSON/GeoJSON data file the app fetches
+(public/*.json, public/trails/<trail>/*.json and the per-section bundles) with
+its SHA-256, byte size and record count. The service worker can diff two
+manifests and refetch only the assets whose hash changed, and the build can
+refuse an output whose size moved by more than expected.
+
+Every build script hands its outputs to publish(), which checks their sizes
+against the manifest before anything is written, then writes them (each via
+a temp file renamed over the target) and the manifest. A build whose output
+size is meant to move past the limit passes --allow-size-change. The
+standalone scripts/build-data-manifest.py rescans everything.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from . import PUBLIC_DIR
+from .trace import traced
+
+MANIFEST_PATH = PUBLIC_DIR / "data-manifest.json"
+MANIFEST_VERSION = 1
+DATA_PATTERNS = [
+    "*.json", "*.geojson", "sections/*.json",
+    "trails/*/*.json", "trails/*/*.geojson", "trails/*/sections/*.json",
+]
+# The PWA manifest and this file itself are not data assets.
+EXCLUDED = {"manifest.json", MANIFEST_PATH.name}
+# Fractional size change (relative to the previous manifest) above which a
+# rebuilt asset is treated as a probable build error.
+MAX_SIZE_CHANGE = 0.5
+ALLOW_SIZE_CHANGE_FLAG = "--allow-size-change"
+
+
+def asset_key(path: Path) -> str:
+    """URL path of an asset relative to public/ (e.g. "trails/nnml/water.json")."""
+    return Path(path).resolve().relative_to(PUBLIC_DIR).as_posix()
+
+
+def record_count(data) -> int | None:
+    """Number of records in a parsed data file: list items or GeoJSON features."""
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        if isinstance(data.get("features"), list):
+            return len(data["features"])
+        return len(data)
+    return None
+
+
+def asset_entry(path: Path, raw: bytes | None = None) -> dict:
+    """Manifest entry for a file, or for the bytes about to be written to it."""
+    raw = Path(path).read_bytes() if raw is None else raw
+    try:
+        records = record_count(json.loads(raw))
+    except ValueError:
+        records = None
+    return {
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "bytes": len(raw),
+        "records": records,
+    }
+
+
+def scan_assets(public_dir: Path = PUBLIC_DIR) -> list[Path]:
+    found = set()
+    for pattern in DATA_PATTERNS:
+        for path in public_dir.glob(pattern):
+            if path.is_file() and path.name not in EXCLUDED:
+                found.add(path)
+    return sorted(found)
+
+
+def finalize(assets: dict[str, dict]) -> dict:
+    """Wrap asset entries with a combined hash so clients can short-circuit."""
+    ordered = {key: assets[key] for key in sorted(assets)}
+    combined = hashlib.sha256(
+        "".join(f"{key}:{entry['sha256']}\n" for key, entry in ordered.items()).encode()
+    ).hexdigest()
+    return {"version": MANIFEST_VERSION, "sha256": combined, "assets": ordered}
+
+
+def build_manifest(paths: list[Path] | None = None) -> dict:
+    paths = scan_assets() if paths is None else paths
+    return finalize({asset_key(p): asset_entry(p) for p in paths})
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    if not path.exists():
+        return finalize({})
+    return json.loads(path.read_text())
+
+
+def diff_manifests(old: dict, new: dict) -> dict[str, list[str]]:
+    old_assets, new_assets = old.get("assets", {}), new.get("assets", {})
+    return {
+        "added": sorted(k for k in new_assets if k not in old_assets),
+        "removed": sorted(k for k in old_assets if k not in new_assets),
+        "changed": sorted(
+            k for k in new_assets
+            if k in old_assets and new_assets[k]["sha256"] != old_assets[k]["sha256"]
+        ),
+    }
+
+
+def size_violations(old: dict, new: dict, max_change: float = MAX_SIZE_CHANGE) -> list[str]:
+    """Describe every changed asset whose byte size moved by more than max_change."""
+    problems = []
+    old_assets = old.get("assets", {})
+    for key in diff_manifests(old, new)["changed"]:
+        before = old_assets[key]["bytes"]
+        after = new["assets"][key]["bytes"]
+        if before and abs(after - before) / before > max_change:
+            problems.append(f"{key}: {before:,} -> {after:,} bytes ({(after - before) / before:+.0%})")
+    return problems
+
+
+def write_manifest(manifest: dict, path: Path = MANIFEST_PATH) -> None:
+    path.write_text(json.dumps(manifest, indent=2) + "\n")
+
+
+def write_atomic(path: Path, content: str | bytes) -> None:
+    """Write via a temp file in the same directory and rename over the target."""
+    path = Path(path)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content.encode() if isinstance(content, str) else content)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def add_manifest_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(ALLOW_SIZE_CHANGE_FLAG, action="store_true",
+                        help=f"Publish outputs whose size moved by more than {MAX_SIZE_CHANGE:.0%} "
+                             "against data-manifest.json (an intended change).")
+
+
+@traced("publish")
+def publish(outputs: dict[Path, str | bytes], allow_size_change: bool = False) -> dict:
+    """Write the given {path: content} outputs and merge them into the manifest.
+
+    Sizes are checked first: if any output would change size by more than
+    MAX_SIZE_CHANGE, exits with an error before writing anything, unless
+    allow_size_change is set.
+    """
+    contents = {Path(path): c.encode() if isinstance(c, str) else c for path, c in outputs.items()}
+    old = load_manifest()
+    assets = dict(old.get("assets", {}))
+    for path, raw in contents.items():
+        assets[asset_key(path)] = asset_entry(path, raw)
+    new = finalize(assets)
+    if not allow_size_change:
+        problems = size_violations(old, new)
+        if problems:
+            raise SystemExit(
+                f"Unexpected output size change (limit {MAX_SIZE_CHANGE:.0%}; nothing written, "
+                f"pass {ALLOW_SIZE_CHANGE_FLAG} if intended):\n  " + "\n  ".join(problems)
+            )
+    for path, raw in contents.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, raw)
+    write_manifest(new)
+    changes = diff_manifests(old, new)
+    print(
+        f"data-manifest.json: {len(changes['changed'])} changed, "
+        f"{len(changes['added'])} added"
+    )
+    return new
+
+
+@traced("update manifest")
+def update_manifest(paths: list[Path], max_size_change: float | None = MAX_SIZE_CHANGE) -> dict:
+    """Re-hash outputs that are already on disk, merge them into the manifest and write it.
+
+    For files another tool rewrote after publish(); the size gate here can
+    only refuse the manifest update, not the write. Exits with an error
+    (without touching the manifest) if any output changed size by more than
+    max_size_change; pass None to skip that check.
+    """
+    old = load_manifest()
+    assets = dict(old.get("assets", {}))
+    for path in paths:
+        if Path(path).exists():
+            assets[asset_key(path)] = asset_entry(path)
+    new = finalize(assets)
+    if max_size_change is not None:
+        problems = size_violations(old, new, max_size_change)
+        if problems:
+            raise SystemExit(
+                "Unexpected output size change (limit "
+                f"{max_size_change:.0%}):\n  " + "\n  ".join(problems)
+            )
+    write_manifest(new)
+    changes = diff_manifests(old, new)
+    print(
+        f"data-manifest.json: {len(changes['changed'])} changed, "
+        f"{len(changes['added'])} added"
+    )
+    return new
@@ -0,0 +1,120 @@
+"""Near-duplicate text clustering with MinHash signatures and LSH banding.
+
+Each text is normalized (case, punctuation, whitespace) and cut into character
+shingles; a one-permutation MinHash signature of NUM_HASHES values
+approximates the Jaccard similarity of two shingle sets. Signatures are split into BANDS bands and
+hashed into buckets, so only texts that collide in some band are ever compared
+— the work grows with the number of texts rather than with the number of
+pairs. Candidate pairs are then confirmed with the exact shingle Jaccard and
+joined into clusters with union-find.
+
+Hashing uses crc32 and a fixed multiplier, so clusters are stable between runs.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections import defaultdict
+
+SHINGLE_CHARS = 4
+NUM_HASHES = 64
+BANDS = 16  # 4 rows per band: pairs above ~0.5 Jaccard collide in some band
+THRESHOLD = 0.8
+MAX_BUCKET = 64  # buckets up to this size compare all pairs (<= 2016 Jaccards)
+_MASK = (1 << 32) - 1
+_MIX = 0x9E3779B1  # odd multiplier spreading crc32 bits before binning
+
+
+def normalize(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text: str, k: int = SHINGLE_CHARS) -> set[int]:
+    """crc32 hashes of the k-character shingles of normalized text."""
+    text = normalize(text)
+    if len(text) <= k:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[i:i + k].encode()) for i in range(len(text) - k + 1)}
+
+
+def signature(hashes: set[int]) -> tuple[int, ...]:
+    """One-permutation MinHash: one pass over the shingles fills NUM_HASHES bins.
+
+    Each mixed hash lands in bin (h % NUM_HASHES) and the bin keeps its
+    minimum; empty bins borrow the next non-empty bin's value (rotation
+    densification) so short texts still get a full signature.
+    """
+    bins = [None] * NUM_HASHES
+    for h in hashes:
+        h = (h * _MIX) & _MASK
+        slot, value = h % NUM_HASHES, h // NUM_HASHES
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    if None in bins:
+        filled = [i for i, v in enumerate(bins) if v is not None]
+        for i in range(NUM_HASHES):
+            if bins[i] is None:
+                j = next((f for f in filled if f > i), filled[0])
+                bins[i] = bins[j] + (j - i) % NUM_HASHES * _MASK
+    return tuple(bins)
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster(texts: list[str], threshold: float = THRESHOLD) -> list[list[int]]:
+    """Indexes of texts grouped into near-duplicate clusters (size >= 2).
+
+    Identical normalized texts share one signature, so each distinct text is
+    hashed once. Clusters are sorted by size, then by first index.
+    """
+    distinct: dict[str, int] = {}
+    members: list[list[int]] = []
+    for i, text in enumerate(texts):
+        key = normalize(text)
+        if not key:
+            continue
+        if key not in distinct:
+            distinct[key] = len(members)
+            members.append([])
+        members[distinct[key]].append(i)
+    keys = list(distinct)
+    shingle_sets = [shingles(key) for key in keys]
+
+    rows = NUM_HASHES // BANDS
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for d, hashes in enumerate(shingle_sets):
+        sig = signature(hashes)
+        for band in range(BANDS):
+            buckets[(band, sig[band * rows:(band + 1) * rows])].append(d)
+
+    # Members of a bucket are compared pairwise. A bucket larger than
+    # MAX_BUCKET (boilerplate shared by many texts) would cost quadratic
+    # time, so there each member is checked only against the bucket's first
+    # entry and its predecessor: a near-duplicate pair that matches neither
+    # and shares no other bucket is then missed.
+    parent = list(range(len(keys)))
+    for bucket in buckets.values():
+        for y in range(1, len(bucket)):
+            others = range(y) if len(bucket) <= MAX_BUCKET else {0, y - 1}
+            for x in others:
+                a, b = _find(parent, bucket[x]), _find(parent, bucket[y])
+                if a != b and jaccard(shingle_sets[bucket[x]], shingle_sets[bucket[y]]) >= threshold:
+                    parent[a] = b
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for d in range(len(keys)):
+        groups[_find(parent, d)].extend(members[d])
+    clusters = [sorted(g) for g in groups.values() if len(g) >= 2]
+    clusters.sort(key=lambda g: (-len(g), g[0]))
+    return clusters
@@ -0,0 +1,63 @@
+"""Cumulative estimated hiking time along an elevation profile.
+
+hiking-times.json sits next to elevation-profile.json and holds two arrays
+aligned index-for-index with the profile samples, cumulative hours from mile 0:
+
+    {"model": "tobler", "samples": 21433,
+     "hours": [0, 0.01, ...],       walking northbound (increasing mile)
+     "hoursSobo": [0, 0.01, ...]}   the same stretch walked southbound
+
+so the time between any two samples in either direction is one subtraction.
+The client scales the difference by the hiker's own pace multiplier; the
+arrays are for a 1.0x hiker. They live beside the profile rather than in it
+because two more keys per sample would grow the profile by ~60%.
+
+Segment slopes come from the smoothed per-sample grades (buildlib/grades.py),
+averaged over the segment's two ends, so DEM noise does not inflate the
+estimate. Models, given horizontal distance and slope s (rise/run):
+
+    tobler    Tobler's hiking function, 6 km/h * exp(-3.5 |s + 0.05|);
+              fastest on a gentle descent, so the two directions differ
+    naismith  3 mph on the flat plus one hour per 2,000 ft climbed
+"""
+
+from __future__ import annotations
+
+TIMES_FILE = "hiking-times.json"
+PACE_MODELS = ["tobler", "naismith"]
+DEFAULT_PACE_MODEL = "tobler"
+KM_PER_MILE = 1.609344
+FEET_PER_MILE = 5280
+NAISMITH_MPH = 3.0
+NAISMITH_CLIMB_FT_PER_HOUR = 2000.0
+
+
+def segment_hours(miles, slopes, model: str):
+    """Hours for each segment (numpy arrays of miles and rise/run slopes)."""
+    import numpy as np
+
+    if model == "tobler":
+        kmh = 6.0 * np.exp(-3.5 * np.abs(slopes + 0.05))
+        return miles * KM_PER_MILE / kmh
+    if model == "naismith":
+        climb_ft = np.maximum(slopes, 0.0) * miles * FEET_PER_MILE
+        return miles / NAISMITH_MPH + climb_ft / NAISMITH_CLIMB_FT_PER_HOUR
+    raise ValueError(f"unknown pace model {model!r} (expected one of {', '.join(PACE_MODELS)})")
+
+
+def hiking_times(profile: list[dict], model: str = DEFAULT_PACE_MODEL) -> dict:
+    """hiking-times.json content for a graded profile (samples need "grade")."""
+    import numpy as np
+
+    distances = np.asarray([p["distance"] for p in profile], dtype=float)
+    grades = np.asarray([p["grade"] for p in profile], dtype=float) / 100
+    miles = np.diff(distances)
+    slopes = (grades[:-1] + grades[1:]) / 2
+    nobo = np.concatenate(([0.0], np.cumsum(segment_hours(miles, slopes, model))))
+    sobo = np.concatenate(([0.0], np.cumsum(segment_hours(miles, -slopes, model))))
+    return {
+        "model": model,
+        "samples": len(profile),
+        "hours": np.round(nobo, 2).tolist(),
+        "hoursSobo": np.round(sobo, 2).tolist(),
+    }
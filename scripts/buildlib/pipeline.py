@@ -0,0 +1,87 @@
+"""Load-once / write-once pipeline for in-place JSON data transforms.
+
+The NNML post-processing steps (legend cleanup, databook repair, comment
+attachment) each edit the same published files. A Pipeline loads every file
+once, runs its registered transforms in order on the in-memory records, and
+writes each file once at the end — atomically, and only if its serialized
+content actually changed. Each transform receives {filename: records} and
+returns how many fields/records it changed; the pipeline reports timing and
+change counts per transform.
+
+Derived files computed from the final records (e.g. summaries) can be added
+with add_output(); they follow the same write-once, only-if-changed rule.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+from .manifest import publish
+from .trace import span
+
+Transform = Callable[[dict[str, list[dict]]], int]
+
+
+def serialize(data, compact: bool = False) -> str:
+    """The published layout of the NNML JSON files (compact for derived indexes)."""
+    if compact:
+        return json.dumps(data, separators=(",", ":")) + "\n"
+    return json.dumps(data, indent=2) + "\n"
+
+
+class Pipeline:
+    def __init__(self, data_dir: Path, filenames: list[str]):
+        self.data_dir = data_dir
+        self.filenames = filenames
+        self.transforms: list[tuple[str, Transform]] = []
+        self.outputs: list[tuple[str, Callable[[dict[str, list[dict]]], object]]] = []
+
+    def register(self, name: str, transform: Transform) -> "Pipeline":
+        self.transforms.append((name, transform))
+        return self
+
+    def add_output(self, filename: str, build: Callable[[dict[str, list[dict]]], object]) -> "Pipeline":
+        """Also write data_dir/filename (compact JSON) from the transformed records."""
+        self.outputs.append((filename, build))
+        return self
+
+    def run(self, write: bool = True, allow_size_change: bool = False) -> list[Path]:
+        """Run every transform; returns the files written (or that would be).
+
+        The changed files are written together through manifest.publish(), so
+        a size-gate failure leaves every file untouched.
+        """
+        with span("load", files=len(self.filenames)):
+            originals = {
+                filename: (self.data_dir / filename).read_text()
+                for filename in self.filenames
+                if (self.data_dir / filename).exists()
+            }
+            datasets = {filename: json.loads(text) for filename, text in originals.items()}
+
+        for name, transform in self.transforms:
+            start_wall, start_cpu = time.perf_counter(), time.process_time()
+            with span(name):
+                changes = transform(datasets)
+            print(f"[{name}] {changes} change(s) in {time.perf_counter() - start_wall:.2f} s "
+                  f"(cpu {time.process_time() - start_cpu:.2f} s)")
+
+        with span("serialize"):
+            texts = {filename: serialize(data) for filename, data in datasets.items()}
+            for filename, build in self.outputs:
+                path = self.data_dir / filename
+                originals[filename] = path.read_text() if path.exists() else None
+                texts[filename] = serialize(build(datasets), compact=True)
+
+        changed = {self.data_dir / filename: text for filename, text in texts.items()
+                   if text != originals[filename]}
+        if write and changed:
+            with span("write"):
+                publish(changed, allow_size_change)
+        verb = "wrote" if write else "would write"
+        print(f"{verb} {len(changed)} of {len(texts)} file(s)"
+              + (f": {', '.join(p.name for p in changed)}" if changed else ""))
+        return list(changed)
@@ -0,0 +1,345 @@
+"""Minimal PMTiles v3 reader and writer (https://github.com/protomaps/PMTiles).
+
+Enough of the spec to cut an existing archive into smaller ones: read the
+header, metadata and (leaf) directories, look tiles up by z/x/y, and write a
+clustered archive from (tile id, tile bytes) pairs with gzip-compressed
+directories, run-length entries for repeated tiles and leaf directories when
+the root would not fit in the first 16 KiB. Tile bytes are copied as stored
+(the tile compression of the source is kept), so no tile is decoded.
+
+Tile ids and the header layout follow public/lib/pmtiles.js.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+from pathlib import Path
+from typing import NamedTuple
+
+MAGIC = b"PMTiles"
+HEADER_SIZE = 127
+HEADER_FORMAT = "<7sB11Q4B2B4iB2i"
+ROOT_BUDGET = 16384 - HEADER_SIZE
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+MAX_ZOOM = 26
+
+
+class Entry(NamedTuple):
+    tile_id: int
+    offset: int
+    length: int
+    run_length: int  # 0 marks a leaf directory
+
+
+class Header(NamedTuple):
+    root_offset: int
+    root_length: int
+    metadata_offset: int
+    metadata_length: int
+    leaf_offset: int
+    leaf_length: int
+    data_offset: int
+    data_length: int
+    addressed_tiles: int
+    tile_entries: int
+    tile_contents: int
+    clustered: int
+    internal_compression: int
+    tile_compression: int
+    tile_type: int
+    min_zoom: int
+    max_zoom: int
+    min_lon_e7: int
+    min_lat_e7: int
+    max_lon_e7: int
+    max_lat_e7: int
+    center_zoom: int
+    center_lon_e7: int
+    center_lat_e7: int
+
+
+# ---- tile ids (Hilbert curve order within each zoom) ----
+
+def _rotate(n: int, x: int, y: int, rx: int, ry: int) -> tuple[int, int]:
+    if ry == 0:
+        if rx == 1:
+            x, y = n - 1 - x, n - 1 - y
+        x, y = y, x
+    return x, y
+
+
+def zxy_to_tile_id(z: int, x: int, y: int) -> int:
+    if z > MAX_ZOOM:
+        raise ValueError(f"zoom {z} exceeds {MAX_ZOOM}")
+    acc = ((1 << (2 * z)) - 1) // 3  # tiles on all lower zooms
+    d = 0
+    s = (1 << z) >> 1
+    while s > 0:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        d += s * s * ((3 * rx) ^ ry)
+        x, y = _rotate(s, x, y, rx, ry)
+        s >>= 1
+    return acc + d
+
+
+def tile_id_to_zxy(tile_id: int) -> tuple[int, int, int]:
+    acc = 0
+    for z in range(MAX_ZOOM + 1):
+        count = 1 << (2 * z)
+        if acc + count > tile_id:
+            t = tile_id - acc
+            x = y = 0
+            s = 1
+            while s < (1 << z):
+                rx = 1 & (t // 2)
+                ry = 1 & (t ^ rx)
+                x, y = _rotate(s, x, y, rx, ry)
+                x += s * rx
+                y += s * ry
+                t //= 4
+                s *= 2
+            return z, x, y
+        acc += count
+    raise ValueError(f"tile id {tile_id} exceeds zoom {MAX_ZOOM}")
+
+
+# ---- directories ----
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def serialize_directory(entries: list[Entry]) -> bytes:
+    out = bytearray()
+    _write_varint(out, len(entries))
+    last = 0
+    for e in entries:
+        _write_varint(out, e.tile_id - last)
+        last = e.tile_id
+    for e in entries:
+        _write_varint(out, e.run_length)
+    for e in entries:
+        _write_varint(out, e.length)
+    for i, e in enumerate(entries):
+        contiguous = i > 0 and e.offset == entries[i - 1].offset + entries[i - 1].length
+        _write_varint(out, 0 if contiguous else e.offset + 1)
+    return bytes(out)
+
+
+def deserialize_directory(buf: bytes) -> list[Entry]:
+    count, pos = _read_varint(buf, 0)
+    ids, runs, lengths = [], [], []
+    last = 0
+    for _ in range(count):
+        delta, pos = _read_varint(buf, pos)
+        last += delta
+        ids.append(last)
+    for _ in range(count):
+        value, pos = _read_varint(buf, pos)
+        runs.append(value)
+    for _ in range(count):
+        value, pos = _read_varint(buf, pos)
+        lengths.append(value)
+    entries = []
+    for i in range(count):
+        value, pos = _read_varint(buf, pos)
+        offset = entries[-1].offset + entries[-1].length if value == 0 and i > 0 else value - 1
+        entries.append(Entry(ids[i], offset, lengths[i], runs[i]))
+    return entries
+
+
+def decompress(data: bytes, compression: int) -> bytes:
+    if compression in (0, COMPRESSION_NONE):
+        return data
+    if compression == COMPRESSION_GZIP:
+        return gzip.decompress(data)
+    raise SystemExit(f"PMTiles internal compression {compression} is not supported (only none/gzip)")
+
+
+def _find(entries: list[Entry], tile_id: int) -> Entry | None:
+    lo, hi = 0, len(entries) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if entries[mid].tile_id < tile_id:
+            lo = mid + 1
+        elif entries[mid].tile_id > tile_id:
+            hi = mid - 1
+        else:
+            return entries[mid]
+    if hi >= 0:
+        entry = entries[hi]
+        if entry.run_length == 0 or tile_id - entry.tile_id < entry.run_length:
+            return entry
+    return None
+
+
+# ---- reading ----
+
+def is_archive(path: Path) -> bool:
+    """True if path exists and starts with the PMTiles magic (not, e.g., a Git LFS pointer)."""
+    path = Path(path)
+    if not path.is_file():
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class Reader:
+    """Random access to one archive; directories are cached as they are read."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.file = open(self.path, "rb")
+        raw = self.file.read(HEADER_SIZE)
+        if len(raw) < HEADER_SIZE or raw[:7] != MAGIC:
+            self.file.close()
+            raise SystemExit(f"{self.path} is not a PMTiles archive (a Git LFS pointer? run `git lfs pull`)")
+        fields = struct.unpack(HEADER_FORMAT, raw)
+        if fields[1] != 3:
+            self.file.close()
+            raise SystemExit(f"{self.path}: PMTiles spec version {fields[1]} is not supported (need 3)")
+        self.header = Header(*fields[2:])
+        self.root = self._directory(self.header.root_offset, self.header.root_length)
+        self.leaves: dict[int, list[Entry]] = {}
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def _directory(self, offset: int, length: int) -> list[Entry]:
+        return deserialize_directory(decompress(self._read(offset, length), self.header.internal_compression))
+
+    def metadata(self) -> dict:
+        if not self.header.metadata_length:
+            return {}
+        raw = self._read(self.header.metadata_offset, self.header.metadata_length)
+        return json.loads(decompress(raw, self.header.internal_compression))
+
+    def locate(self, tile_id: int) -> tuple[int, int] | None:
+        """(absolute offset, length) of a tile's bytes, or None if absent."""
+        entries = self.root
+        for _ in range(4):  # root + at most 3 leaf levels, per the spec
+            entry = _find(entries, tile_id)
+            if entry is None:
+                return None
+            if entry.run_length:
+                return self.header.data_offset + entry.offset, entry.length
+            offset = self.header.leaf_offset + entry.offset
+            if offset not in self.leaves:
+                self.leaves[offset] = self._directory(offset, entry.length)
+            entries = self.leaves[offset]
+        return None
+
+    def read_at(self, location: tuple[int, int]) -> bytes:
+        return self._read(*location)
+
+    def get(self, z: int, x: int, y: int) -> bytes | None:
+        location = self.locate(zxy_to_tile_id(z, x, y))
+        return None if location is None else self.read_at(location)
+
+
+# ---- writing ----
+
+def _compress(data: bytes) -> bytes:
+    return gzip.compress(data, mtime=0)
+
+
+def _directories(entries: list[Entry]) -> tuple[bytes, bytes]:
+    """(root, leaf section) with the root small enough for the first 16 KiB."""
+    root = _compress(serialize_directory(entries))
+    if len(root) <= ROOT_BUDGET:
+        return root, b""
+    leaf_size = 4096
+    while True:
+        pointers, leaves = [], bytearray()
+        for i in range(0, len(entries), leaf_size):
+            chunk = _compress(serialize_directory(entries[i:i + leaf_size]))
+            pointers.append(Entry(entries[i].tile_id, len(leaves), len(chunk), 0))
+            leaves += chunk
+        root = _compress(serialize_directory(pointers))
+        if len(root) <= ROOT_BUDGET:
+            return root, bytes(leaves)
+        leaf_size *= 2
+
+
+def write_archive(path: Path, tiles, metadata: dict, template: Header,
+                  bounds: tuple[float, float, float, float] | None = None) -> dict:
+    """Write a clustered archive from (tile_id, content_key, bytes) in tile-id order.
+
+    Tiles sharing content_key (e.g. their offset in the source archive) are
+    stored once; consecutive ids with the same content become one run.
+    template supplies the tile type and compression. Returns counts.
+    """
+    entries: list[Entry] = []
+    stored: dict[object, tuple[int, int]] = {}
+    data = bytearray()
+    zooms = set()
+    addressed = 0
+    for tile_id, key, content in tiles:
+        addressed += 1
+        zooms.add(tile_id_to_zxy(tile_id)[0])
+        if key not in stored:
+            stored[key] = (len(data), len(content))
+            data += content
+        offset, length = stored[key]
+        last = entries[-1] if entries else None
+        if last and last.offset == offset and last.tile_id + last.run_length == tile_id:
+            entries[-1] = last._replace(run_length=last.run_length + 1)
+        else:
+            entries.append(Entry(tile_id, offset, length, 1))
+
+    root, leaves = _directories(entries)
+    meta = _compress(json.dumps(metadata, separators=(",", ":")).encode())
+    root_offset = HEADER_SIZE
+    meta_offset = root_offset + len(root)
+    leaf_offset = meta_offset + len(meta)
+    data_offset = leaf_offset + len(leaves)
+    if bounds:
+        west, south, east, north = bounds
+        box = [round(west * 1e7), round(south * 1e7), round(east * 1e7), round(north * 1e7)]
+        center = [round((box[0] + box[2]) / 2), round((box[1] + box[3]) / 2)]
+    else:
+        box = [template.min_lon_e7, template.min_lat_e7, template.max_lon_e7, template.max_lat_e7]
+        center = [template.center_lon_e7, template.center_lat_e7]
+    min_zoom, max_zoom = (min(zooms), max(zooms)) if zooms else (template.min_zoom, template.max_zoom)
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, 3,
+        root_offset, len(root), meta_offset, len(meta), leaf_offset, len(leaves), data_offset, len(data),
+        addressed, len(entries), len(stored),
+        1, COMPRESSION_GZIP, template.tile_compression, template.tile_type, min_zoom, max_zoom,
+        *box, min(max(template.center_zoom, min_zoom), max_zoom), *center,
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(root)
+        f.write(meta)
+        f.write(leaves)
+        f.write(data)
+    return {"tiles": addressed, "entries": len(entries), "contents": len(stored), "bytes": data_offset + len(data)}
@@ -0,0 +1,177 @@
+"""Columnar, memory-mapped copy of a trail's route geometry.
+
+The JS build writes route_line.geojson and alternates.geojson; every Python
+stage that needs the route used to json.load them into nested lists again.
+build_store() converts a line GeoJSON once into a directory of .npy columns
+next to it (build/<trail>/route-store/<stem>.*.npy):
+
+    lon, lat   float64 WGS84 vertex coordinates
+    meters     float64 cumulative distance from the first vertex, walking the
+               segments in file order (the gap between consecutive segments
+               is counted, as build-elevation-profile.py always has)
+    segment    int32 segment id: each LineString, or each part of a
+               MultiLineString, in file order
+
+plus a <stem>.json sidecar recording the source file's size and mtime, the
+segment offsets and the length within segments. open_store() maps the columns
+read-only with numpy's memmap, so repeated stages start without parsing and
+share the page cache; it rebuilds the store first when the GeoJSON changed
+(or, with write=False, builds the columns in memory without touching disk).
+
+numpy is imported inside the functions, so importing this module is cheap.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from .geo import haversine_m
+
+STORE_DIRNAME = "route-store"
+FORMAT_VERSION = 1
+COLUMNS = {"lon": "float64", "lat": "float64", "meters": "float64", "segment": "int32"}
+
+
+def store_paths(geojson_path: Path) -> tuple[Path, Path]:
+    """(store directory, sidecar path) for a line GeoJSON."""
+    geojson_path = Path(geojson_path)
+    directory = geojson_path.parent / STORE_DIRNAME
+    return directory, directory / f"{geojson_path.stem}.json"
+
+
+def _source_stamp(path: Path) -> dict:
+    stat = path.stat()
+    return {"bytes": stat.st_size, "mtimeNs": stat.st_mtime_ns}
+
+
+def _segments(geojson_path: Path) -> list[list[list[float]]]:
+    parts = []
+    for feature in json.loads(Path(geojson_path).read_text())["features"]:
+        geometry = feature["geometry"]
+        if geometry["type"] == "LineString":
+            parts.append(geometry["coordinates"])
+        elif geometry["type"] == "MultiLineString":
+            parts.extend(geometry["coordinates"])
+    return parts
+
+
+def _columns(geojson_path: Path) -> tuple[dict, dict]:
+    """(column lists, sidecar fields) for a line GeoJSON."""
+    lon, lat, meters, segment = [], [], [], []
+    offsets = []
+    cum = 0.0
+    inside = 0.0
+    prev = None
+    for seg_id, part in enumerate(_segments(geojson_path)):
+        offsets.append(len(lon))
+        first = True
+        for pt in part:
+            x, y = pt[0], pt[1]
+            if prev is not None:
+                step = haversine_m(prev[0], prev[1], x, y)
+                cum += step
+                if not first:
+                    inside += step
+            prev = (x, y)
+            first = False
+            lon.append(x)
+            lat.append(y)
+            meters.append(cum)
+            segment.append(seg_id)
+    offsets.append(len(lon))
+    columns = {"lon": lon, "lat": lat, "meters": meters, "segment": segment}
+    meta = {
+        "version": FORMAT_VERSION,
+        "source": geojson_path.name,
+        "sourceStamp": _source_stamp(geojson_path),
+        "count": len(lon),
+        "segmentOffsets": offsets,
+        "lengthMeters": inside,
+        "columns": COLUMNS,
+    }
+    return columns, meta
+
+
+def build_store(geojson_path: Path) -> Path:
+    """Write the .npy columns and sidecar for a line GeoJSON; returns the sidecar path."""
+    import numpy as np
+
+    geojson_path = Path(geojson_path)
+    directory, sidecar = store_paths(geojson_path)
+    columns, meta = _columns(geojson_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, dtype in COLUMNS.items():
+        np.save(directory / f"{geojson_path.stem}.{name}.npy", np.asarray(columns[name], dtype=dtype))
+    # The sidecar goes last: a store without one is incomplete and gets rebuilt.
+    sidecar.write_text(json.dumps(meta, indent=2) + "\n")
+    return sidecar
+
+
+class RouteStore:
+    """Read-only memmapped columns of one line GeoJSON (see the module docstring)."""
+
+    def __init__(self, geojson_path: Path):
+        import numpy as np
+
+        directory, sidecar = store_paths(geojson_path)
+        self.meta = json.loads(sidecar.read_text())
+        stem = Path(geojson_path).stem
+        for name in COLUMNS:
+            setattr(self, name, np.load(directory / f"{stem}.{name}.npy", mmap_mode="r"))
+
+    @classmethod
+    def in_memory(cls, geojson_path: Path) -> RouteStore:
+        """The same columns built in memory from the GeoJSON, writing nothing."""
+        import numpy as np
+
+        store = cls.__new__(cls)
+        columns, store.meta = _columns(Path(geojson_path))
+        for name, dtype in COLUMNS.items():
+            setattr(store, name, np.asarray(columns[name], dtype=dtype))
+        return store
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def length_meters(self) -> float:
+        """Length within segments (gaps between segments excluded)."""
+        return self.meta["lengthMeters"]
+
+    @property
+    def total_meters(self) -> float:
+        """Cumulative distance at the last vertex, gaps included (the elevation profile's measure)."""
+        return float(self.meters[-1]) if len(self) else 0.0
+
+    def segment_slices(self) -> list[slice]:
+        offsets = self.meta["segmentOffsets"]
+        return [slice(a, b) for a, b in zip(offsets, offsets[1:])]
+
+    def parts(self) -> list[list[tuple[float, float]]]:
+        """(lon, lat) vertex lists per segment, for code that walks plain tuples."""
+        return [list(zip(self.lon[s].tolist(), self.lat[s].tolist())) for s in self.segment_slices()]
+
+
+def is_current(geojson_path: Path) -> bool:
+    _, sidecar = store_paths(geojson_path)
+    if not sidecar.exists():
+        return False
+    try:
+        meta = json.loads(sidecar.read_text())
+    except ValueError:
+        return False
+    return meta.get("version") == FORMAT_VERSION and meta.get("sourceStamp") == _source_stamp(Path(geojson_path))
+
+
+def open_store(geojson_path: Path, write: bool = True) -> RouteStore:
+    """Memory-map the store for a line GeoJSON, (re)building it first if stale.
+
+    With write=False a stale or missing store is built in memory instead, so
+    read-only callers (validators) leave build/ untouched.
+    """
+    if not is_current(geojson_path):
+        if not write:
+            return RouteStore.in_memory(geojson_path)
+        build_store(geojson_path)
+    return RouteStore(geojson_path)
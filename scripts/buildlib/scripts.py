@@ -0,0 +1,32 @@
+"""Import the build scripts as modules.
+
+Most build scripts have hyphenated file names, so benchmarks and tools that
+reuse their functions load them by path instead of with a plain import.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from types import ModuleType
+
+from . import ROOT
+
+
+def load_script(relative_path: str) -> ModuleType:
+    """Load e.g. "scripts/extract-nnml-water-comments.py" without running main()."""
+    path = ROOT / relative_path
+    name = path.stem.replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        # Don't leave a half-initialized module behind (e.g. after an
+        # ImportError for an optional dependency).
+        del sys.modules[name]
+        raise
+    return module
@@ -0,0 +1,43 @@
+"""Trail section boundaries.
+
+ODT section starts live in build/sections.geojson; other trails publish them in
+public/trails/<trail>/sections.json.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+
+from . import trail_build_dir, trail_public_dir
+
+
+def load_sections(trail: str) -> list[tuple[int, str, float]]:
+    """Return [(section_number, name, start_mile)] sorted by start mile."""
+    if trail == "odt":
+        with open(trail_build_dir(trail) / "sections.geojson") as f:
+            features = json.load(f)["features"]
+        sections = [
+            (int(feat["properties"]["name"].split(":")[0]), feat["properties"]["name"], feat["properties"]["mile"])
+            for feat in features
+        ]
+    else:
+        with open(trail_public_dir(trail) / "sections.json") as f:
+            sections = [(s["section"], s["name"], s["mile"]) for s in json.load(f)]
+    return sorted(sections, key=lambda s: s[2])
+
+
+def section_ranges(trail: str, trail_end: float) -> list[dict]:
+    """Section dicts with startMile/endMile; the last one ends at trail_end."""
+    sections = load_sections(trail)
+    ranges = []
+    for i, (number, name, start) in enumerate(sections):
+        end = sections[i + 1][2] if i + 1 < len(sections) else trail_end
+        ranges.append({"section": number, "name": name, "startMile": start, "endMile": end})
+    return ranges
+
+
+def section_index(ranges: list[dict], mile: float) -> int:
+    """Position in `ranges` of the section containing mile (clamped to the ends)."""
+    starts = [r["startMile"] for r in ranges]
+    return max(bisect.bisect_right(starts, mile) - 1, 0)
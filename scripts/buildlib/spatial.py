@@ -0,0 +1,111 @@
+"""Grid-hash nearest-neighbour index over WGS84 points.
+
+Points are bucketed into cells of roughly `cell_miles` on a side (cell widths in
+longitude are scaled for the latitude of the data), so a nearest-within-radius
+query only visits the handful of cells around the query point instead of every
+point. Distances use buildlib.geo.local_miles.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+
+from .geo import EARTH_RADIUS_MI, local_miles
+
+MILES_PER_DEG_LAT = EARTH_RADIUS_MI * math.pi / 180
+
+
+class GridIndex:
+    def __init__(self, cell_miles: float = 0.5, ref_lat: float = 40.0):
+        self.cell_miles = cell_miles
+        self.lat_step = cell_miles / MILES_PER_DEG_LAT
+        self.lon_step = self.lat_step / max(math.cos(math.radians(ref_lat)), 0.01)
+        self.cells: dict[tuple[int, int], list[tuple[float, float, object]]] = defaultdict(list)
+        self.bounds = None  # (min_row, max_row, min_col, max_col)
+        self.size = 0
+
+    @classmethod
+    def from_items(cls, items, key=lambda item: (item["lat"], item["lon"]), cell_miles=0.5):
+        """Index items by key(item) -> (lat, lon); items without coordinates are skipped."""
+        items = list(items)
+        coords = [(key(item), item) for item in items]
+        coords = [(c, item) for c, item in coords if c is not None and None not in c]
+        ref_lat = sum(c[0] for c, _ in coords) / len(coords) if coords else 40.0
+        index = cls(cell_miles=cell_miles, ref_lat=ref_lat)
+        for (lat, lon), item in coords:
+            index.insert(lat, lon, item)
+        return index
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.lat_step), math.floor(lon / self.lon_step))
+
+    def insert(self, lat: float, lon: float, value) -> None:
+        row, col = self._cell(lat, lon)
+        self.cells[(row, col)].append((lat, lon, value))
+        self.size += 1
+        if self.bounds is None:
+            self.bounds = (row, row, col, col)
+        else:
+            r0, r1, c0, c1 = self.bounds
+            self.bounds = (min(r0, row), max(r1, row), min(c0, col), max(c1, col))
+
+    def _ring(self, row: int, col: int, k: int):
+        if k == 0:
+            yield (row, col)
+            return
+        for c in range(col - k, col + k + 1):
+            yield (row - k, c)
+            yield (row + k, c)
+        for r in range(row - k + 1, row + k):
+            yield (r, col - k)
+            yield (r, col + k)
+
+    def _max_ring(self, row: int, col: int) -> int:
+        r0, r1, c0, c1 = self.bounds
+        return max(abs(row - r0), abs(row - r1), abs(col - c0), abs(col - c1))
+
+    def within(self, lat: float, lon: float, radius_miles: float) -> list[tuple[float, object]]:
+        """All (distance_miles, value) within radius, nearest first."""
+        if self.bounds is None:
+            return []
+        row, col = self._cell(lat, lon)
+        lon_cell_miles = self.lon_step * MILES_PER_DEG_LAT * math.cos(math.radians(lat))
+        rows = math.ceil(radius_miles / self.cell_miles)
+        cols = math.ceil(radius_miles / max(lon_cell_miles, 1e-9))
+        found = []
+        for r in range(row - rows, row + rows + 1):
+            for c in range(col - cols, col + cols + 1):
+                for plat, plon, value in self.cells.get((r, c), ()):
+                    d = local_miles(lat, lon, plat, plon)
+                    if d <= radius_miles:
+                        found.append((d, value))
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def nearest(self, lat: float, lon: float, max_miles: float = math.inf):
+        """(distance_miles, value) of the closest point within max_miles, or None.
+
+        Searches outward ring by ring and stops once no unvisited cell can hold
+        anything closer than the best match so far.
+        """
+        if self.bounds is None:
+            return None
+        row, col = self._cell(lat, lon)
+        lon_cell_miles = self.lon_step * MILES_PER_DEG_LAT * math.cos(math.radians(lat))
+        step = min(self.cell_miles, lon_cell_miles)
+        last_ring = self._max_ring(row, col)
+        if max_miles != math.inf:
+            last_ring = min(last_ring, math.ceil(max_miles / step) + 1)
+
+        best = None
+        best_d = max_miles
+        for k in range(last_ring + 1):
+            if (k - 1) * step > best_d:
+                break
+            for cell in self._ring(row, col, k):
+                for plat, plon, value in self.cells.get(cell, ()):
+                    d = local_miles(lat, lon, plat, plon)
+                    if d <= best_d:
+                        best, best_d = value, d
+        return None if best is None else (best_d, best)
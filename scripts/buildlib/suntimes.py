@@ -0,0 +1,89 @@
+"""Sunrise, sunset and civil twilight for many places and dates at once.
+
+Uses the same low-precision solar position as public/js/moon.js (Meeus
+ch. 25, good to ~0.01 deg) and the same altitudes (-0.833 deg for sunrise and
+sunset, -6 deg for civil twilight). Instead of moon.js's 15-minute altitude
+scan, each event is solved in closed form from the hour angle at that
+altitude and refined twice with the sun's position at the estimated time. All
+places x dates are one set of numpy array operations.
+
+Times are minutes after 00:00 UTC of the calendar date, so evening events
+west of Greenwich exceed 1440. The client adds them to Date.UTC(y, m, d) and
+formats the instant in any time zone; no DST rules are baked in.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+EVENTS = {
+    # name: (altitude in degrees, -1 before transit / +1 after)
+    "civilDawn": (-6.0, -1),
+    "sunrise": (-0.833, -1),
+    "sunset": (-0.833, 1),
+    "civilDusk": (-6.0, 1),
+}
+SIDEREAL_DEG_PER_DAY = 360.98564736629
+REFINEMENTS = 2
+
+
+def julian_day_0h(days: list[date]):
+    """Julian day at 00:00 UTC for each date."""
+    import numpy as np
+
+    return np.asarray([d.toordinal() + 1721424.5 for d in days], dtype=float)
+
+
+def sun_ra_dec(jd):
+    """(right ascension, declination) in degrees; moon.js sunRADec, vectorized."""
+    import numpy as np
+
+    n = jd - 2451545.0
+    mean_lon = np.mod(280.460 + 0.9856474 * n, 360)
+    anomaly = np.radians(np.mod(357.528 + 0.9856003 * n, 360))
+    ecliptic = np.radians(mean_lon + 1.915 * np.sin(anomaly) + 0.020 * np.sin(2 * anomaly))
+    obliquity = np.radians(23.439 - 0.0000004 * n)
+    ra = np.mod(np.degrees(np.arctan2(np.cos(obliquity) * np.sin(ecliptic), np.cos(ecliptic))), 360)
+    dec = np.degrees(np.arcsin(np.sin(obliquity) * np.sin(ecliptic)))
+    return ra, dec
+
+
+def greenwich_sidereal_deg(jd):
+    """moon.js localSiderealTime at longitude 0."""
+    t = (jd - 2451545.0) / 36525
+    return 280.46061837 + SIDEREAL_DEG_PER_DAY * (jd - 2451545) + 0.000387933 * t * t - t ** 3 / 38710000
+
+
+def event_minutes(lats, lons, days: list[date], altitude: float, side: int):
+    """Minutes after 00:00 UTC of each date (array [place, day]); NaN if the sun never reaches altitude."""
+    import numpy as np
+
+    lat = np.radians(np.asarray(lats, dtype=float))[:, None]
+    lon = np.asarray(lons, dtype=float)[:, None]
+    jd0 = julian_day_0h(days)[None, :]
+    sin_alt = np.sin(np.radians(altitude))
+    # First guess: local apparent noon, then the event itself.
+    fraction = np.broadcast_to(0.5 - lon / 360, (lat.shape[0], jd0.shape[1])).copy()
+    for _ in range(REFINEMENTS + 1):
+        ra, dec = sun_ra_dec(jd0 + fraction)
+        dec = np.radians(dec)
+        transit = np.mod(ra - lon - greenwich_sidereal_deg(jd0), 360) / SIDEREAL_DEG_PER_DAY
+        # Keep the transit on the local calendar day (about 12:00 local).
+        transit = np.where(transit - (0.5 - lon / 360) > 0.5, transit - 360 / SIDEREAL_DEG_PER_DAY, transit)
+        transit = np.where(transit - (0.5 - lon / 360) < -0.5, transit + 360 / SIDEREAL_DEG_PER_DAY, transit)
+        cos_h = (sin_alt - np.sin(lat) * np.sin(dec)) / (np.cos(lat) * np.cos(dec))
+        with np.errstate(invalid="ignore"):
+            hour_angle = np.degrees(np.arccos(cos_h))  # NaN when |cos_h| > 1
+        fraction = transit + side * hour_angle / SIDEREAL_DEG_PER_DAY
+    return fraction * 1440
+
+
+def sun_table(lats, lons, days: list[date]) -> dict[str, list[list[int | None]]]:
+    """{event: [[minutes or None per day] per place]} for every EVENTS entry."""
+    import numpy as np
+
+    table = {}
+    for name, (altitude, side) in EVENTS.items():
+        minutes = event_minutes(lats, lons, days, altitude, side)
+        table[name] = [[None if np.isnan(m) else int(round(m)) for m in row] for row in minutes.tolist()]
+    return table
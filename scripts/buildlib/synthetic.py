@@ -0,0 +1,250 @@
+"""Synthetic inputs for benchmarking the build scripts at scale.
+
+Generators are deterministic for a given seed so benchmark runs are comparable.
+write_dem_geotiff() needs rasterio and numpy (as build-elevation-profile.py
+does); everything else is stdlib.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import random
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from .xlsx import REL_NS, THREADED_COMMENT_REL
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+THREAD_NS = "http://schemas.microsoft.com/office/spreadsheetml/2018/threadedcomments"
+# First data row of the NNML water chart; rows above it are headers.
+FIRST_DATA_ROW = 10
+# write_dem_geotiff(): at most 16M float32 cells (64 MB uncompressed), written
+# in 256-row blocks; hill wavelengths are in degrees.
+DEM_MAX_CELLS = 16_000_000
+DEM_BLOCK = 256
+DEM_WAVE_X_DEG = 150 * 0.0003
+DEM_WAVE_Y_DEG = 170 * 0.0003
+
+
+def random_walk(n: int, seed: int = 0, start=(35.687, -105.94), step_deg=0.0004) -> list[tuple[float, float]]:
+    """A wandering (lat, lon) track of n points, roughly step_deg apart."""
+    rng = random.Random(seed)
+    lat, lon = start
+    heading = rng.uniform(0, 2 * math.pi)
+    points = []
+    for _ in range(n):
+        heading += rng.gauss(0, 0.3)
+        lat += step_deg * math.cos(heading)
+        lon += step_deg * math.sin(heading) / math.cos(math.radians(lat))
+        points.append((round(lat, 6), round(lon, 6)))
+    return points
+
+
+def trail_records(n: int, seed: int = 0, miles_per_record: float = 0.8) -> list[dict]:
+    """NNML-style category records spaced along a random-walk trail."""
+    rng = random.Random(seed)
+    track = random_walk(n, seed=seed, step_deg=0.012 * miles_per_record)
+    subcategories = ["reliable", "seasonal", "unreliable"]
+    records = []
+    for i, (lat, lon) in enumerate(track):
+        mile = round(i * miles_per_record, 1)
+        section = 1 + i * 8 // max(n, 1)
+        records.append({
+            "mile": mile,
+            "lat": round(lat, 5),
+            "lon": round(lon, 5),
+            "name": f"S{section} {mile} - WP{i:05d}",
+            "landmark": f"Synthetic waypoint {i} near creek crossing {rng.randint(1, 500)}",
+            "subcategory": rng.choice(subcategories),
+        })
+    return records
+
+
+_LANDMARK_WORDS = [
+    "trail", "junction", "jct", "gate", "fence", "road", "highway", "paved", "creek", "spring",
+    "river", "trough", "pond", "ranch", "store", "town", "services", "all services", "no resupply",
+    "limited", "camp store", "campground", "ridge", "saddle", "cairn", "two-track", "sagebrush",
+    "juniper", "canyon", "rim", "bench", "downtown", "1.2 miles off", "off-trail", "cross country",
+]
+_DETAIL_WORDS = ["reliable:", "unreliable:", "seasonal:", "questionable:", "stock tank", "spring box",
+                 "piped", "flowing", "cattle", "pools", "may be dry", "full", "trickle"]
+
+
+def waypoint_csv_rows(n: int, seed: int = 0, water_rate: float = 0.35) -> list[dict]:
+    """Rows shaped like Water Sources Sanitized.csv (uncategorized)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        landmark = " ".join(rng.choice(_LANDMARK_WORDS) for _ in range(rng.randint(2, 9)))
+        details = ""
+        if rng.random() < water_rate:
+            details = " ".join(rng.choice(_DETAIL_WORDS) for _ in range(rng.randint(1, 5)))
+        rows.append({
+            "Way Point": f"WP{i:06d}",
+            "Total Mileage": f"{i * 0.8:.1f}",
+            "Elevation": str(rng.randint(2000, 9000)),
+            "Trail Surface Type": rng.choice(["trail", "road", "xc"]),
+            "Landmark": landmark.capitalize(),
+            "Water Details": details.capitalize(),
+        })
+    return rows
+
+
+def write_kml_tracks(directory: Path, track: list[tuple[float, float]], files: int = 4,
+                     segments_per_file: int = 6) -> list[str]:
+    """Split a (lat, lon) track into numbered Placemark segments across KML files.
+
+    Mirrors the ODT "Region N Track.kml" layout: segments are named "01 ...",
+    "02 ..." in trail order and each starts on the previous segment's last
+    point. Returns the file names written.
+    """
+    count = files * segments_per_file
+    size = max(1, math.ceil(len(track) / count))
+    names = []
+    for f in range(files):
+        placemarks = []
+        for k in range(segments_per_file):
+            number = f * segments_per_file + k
+            start = max(0, number * size - 1)
+            segment = track[start:(number + 1) * size]
+            if not segment:
+                continue
+            coords = " ".join(f"{lon},{lat},0" for lat, lon in segment)
+            placemarks.append(
+                f"<Placemark><name>{number + 1:02d} Segment {number + 1}</name>"
+                f"<LineString><coordinates>{coords}</coordinates></LineString></Placemark>"
+            )
+        name = f"Region {f + 1} Track.kml"
+        (directory / name).write_text(
+            f'<?xml version="1.0" encoding="UTF-8"?><kml xmlns="http://www.opengis.net/kml/2.2">'
+            f"<Document>{''.join(placemarks)}</Document></kml>"
+        )
+        names.append(name)
+    return names
+
+
+def write_waypoint_gpx(path: Path, rows: list[dict], track: list[tuple[float, float]]) -> None:
+    """GPX <wpt>s named after the CSV rows' "Way Point", spread evenly along track."""
+    step = max(1, len(track) // max(len(rows), 1))
+    wpts = []
+    for i, row in enumerate(rows):
+        lat, lon = track[min(i * step, len(track) - 1)]
+        wpts.append(f'<wpt lat="{lat}" lon="{lon}"><name>{escape(row["Way Point"])}</name></wpt>')
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?><gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1">'
+        + "".join(wpts) + "</gpx>"
+    )
+
+
+def write_csv(path: Path, rows: list[dict]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_dem_geotiff(path: Path, track: list[tuple[float, float]], cell_deg: float = 0.0003,
+                      margin_deg: float = 0.01, seed: int = 0, max_cells: int = DEM_MAX_CELLS) -> None:
+    """A float32 WGS84 GeoTIFF of smooth synthetic terrain covering the track.
+
+    Cells grow past cell_deg when the track's extent would need more than
+    max_cells of them, and the raster is generated and written one block of
+    rows at a time, so memory stays flat however long the track is.
+    """
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_origin
+    from rasterio.windows import Window
+
+    lats = [lat for lat, _ in track]
+    lons = [lon for _, lon in track]
+    west, north = min(lons) - margin_deg, max(lats) + margin_deg
+    span_x = max(lons) - min(lons) + 2 * margin_deg
+    span_y = max(lats) - min(lats) + 2 * margin_deg
+    cell_deg = max(cell_deg, math.sqrt(span_x * span_y / max_cells))
+    width = math.ceil(span_x / cell_deg)
+    height = math.ceil(span_y / cell_deg)
+    rng = np.random.default_rng(seed)
+    phase = rng.uniform(0, 2 * math.pi, 2)
+    # Terrain wavelengths are in degrees, so a coarser grid samples the same hills.
+    x = np.arange(width, dtype="float64") * cell_deg / DEM_WAVE_X_DEG + phase[0]
+    wave_x = np.sin(x).astype("float32")
+    with rasterio.open(
+        path, "w", driver="GTiff", width=width, height=height, count=1, dtype="float32",
+        crs="EPSG:4326", transform=from_origin(west, north, cell_deg, cell_deg), nodata=-9999.0,
+        tiled=True, blockxsize=DEM_BLOCK, blockysize=DEM_BLOCK, compress="deflate",
+    ) as ds:
+        for row in range(0, height, DEM_BLOCK):
+            rows = min(DEM_BLOCK, height - row)
+            y = np.arange(row, row + rows, dtype="float64") * cell_deg / DEM_WAVE_Y_DEG + phase[1]
+            block = rng.standard_normal((rows, width), dtype="float32")
+            block *= 3
+            block += 2000 + 400 * np.cos(y).astype("float32")[:, None] * wave_x[None, :]
+            ds.write(block, 1, window=Window(0, row, width, rows))
+
+
+def _cell(ref: str, value: str, strings: dict[str, int]) -> str:
+    index = strings.setdefault(value, len(strings))
+    return f'<c r="{ref}" t="s"><v>{index}</v></c>'
+
+
+def write_water_chart_xlsx(path: Path, records: list[dict], comment_rate: float = 0.5,
+                           jitter_deg: float = 0.0003, seed: int = 0) -> int:
+    """Write an NNML water chart workbook with one row per record.
+
+    Rows carry the section (A), waypoint name (D), observation (E) and
+    "lat, lon" (F) columns the comment extractor reads; about comment_rate of
+    the rows get threaded comments on their E cell, and coordinates are
+    jittered so some rows need the nearest-neighbour fallback. Returns the
+    number of commented rows.
+    """
+    rng = random.Random(seed)
+    strings: dict[str, int] = {}
+    rows_xml = []
+    comments_xml = []
+    commented = 0
+    for offset, record in enumerate(records):
+        row = FIRST_DATA_ROW + offset
+        lat = record["lat"] + (rng.uniform(-jitter_deg, jitter_deg) if rng.random() < 0.3 else 0)
+        lon = record["lon"] + (rng.uniform(-jitter_deg, jitter_deg) if rng.random() < 0.3 else 0)
+        cells = [
+            _cell(f"A{row}", record["name"].split()[0], strings),
+            _cell(f"B{row}", str(record["mile"]), strings),
+            _cell(f"C{row}", record.get("subcategory", ""), strings),
+            _cell(f"D{row}", record["name"].split(" - ")[-1], strings),
+            _cell(f"E{row}", "flowing", strings),
+            _cell(f"F{row}", f"{lat:.5f}, {lon:.5f}", strings),
+        ]
+        rows_xml.append(f'<row r="{row}">{"".join(cells)}</row>')
+        if rng.random() < comment_rate:
+            commented += 1
+            for n in range(rng.randint(1, 3)):
+                comments_xml.append(
+                    f'<threadedComment ref="E{row}" dT="2025-0{rng.randint(1, 9)}-1{n}T12:00:00.00" '
+                    f'personId="{{P{n}}}" id="{{C{row}-{n}}}">'
+                    f"<text>{escape(f'Report {n} for row {row}: water flowing')}</text></threadedComment>"
+                )
+
+    shared = "".join(
+        f"<si><t>{escape(value)}</t></si>" for value, _ in sorted(strings.items(), key=lambda kv: kv[1])
+    )
+    persons = "".join(f'<person displayName="Hiker {n}" id="{{P{n}}}"/>' for n in range(3))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("xl/sharedStrings.xml", f'<sst xmlns="{SPREADSHEET_NS}">{shared}</sst>')
+        zf.writestr(
+            "xl/worksheets/sheet1.xml",
+            f'<worksheet xmlns="{SPREADSHEET_NS}"><sheetData>{"".join(rows_xml)}</sheetData></worksheet>',
+        )
+        zf.writestr(
+            "xl/worksheets/_rels/sheet1.xml.rels",
+            f'<Relationships xmlns="{REL_NS}"><Relationship Id="rId1" Type="{THREADED_COMMENT_REL}" '
+            'Target="../threadedComments/threadedComment1.xml"/></Relationships>',
+        )
+        zf.writestr("xl/persons/person.xml", f'<personList xmlns="{THREAD_NS}">{persons}</personList>')
+        zf.writestr(
+            "xl/threadedComments/threadedComment1.xml",
+            f'<ThreadedComments xmlns="{THREAD_NS}">{"".join(comments_xml)}</ThreadedComments>',
+        )
+    return commented
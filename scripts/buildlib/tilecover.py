@@ -0,0 +1,209 @@
+"""Web-mercator tiles along a trail, per zoom: which tiles, and for which miles.
+
+polygon_tiles() / line_tiles() rasterize the corridor polygon and the route
+line exactly (every tile the geometry touches). tile_miles() annotates tiles
+with the span of trail miles within the buffer of each, which is what lets a
+prefetcher walk tiles in hiking order, and zoom_tiles() combines the two into
+the rows of build-tile-index.py. section_tiles() splits those rows by section
+(a tile belongs to every section its mile span overlaps), so
+build-section-tiles.py extracts exactly the tiles the index counts.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+
+from . import trail_build_dir
+from .sections import section_index
+from .spatial import MILES_PER_DEG_LAT, GridIndex
+
+DEFAULT_BUFFER_KM = 5.0  # scripts/build-corridor.js
+KM_PER_MILE = 1.609344
+
+
+def corridor_buffer_miles(trail: str) -> float:
+    """Half-width of build/<trail>/corridor.geojson (its buffer_km property)."""
+    path = trail_build_dir(trail) / "corridor.geojson"
+    km = DEFAULT_BUFFER_KM
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+        for feature in data.get("features", []):
+            km = (feature.get("properties") or {}).get("buffer_km", km)
+    return km / KM_PER_MILE
+
+
+def corridor_rings(trail: str) -> list[list[list[float]]]:
+    """All rings of build/<trail>/corridor.geojson (Polygon or MultiPolygon features)."""
+    path = trail_build_dir(trail) / "corridor.geojson"
+    if not path.exists():
+        raise SystemExit(f"Missing {path}; run: node scripts/build-corridor.js --trail {trail}")
+    with open(path) as f:
+        data = json.load(f)
+    rings = []
+    for feature in data.get("features", [data]):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") == "Polygon":
+            rings.extend(geometry["coordinates"])
+        elif geometry.get("type") == "MultiPolygon":
+            for polygon in geometry["coordinates"]:
+                rings.extend(polygon)
+    return rings
+
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> tuple[float, float]:
+    """Fractional tile x, y of a WGS84 point at zoom z."""
+    n = 1 << z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = (lon + 180) / 360 * n
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+    return x, y
+
+
+def square_tiles(lat: float, lon: float, radius_miles: float, zoom: int):
+    """Tiles (x, y) overlapping the square of half-side radius_miles around a point."""
+    n = 1 << zoom
+    dlat = radius_miles / MILES_PER_DEG_LAT
+    dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+    x0, y0 = lonlat_to_tile(lon - dlon, lat + dlat, zoom)
+    x1, y1 = lonlat_to_tile(lon + dlon, lat - dlat, zoom)
+    for x in range(max(int(x0), 0), min(int(x1), n - 1) + 1):
+        for y in range(max(int(y0), 0), min(int(y1), n - 1) + 1):
+            yield x, y
+
+
+def _line_tiles(x0: float, y0: float, x1: float, y1: float, tiles: set) -> None:
+    """Add every tile a straight segment in tile coordinates passes through."""
+    ix, iy = math.floor(x0), math.floor(y0)
+    steps = abs(math.floor(x1) - ix) + abs(math.floor(y1) - iy)
+    dx, dy = x1 - x0, y1 - y0
+    step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+    next_x = ((ix + (step_x > 0)) - x0) / dx if dx else math.inf
+    next_y = ((iy + (step_y > 0)) - y0) / dy if dy else math.inf
+    delta_x = abs(1 / dx) if dx else math.inf
+    delta_y = abs(1 / dy) if dy else math.inf
+    tiles.add((ix, iy))
+    for _ in range(steps):
+        if next_x < next_y:
+            ix += step_x
+            next_x += delta_x
+        else:
+            iy += step_y
+            next_y += delta_y
+        tiles.add((ix, iy))
+
+
+def line_tiles(coords: list[tuple[float, float]], zoom: int) -> set[tuple[int, int]]:
+    """Tiles at zoom that a (lon, lat) polyline passes through."""
+    points = [lonlat_to_tile(lon, lat, zoom) for lon, lat in coords]
+    tiles = set()
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        _line_tiles(x0, y0, x1, y1, tiles)
+    if len(points) == 1:
+        tiles.add((math.floor(points[0][0]), math.floor(points[0][1])))
+    return tiles
+
+
+def polygon_tiles(rings: list[list[tuple[float, float]]], zoom: int) -> set[tuple[int, int]]:
+    """Tiles at zoom that intersect a polygon given as (lon, lat) rings (holes by even-odd).
+
+    A tile intersects the polygon if a ring passes through it or, failing
+    that, if its centre is inside; the first set is traced edge by edge and the
+    second filled row by row from the edge crossings at each row's centre line.
+    """
+    tiles = set()
+    crossings: dict[int, list[float]] = {}
+    for ring in rings:
+        points = [lonlat_to_tile(lon, lat, zoom) for lon, lat in ring]
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            _line_tiles(x0, y0, x1, y1, tiles)
+            if y0 == y1:
+                continue
+            lo, hi = min(y0, y1), max(y0, y1)
+            for row in range(math.ceil(lo - 0.5), math.ceil(hi - 0.5)):
+                yc = row + 0.5
+                crossings.setdefault(row, []).append(x0 + (yc - y0) / (y1 - y0) * (x1 - x0))
+    for row, xs in crossings.items():
+        xs.sort()
+        for xa, xb in zip(xs[::2], xs[1::2]):
+            for col in range(math.ceil(xa - 0.5), math.floor(xb - 0.5) + 1):
+                tiles.add((col, row))
+    return tiles
+
+
+def tile_miles(profile: list[dict], radius_miles: float, zoom: int,
+               spacing_miles: float = 0.25) -> dict[tuple[int, int], list[float]]:
+    """{(x, y): [first mile, last mile]} of the profile within radius_miles of each tile."""
+    miles = [p["distance"] for p in profile]
+    picked = sorted({bisect.bisect_left(miles, m * spacing_miles)
+                     for m in range(int(miles[-1] / spacing_miles) + 1)} | {len(profile) - 1})
+    # Profile samples are dense, so consecutive picks are ~spacing apart.
+    radius = radius_miles + spacing_miles / 2
+    spans: dict[tuple[int, int], list[float]] = {}
+    for i in picked:
+        p = profile[i]
+        for tile in square_tiles(p["lat"], p["lon"], radius, zoom):
+            span = spans.get(tile)
+            if span is None:
+                spans[tile] = [p["distance"], p["distance"]]
+            else:
+                span[0] = min(span[0], p["distance"])
+                span[1] = max(span[1], p["distance"])
+    return spans
+
+
+def tile_center(x: int, y: int, zoom: int) -> tuple[float, float]:
+    """(lat, lon) of a tile's centre."""
+    n = 1 << zoom
+    lon = (x + 0.5) / n * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 0.5) / n))))
+    return lat, lon
+
+
+def zoom_tiles(z: int, rings, route_parts, profile: list[dict], profile_index: GridIndex,
+               radius_miles: float) -> list[tuple[float, float, int, int]]:
+    """Sorted (startMile, endMile, x, y) for every tile the corridor or route touches at z.
+
+    Tiles that only the corridor around a distant alternate reaches take the
+    mile of the profile sample nearest their centre.
+    """
+    tiles = polygon_tiles(rings, z)
+    for part in route_parts:
+        tiles |= line_tiles(part, z)
+    spans = tile_miles(profile, radius_miles, z)
+    rows = []
+    for x, y in tiles:
+        span = spans.get((x, y))
+        if span is None:
+            lat, lon = tile_center(x, y, z)
+            mile = profile_index.nearest(lat, lon)[1]["distance"]
+            span = [mile, mile]
+        rows.append((round(span[0], 1), round(span[1], 1), x, y))
+    rows.sort()
+    return rows
+
+
+def section_tiles(rows, ranges: list[dict]) -> list[list[tuple[int, int]]]:
+    """zoom_tiles() rows split per section: each tile goes to every section its span overlaps."""
+    out: list[list[tuple[int, int]]] = [[] for _ in ranges]
+    for start_mile, end_mile, x, y in rows:
+        for i in range(section_index(ranges, start_mile), section_index(ranges, end_mile) + 1):
+            out[i].append((x, y))
+    return out
+
+
+def tiles_bounds(tiles_by_zoom: dict[int, list[tuple[int, int]]]) -> list[float] | None:
+    """[west, south, east, north] of the tiles at the highest zoom that has any."""
+    zooms = [z for z, tiles in tiles_by_zoom.items() if tiles]
+    if not zooms:
+        return None
+    z = max(zooms)
+    n = 1 << z
+    xs = [x for x, _ in tiles_by_zoom[z]]
+    ys = [y for _, y in tiles_by_zoom[z]]
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * min(ys) / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (max(ys) + 1) / n))))
+    return [round(min(xs) / n * 360 - 180, 5), round(south, 5),
+            round((max(xs) + 1) / n * 360 - 180, 5), round(north, 5)]
@@ -0,0 +1,169 @@
+"""Opt-in stage tracing for the build scripts (Chrome trace-event JSON).
+
+Scripts wrap their stages in span(), or mark whole functions with @traced:
+
+    with span("parse kml", files=4):
+        ...
+
+    @traced("stitch kml")
+    def stitch_all(): ...
+
+When tracing is off (the default) a span costs one global lookup. With
+`--trace out.json` every span becomes a complete ("X") event carrying wall
+time, CPU time and the process's peak RSS so far; load the file in
+chrome://tracing or https://ui.perfetto.dev. With `--profile out.prof` each
+top-level span also runs under cProfile and the stats of the slowest one are
+dumped at exit (read them with `python3 -m pstats out.prof`).
+
+Argparse scripts call add_trace_arguments(parser) and then
+enable_from_args(args); scripts that read sys.argv directly call
+enable_from_argv(usage=__doc__). Either way the whole run is recorded as one
+root span and the files are written at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_tracer: "Tracer | None" = None
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Tracer:
+    def __init__(self, trace_path: Path | None, profile_path: Path | None):
+        self.trace_path = trace_path
+        self.profile_path = profile_path
+        self.origin = time.perf_counter()
+        self.events: list[dict] = []
+        self.depth = 0
+        self.slowest: tuple[float, str, cProfile.Profile] | None = None
+        self.lock = threading.Lock()
+
+    def record(self, name: str, start: float, wall: float, cpu: float, args: dict) -> None:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round(wall * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {**args, "cpuMs": round(cpu * 1e3, 2), "peakRssMb": peak_rss_mb()},
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def write(self) -> None:
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self.trace_path.write_text(json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}))
+            print(f"Trace: {len(self.events)} span(s) -> {self.trace_path}", file=sys.stderr)
+        if self.profile_path and self.slowest:
+            wall, name, profile = self.slowest
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(self.profile_path)
+            print(f"Profile: slowest stage '{name}' ({wall:.2f} s) -> {self.profile_path}", file=sys.stderr)
+
+
+@contextmanager
+def span(name: str, **args):
+    """Time a stage; a no-op unless tracing was enabled."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    profile = None
+    # cProfile allows one active profiler, so only top-level stages (depth 1,
+    # under the root span) are profiled.
+    if tracer.profile_path and tracer.depth == 1 and threading.current_thread() is threading.main_thread():
+        profile = cProfile.Profile()
+    tracer.depth += 1
+    start, cpu_start = time.perf_counter(), time.process_time()
+    if profile:
+        profile.enable()
+    try:
+        yield
+    finally:
+        if profile:
+            profile.disable()
+        wall = time.perf_counter() - start
+        tracer.depth -= 1
+        tracer.record(name, start, wall, time.process_time() - cpu_start, args)
+        if profile and (tracer.slowest is None or wall > tracer.slowest[0]):
+            tracer.slowest = (wall, name, profile)
+
+
+def traced(name: str | None = None):
+    """Decorator: run the function inside span(name or its own name)."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def add_trace_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--trace", type=Path, metavar="OUT.json",
+                        help="Write a Chrome trace of the build stages.")
+    parser.add_argument("--profile", type=Path, metavar="OUT.prof",
+                        help="Dump cProfile stats for the slowest stage.")
+
+
+def enable(trace_path: Path | None, profile_path: Path | None, name: str | None = None) -> None:
+    """Start tracing the rest of this run (no-op if both paths are None)."""
+    global _tracer
+    if _tracer is not None or not (trace_path or profile_path):
+        return
+    _tracer = Tracer(trace_path, profile_path)
+    root = span(name or Path(sys.argv[0]).name)
+    root.__enter__()
+
+    def finish():
+        root.__exit__(None, None, None)
+        _tracer.write()
+    atexit.register(finish)
+
+
+def enable_from_args(args: argparse.Namespace) -> None:
+    enable(args.trace, args.profile)
+
+
+def enable_from_argv(argv: list[str] | None = None, usage: str | None = None) -> None:
+    """For scripts without argparse: pick --trace/--profile out of sys.argv.
+
+    With usage (the script's __doc__), -h/--help prints it and exits instead
+    of running the build.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if usage and ("-h" in argv or "--help" in argv):
+        print(usage.strip())
+        sys.exit(0)
+    parser = argparse.ArgumentParser(add_help=False)
+    add_trace_arguments(parser)
+    args, _ = parser.parse_known_args(argv)
+    enable_from_args(args)
@@ -0,0 +1,113 @@
+"""Water-carry index: distance to the next water in each direction.
+
+For every mainline water source and every profile mile bucket the index holds
+the distance to the next source northbound (increasing mile) and southbound
+(decreasing mile) under three reliability filters:
+
+    reliable  - subcategory "reliable"
+    seasonal  - "reliable" or "seasonal"
+    any       - every water source, including "unreliable"
+
+Each filter/direction array comes from a single linear sweep over the sorted
+source miles merged with the sorted query miles, so the client answers "how much
+water do I carry from here" with one array lookup. Missing values (no further
+water in that direction) are null.
+"""
+
+from __future__ import annotations
+
+from .geo import local_miles
+
+FILTERS = {
+    "reliable": {"reliable"},
+    "seasonal": {"reliable", "seasonal"},
+    "any": None,
+}
+# Alternates are published with mile 0; only keep mile-0 sources this close to
+# the trailhead.
+TRAILHEAD_MILES = 0.25
+TOP_DRY_STRETCHES = 5
+
+
+def mainline_sources(water: list[dict], start: tuple[float, float]) -> list[dict]:
+    """Water sources on the main route, sorted by mile."""
+    keep = [
+        w for w in water
+        if w.get("mile") or local_miles(w["lat"], w["lon"], start[0], start[1]) <= TRAILHEAD_MILES
+    ]
+    return sorted(keep, key=lambda w: w["mile"])
+
+
+def next_ahead(source_miles: list[float], query_miles: list[float], strict: bool) -> list[float | None]:
+    """Distance from each query mile to the next source mile ahead of it.
+
+    Both lists must be sorted ascending. With strict=True a source at exactly
+    the query mile does not count (used for source-to-source distances).
+    """
+    out: list[float | None] = []
+    j = 0
+    n = len(source_miles)
+    for q in query_miles:
+        while j < n and (source_miles[j] <= q if strict else source_miles[j] < q):
+            j += 1
+        out.append(round(source_miles[j] - q, 1) if j < n else None)
+    return out
+
+
+def next_behind(source_miles: list[float], query_miles: list[float], strict: bool) -> list[float | None]:
+    """Mirror of next_ahead for the southbound direction."""
+    flipped = next_ahead([-m for m in reversed(source_miles)], [-q for q in reversed(query_miles)], strict)
+    return list(reversed(flipped))
+
+
+def dry_stretches(source_miles: list[float], trail_end: float) -> list[dict]:
+    """Every gap between consecutive sources, plus the open ends of the trail."""
+    bounds = [0.0] + source_miles + [trail_end]
+    return [
+        {"startMile": a, "endMile": b, "miles": round(b - a, 1)}
+        for a, b in zip(bounds, bounds[1:])
+        if b > a
+    ]
+
+
+def build_index(water: list[dict], trail_end: float, start: tuple[float, float],
+                sections: list[dict], bucket_miles: float) -> dict:
+    sources = mainline_sources(water, start)
+    source_miles = [w["mile"] for w in sources]
+    bucket_count = int(trail_end // bucket_miles) + 1
+    bucket_miles_list = [round(i * bucket_miles, 3) for i in range(bucket_count)]
+
+    index = {
+        "bucketMiles": bucket_miles,
+        "trailEnd": trail_end,
+        "filters": {name: sorted(subs) if subs else None for name, subs in FILTERS.items()},
+        "sources": [{"name": w["name"], "mile": w["mile"], "subcategory": w.get("subcategory", "")} for w in sources],
+        "sourceGaps": {},
+        "bucketGaps": {},
+        "dryStretches": [],
+    }
+
+    stretches_by_filter = {}
+    for name, subs in FILTERS.items():
+        matching = [w["mile"] for w in sources if subs is None or w.get("subcategory") in subs]
+        index["sourceGaps"][name] = {
+            "nobo": next_ahead(matching, source_miles, strict=True),
+            "sobo": next_behind(matching, source_miles, strict=True),
+        }
+        index["bucketGaps"][name] = {
+            "nobo": next_ahead(matching, bucket_miles_list, strict=False),
+            "sobo": next_behind(matching, bucket_miles_list, strict=False),
+        }
+        stretches_by_filter[name] = dry_stretches(matching, trail_end)
+
+    for section in sections:
+        entry = {"section": section["section"], "startMile": section["startMile"], "endMile": section["endMile"]}
+        for name, stretches in stretches_by_filter.items():
+            overlapping = [
+                s for s in stretches
+                if s["startMile"] < section["endMile"] and s["endMile"] > section["startMile"]
+            ]
+            overlapping.sort(key=lambda s: -s["miles"])
+            entry[name] = overlapping[:TOP_DRY_STRETCHES]
+        index["dryStretches"].append(entry)
+    return index
@@ -0,0 +1,149 @@
+"""Streaming reader for the parts of an .xlsx workbook the build scripts use.
+
+Worksheets are iterparsed straight from the zip member and cleared as they go,
+so only the requested columns of the requested rows are ever held in memory.
+Shared strings are resolved afterwards in a second streaming pass that keeps
+just the indexes those cells referenced.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from typing import Iterable
+from xml.etree import ElementTree as ET
+
+SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DOC_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+THREADED_COMMENT_REL = "http://schemas.microsoft.com/office/2017/10/relationships/threadedComment"
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+
+def split_ref(ref: str) -> tuple[str, int]:
+    """"E12" -> ("E", 12)."""
+    match = _CELL_REF.match(ref)
+    return match.group(1), int(match.group(2))
+
+
+def _rels(zf: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """Relationship id -> (type, absolute target part) for a part's .rels file."""
+    rels_path = posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+    if rels_path not in zf.namelist():
+        return {}
+    root = ET.fromstring(zf.read(rels_path))
+    out = {}
+    for rel in root.findall(f"{{{REL_NS}}}Relationship"):
+        target = rel.attrib["Target"]
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+        out[rel.attrib["Id"]] = (rel.attrib.get("Type", ""), target)
+    return out
+
+
+def sheet_parts(zf: zipfile.ZipFile) -> list[tuple[str, str]]:
+    """(sheet name, worksheet part) for every sheet, in workbook order."""
+    if "xl/workbook.xml" not in zf.namelist():
+        return [("Sheet1", "xl/worksheets/sheet1.xml")]
+    rels = _rels(zf, "xl/workbook.xml")
+    root = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheets = []
+    for sheet in root.iter(f"{{{SPREADSHEET_NS}}}sheet"):
+        rel = rels.get(sheet.attrib.get(f"{{{DOC_REL_NS}}}id", ""))
+        if rel:
+            sheets.append((sheet.attrib.get("name", ""), rel[1]))
+    return sheets
+
+
+def threaded_comment_part(zf: zipfile.ZipFile, sheet_part: str) -> str | None:
+    """The threaded-comments part attached to a worksheet, if any.
+
+    Comment parts are numbered independently of the sheets, so only the
+    sheet's own rels say which one belongs to it. A workbook with no worksheet
+    rels at all (hand-assembled, like older synthetic benchmark files) is
+    the one case where sheetN.xml is paired with threadedCommentN.xml.
+    """
+    for rel_type, target in _rels(zf, sheet_part).values():
+        if rel_type == THREADED_COMMENT_REL:
+            return target
+    names = zf.namelist()
+    if any(name.startswith("xl/worksheets/_rels/") for name in names):
+        return None
+    number = re.search(r"(\d+)\.xml$", sheet_part)
+    guess = f"xl/threadedComments/threadedComment{number.group(1) if number else 1}.xml"
+    return guess if guess in names else None
+
+
+def iter_rows(zf: zipfile.ZipFile, sheet_part: str, columns: Iterable[str],
+              rows: set[int] | None = None):
+    """Yield (row_number, {column: raw_value, ...}) for the wanted cells.
+
+    Raw values of shared-string cells are returned as SharedString(index) so the
+    caller can resolve them in one batch with resolve_shared_strings().
+    Rows not in `rows` (when given) are skipped without materializing cells.
+    """
+    wanted = set(columns)
+    with zf.open(sheet_part) as stream:
+        row_tag = f"{{{SPREADSHEET_NS}}}row"
+        cell_tag = f"{{{SPREADSHEET_NS}}}c"
+        value_tag = f"{{{SPREADSHEET_NS}}}v"
+        inline_tag = f"{{{SPREADSHEET_NS}}}is"
+        for event, elem in ET.iterparse(stream, events=("end",)):
+            if elem.tag != row_tag:
+                continue
+            row_number = int(elem.attrib["r"])
+            if rows is None or row_number in rows:
+                values = {}
+                for cell in elem.iter(cell_tag):
+                    column, _ = split_ref(cell.attrib["r"])
+                    if column not in wanted:
+                        continue
+                    if cell.attrib.get("t") == "inlineStr":
+                        inline = cell.find(inline_tag)
+                        values[column] = "".join(inline.itertext()) if inline is not None else ""
+                        continue
+                    node = cell.find(value_tag)
+                    raw = node.text if node is not None and node.text else ""
+                    values[column] = SharedString(int(raw)) if cell.attrib.get("t") == "s" and raw else raw
+                yield row_number, values
+            elem.clear()
+
+
+class SharedString(int):
+    """Index into xl/sharedStrings.xml, pending resolution."""
+
+
+def resolve_shared_strings(zf: zipfile.ZipFile, rows: dict[int, dict]) -> dict[int, dict[str, str]]:
+    """Replace SharedString placeholders in rows (in place) with their text."""
+    needed = {v for values in rows.values() for v in values.values() if isinstance(v, SharedString)}
+    texts: dict[int, str] = {}
+    if needed and "xl/sharedStrings.xml" in zf.namelist():
+        si_tag = f"{{{SPREADSHEET_NS}}}si"
+        t_tag = f"{{{SPREADSHEET_NS}}}t"
+        last = max(needed)
+        index = 0
+        with zf.open("xl/sharedStrings.xml") as stream:
+            for event, elem in ET.iterparse(stream, events=("end",)):
+                if elem.tag != si_tag:
+                    continue
+                if index in needed:
+                    texts[index] = "".join(t.text or "" for t in elem.iter(t_tag))
+                elem.clear()
+                index += 1
+                if index > last:
+                    break
+    for values in rows.values():
+        for column, value in values.items():
+            if isinstance(value, SharedString):
+                values[column] = texts.get(int(value), "")
+    return rows
+
+
+def read_rows(zf: zipfile.ZipFile, sheet_part: str, columns: Iterable[str],
+              rows: set[int] | None = None) -> dict[int, dict[str, str]]:
+    """iter_rows() collected into {row_number: {column: text}} with strings resolved."""
+    return resolve_shared_strings(zf, dict(iter_rows(zf, sheet_part, columns, rows)))
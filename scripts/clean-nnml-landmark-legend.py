@@ -14,10 +14,14 @@ contains the legend.
 
 from __future__ import annotations
 
-import json
 import re
+import sys
 from pathlib import Path
 
+from buildlib.manifest import ALLOW_SIZE_CHANGE_FLAG
+from buildlib.pipeline import Pipeline
+from buildlib.trace import enable_from_argv
+
 ROOT = Path(__file__).resolve().parents[1]
 NNML_DIR = ROOT / "public" / "trails" / "nnml"
 TARGET_FILES = ["waypoints.json", "navigation.json", "water.json", "towns.json", "toilets.json"]
@@ -35,24 +39,28 @@ def clean_text(value: str) -> str:
     return re.sub(r"\s{2,}", " ", without_legend).strip()
 
 
-def main() -> None:
+def clean_datasets(datasets: dict[str, list[dict]]) -> int:
+    """Pipeline transform: strip the legend from every string field."""
     total_changed = 0
     for filename in TARGET_FILES:
-        path = NNML_DIR / filename
-        data = json.loads(path.read_text())
         changed = 0
-        for item in data:
+        for item in datasets.get(filename, []):
             for key, value in list(item.items()):
                 if isinstance(value, str) and LEGEND.search(value):
                     cleaned = clean_text(value)
                     if cleaned != value:
                         item[key] = cleaned
                         changed += 1
-        if changed:
-            path.write_text(json.dumps(data, indent=2) + "\n")
         total_changed += changed
         print(f"{filename}: cleaned {changed} field(s)")
-    print(f"Total fields cleaned: {total_changed}")
+    return total_changed
+
+
+def main() -> None:
+    enable_from_argv(usage=__doc__)
+    Pipeline(NNML_DIR, TARGET_FILES).register("legend cleanup", clean_datasets).run(
+        allow_size_change=ALLOW_SIZE_CHANGE_FLAG in sys.argv
+    )
 
 
 if __name__ == "__main__":
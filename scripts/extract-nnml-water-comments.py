@@ -1,24 +1,49 @@
 #!/usr/bin/env python3
-"""Attach NNML Google Sheets water comments to NNML waypoint/category JSON."""
+"""Attach NNML Google Sheets water comments to NNML waypoint/category JSON.
+
+Reads every sheet with threaded comments in each workbook (the NNML water chart
+by default). Worksheets are streamed and only the section, name and coordinate
+columns of commented rows are kept, so large crowd-sourced logs stay cheap.
+
+Also writes public/trails/nnml/water-reports.json: one latest-report summary
+per commented source (count, date, author, snippet) and a date-sorted,
+columnar index of every report, so the app never sorts comment threads itself.
+
+Run:
+    python3 scripts/extract-nnml-water-comments.py [WORKBOOK.xlsx ...]
+"""
 
 from __future__ import annotations
 
-import json
+import argparse
 import re
 import zipfile
 from collections import defaultdict
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
+from buildlib.manifest import add_manifest_arguments
+from buildlib.pipeline import Pipeline
+from buildlib.spatial import GridIndex
+from buildlib.trace import add_trace_arguments, enable_from_args
+from buildlib.xlsx import read_rows, sheet_parts, threaded_comment_part
+
 ROOT = Path(__file__).resolve().parents[1]
 WORKBOOK = ROOT / "data" / "Copy of NNML Water Chart - ADD YOUR OBSERVATIONS.xlsx"
 NNML_DIR = ROOT / "public" / "trails" / "nnml"
 TARGET_FILES = ["water.json", "towns.json", "navigation.json", "toilets.json", "waypoints.json"]
 
-SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
 THREAD_NS = "http://schemas.microsoft.com/office/spreadsheetml/2018/threadedcomments"
 STATUS_TEXT = {"marked as resolved", "re-opened"}
 MAX_NEAREST_MATCH_MILES = 0.05
+# Observation column carrying the threaded comments, the first data row, and
+# the columns read from each commented row (section, waypoint, coordinates).
+COMMENT_COLUMN = "E"
+FIRST_DATA_ROW = 10
+ROW_COLUMNS = ("A", "D", "F")
+# Per-source latest-report summary and date-sorted report index for the app.
+REPORTS_FILE = "water-reports.json"
+SNIPPET_CHARS = 160
 
 
 def cell_column(ref: str) -> str:
@@ -29,33 +54,9 @@ def cell_row(ref: str) -> int:
     return int(re.search(r"(\d+)", ref).group(1))
 
 
-def shared_strings(zf: zipfile.ZipFile) -> list[str]:
-    root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
-    strings = []
-    for item in root.findall(f"{{{SPREADSHEET_NS}}}si"):
-        strings.append("".join(text.text or "" for text in item.iter(f"{{{SPREADSHEET_NS}}}t")))
-    return strings
-
-
-def sheet_rows(zf: zipfile.ZipFile) -> dict[int, dict[str, str]]:
-    strings = shared_strings(zf)
-    sheet = ET.fromstring(zf.read("xl/worksheets/sheet1.xml"))
-    rows: dict[int, dict[str, str]] = {}
-    for row in sheet.findall(f".//{{{SPREADSHEET_NS}}}sheetData/{{{SPREADSHEET_NS}}}row"):
-        row_index = int(row.attrib["r"])
-        values: dict[str, str] = {}
-        for cell in row.findall(f"{{{SPREADSHEET_NS}}}c"):
-            ref = cell.attrib["r"]
-            value_node = cell.find(f"{{{SPREADSHEET_NS}}}v")
-            value = value_node.text if value_node is not None else ""
-            if cell.attrib.get("t") == "s" and value:
-                value = strings[int(value)]
-            values[cell_column(ref)] = value
-        rows[row_index] = values
-    return rows
-
-
 def people(zf: zipfile.ZipFile) -> dict[str, str]:
+    if "xl/persons/person.xml" not in zf.namelist():
+        return {}
     root = ET.fromstring(zf.read("xl/persons/person.xml"))
     return {
         person.attrib["id"]: person.attrib.get("displayName", "")
@@ -63,9 +64,10 @@ def people(zf: zipfile.ZipFile) -> dict[str, str]:
     }
 
 
-def threaded_comments(zf: zipfile.ZipFile) -> dict[str, list[dict[str, str]]]:
-    authors = people(zf)
-    root = ET.fromstring(zf.read("xl/threadedComments/threadedComment1.xml"))
+def threaded_comments(zf: zipfile.ZipFile, part: str, authors: dict[str, str],
+                      sheet_name: str) -> dict[str, list[dict[str, str]]]:
+    """Comments by cell ref; each record names its sheet, since refs repeat across sheets."""
+    root = ET.fromstring(zf.read(part))
     by_ref: dict[str, list[dict[str, str]]] = defaultdict(list)
     for comment in root.findall(f"{{{THREAD_NS}}}threadedComment"):
         ref = comment.attrib.get("ref", "")
@@ -81,6 +83,7 @@ def threaded_comments(zf: zipfile.ZipFile) -> dict[str, list[dict[str, str]]]:
             "author": authors.get(comment.attrib.get("personId", ""), ""),
             "date": comment.attrib.get("dT", ""),
             "text": text,
+            "sheet": sheet_name,
             "cell": ref,
         })
     return by_ref
@@ -122,84 +125,87 @@ def choose_best_match(candidates: list[dict], row: dict) -> dict:
     return max(scored, key=lambda item: item[0])[1]
 
 
-def coord_distance_miles(a: tuple[float, float], b: tuple[float, float]) -> float:
-    lat_miles = (a[0] - b[0]) * 69
-    lon_miles = (a[1] - b[1]) * 55
-    return (lat_miles ** 2 + lon_miles ** 2) ** 0.5
+def build_index(data: list[dict]) -> tuple[dict[tuple[float, float], list[dict]], GridIndex]:
+    """Exact coordinate-key lookup plus a grid index over the distinct keys."""
+    exact: dict[tuple[float, float], list[dict]] = defaultdict(list)
+    for item in data:
+        if item.get("lat") is not None and item.get("lon") is not None:
+            exact[water_key(item)].append(item)
+    grid = GridIndex.from_items(exact, key=lambda key: key, cell_miles=MAX_NEAREST_MATCH_MILES)
+    return exact, grid
+
 
+def find_candidates(index: tuple[dict[tuple[float, float], list[dict]], GridIndex],
+                    coords: tuple[float, float]) -> list[dict]:
+    exact, grid = index
+    if coords in exact:
+        return exact[coords]
 
-def find_candidates(index: dict[tuple[float, float], list[dict]], coords: tuple[float, float]) -> list[dict]:
-    exact = index.get(coords, [])
-    if exact:
-        return exact
+    nearest = grid.nearest(coords[0], coords[1], MAX_NEAREST_MATCH_MILES)
+    return exact[nearest[1]] if nearest else []
 
-    nearest_key = None
-    nearest_distance = float("inf")
-    for key in index:
-        distance = coord_distance_miles(coords, key)
-        if distance < nearest_distance:
-            nearest_key = key
-            nearest_distance = distance
 
-    if nearest_key and nearest_distance <= MAX_NEAREST_MATCH_MILES:
-        return index[nearest_key]
-    return []
+def commented_sheets(workbook: Path):
+    """Yield (sheet name, comments by cell ref, commented rows) for each sheet."""
+    with zipfile.ZipFile(workbook) as zf:
+        authors = people(zf)
+        for sheet_name, sheet_part in sheet_parts(zf):
+            comment_part = threaded_comment_part(zf, sheet_part)
+            if comment_part is None:
+                continue
+            comments = {
+                ref: records
+                for ref, records in threaded_comments(zf, comment_part, authors, sheet_name).items()
+                if cell_column(ref) == COMMENT_COLUMN and cell_row(ref) >= FIRST_DATA_ROW
+            }
+            rows = read_rows(zf, sheet_part, ROW_COLUMNS, {cell_row(ref) for ref in comments})
+            yield sheet_name, comments, rows
 
 
-def main() -> None:
-    if not WORKBOOK.exists():
-        raise SystemExit(f"Missing workbook: {WORKBOOK}")
+def attach_comments(datasets: dict[str, list[dict]], workbooks: list[Path]) -> int:
+    """Pipeline transform: replace every record's sheetComments from the workbooks.
 
-    datasets = {}
+    Returns the number of records whose comments changed.
+    """
+    previous = {}
     indexes = {}
     for filename in TARGET_FILES:
-        path = NNML_DIR / filename
-        data = json.loads(path.read_text())
-        for item in data:
-            item.pop("sheetComments", None)
-        datasets[filename] = data
-        index: dict[tuple[float, float], list[dict]] = defaultdict(list)
+        data = datasets.get(filename)
+        if data is None:
+            continue
         for item in data:
-            if item.get("lat") is not None and item.get("lon") is not None:
-                index[water_key(item)].append(item)
-        indexes[filename] = index
+            previous[id(item)] = item.pop("sheetComments", None)
+        indexes[filename] = build_index(data)
 
     unmatched = []
     attached_by_file = defaultdict(set)
     comment_counts_by_file = defaultdict(int)
 
-    with zipfile.ZipFile(WORKBOOK) as zf:
-        rows = sheet_rows(zf)
-        comments = threaded_comments(zf)
-
-    for ref, records in comments.items():
-        row_index = cell_row(ref)
-        if cell_column(ref) != "E" or row_index < 10:
-            continue
-        row = rows.get(row_index, {})
-        coords = parse_coords(row.get("F", ""))
-        if not coords:
-            unmatched.append({"cell": ref, "reason": "missing coordinates", "waypoint": row.get("D", "")})
-            continue
-
-        matched_any = False
-        for filename, index in indexes.items():
-            candidates = find_candidates(index, coords)
-            if not candidates:
-                continue
-            item = choose_best_match(candidates, row)
-            item.setdefault("sheetComments", []).extend(records)
-            attached_by_file[filename].add(item["name"])
-            comment_counts_by_file[filename] += len(records)
-            matched_any = True
-
-        if not matched_any:
-            unmatched.append({"cell": ref, "reason": "no matching NNML waypoint", "waypoint": row.get("D", ""), "coords": coords})
-
-    for filename, data in datasets.items():
-        (NNML_DIR / filename).write_text(json.dumps(data, indent=2) + "\n")
-
-    for filename in TARGET_FILES:
+    for workbook in workbooks:
+        for sheet_name, comments, rows in commented_sheets(workbook):
+            for ref, records in comments.items():
+                cell = f"{sheet_name}!{ref}"
+                row = rows.get(cell_row(ref), {})
+                coords = parse_coords(row.get("F", ""))
+                if not coords:
+                    unmatched.append({"cell": cell, "reason": "missing coordinates", "waypoint": row.get("D", "")})
+                    continue
+
+                matched_any = False
+                for filename, index in indexes.items():
+                    candidates = find_candidates(index, coords)
+                    if not candidates:
+                        continue
+                    item = choose_best_match(candidates, row)
+                    item.setdefault("sheetComments", []).extend(records)
+                    attached_by_file[filename].add(item["name"])
+                    comment_counts_by_file[filename] += len(records)
+                    matched_any = True
+
+                if not matched_any:
+                    unmatched.append({"cell": cell, "reason": "no matching NNML waypoint", "waypoint": row.get("D", ""), "coords": coords})
+
+    for filename in indexes:
         print(
             f"{filename}: attached {comment_counts_by_file[filename]} comments "
             f"to {len(attached_by_file[filename])} records."
@@ -209,6 +215,78 @@ def main() -> None:
         for item in unmatched[:20]:
             print(f"  {item}")
 
+    return sum(
+        1 for filename in indexes for item in datasets[filename]
+        if item.get("sheetComments") != previous[id(item)]
+    )
+
+
+def snippet(text: str) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS - 1].rstrip() + "…"
+
+
+def summarize_reports(datasets: dict[str, list[dict]]) -> dict:
+    """Latest-report summary per commented source plus a date-sorted report index.
+
+    A source commented in several files (e.g. water.json and waypoints.json) is
+    listed once, from the first file in TARGET_FILES order. `sources` is sorted
+    by mile; `reports` is columnar and sorted by date, with `source` pointing
+    into `sources`, so "recent reports near mile X" is a bisect on date followed
+    by a mile filter over that slice.
+    """
+    seen = {}
+    for filename in TARGET_FILES:
+        for item in datasets.get(filename, []):
+            if item.get("sheetComments"):
+                seen.setdefault((item["name"], item.get("mile")), (filename, item))
+    ordered = sorted(seen.values(), key=lambda entry: (entry[1].get("mile") or 0, entry[1]["name"]))
+
+    sources = []
+    reports = []
+    for index, (filename, item) in enumerate(ordered):
+        comments = sorted(item["sheetComments"], key=lambda c: c["date"])
+        latest = comments[-1]
+        sources.append({
+            "name": item["name"],
+            "mile": item.get("mile"),
+            "file": filename,
+            "count": len(comments),
+            "latestDate": latest["date"],
+            "latestAuthor": latest["author"],
+            "latestText": snippet(latest["text"]),
+        })
+        reports.extend((c, index) for c in comments)
+    reports.sort(key=lambda entry: entry[0]["date"])
+
+    return {
+        "sources": sources,
+        "reports": {
+            "date": [c["date"] for c, _ in reports],
+            "source": [index for _, index in reports],
+            "mile": [sources[index]["mile"] for _, index in reports],
+            "author": [c["author"] for c, _ in reports],
+            "text": [snippet(c["text"]) for c, _ in reports],
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("workbooks", nargs="*", type=Path, default=[WORKBOOK],
+                        help="Water chart workbooks to read (default: the NNML water chart).")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+    for workbook in args.workbooks:
+        if not workbook.exists():
+            raise SystemExit(f"Missing workbook: {workbook}")
+
+    Pipeline(NNML_DIR, TARGET_FILES).register(
+        "comment attachment", lambda datasets: attach_comments(datasets, args.workbooks)
+    ).add_output(REPORTS_FILE, summarize_reports).run(allow_size_change=args.allow_size_change)
+
 
 if __name__ == "__main__":
     main()
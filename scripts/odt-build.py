@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""One entry point for the Python build scripts.
+
+    python3 scripts/odt-build.py <command> [args...]
+
+Each command runs an existing script's main() with the remaining arguments
+(so `odt-build.py validate --trail nnml` is `validate-data.py --trail nnml`).
+The dispatcher itself imports only the standard library; a command's script
+is loaded only when that command runs, and the scripts import their heavy
+dependencies (rasterio, pdfplumber, aiohttp) inside the functions that use
+them. Listing commands or asking a command for --help stays cheap.
+
+`startup` measures the cold start every command pays before doing any work:
+a fresh interpreter loads the dispatcher and imports the command's script
+exactly as running it would, without calling its main() (median of several
+runs). It fails if any command exceeds STARTUP_BUDGET_MS or pulls in one of
+HEAVY_MODULES. (Timing `<command> --help` instead would measure argparse
+exiting early, and miss scripts that parse arguments by hand.)
+
+Run:
+    python3 scripts/odt-build.py --help
+    python3 scripts/odt-build.py startup [--runs 5] [--budget-ms 200]
+"""
+
+import inspect
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# command -> (script relative to the repo root, one-line description)
+COMMANDS = {
+    "data": ("build-data.py", "Category JSON from the GPX + categorized CSV"),
+    "water-sources": ("build-water-sources.py", "Legacy water-sources.json/towns.json build"),
+    "categorize": ("categorize-csv.py", "Auto-fill CSV category columns from keyword rules"),
+    "elevation": ("build-elevation-from-kml.py", "ODT elevation profile from KML + USGS 3DEP"),
+    "corridor-dem": ("scripts/build-corridor-dem.py", "Corridor-clipped DEM from local DEM tiles"),
+    "profile": ("scripts/build-elevation-profile.py", "Elevation profile from the corridor DEM"),
+    "route-store": ("scripts/build-route-store.py", "Columnar .npy route store from the route GeoJSON"),
+    "steep-segments": ("scripts/build-steep-segments.py", "Grades, steep segments and hiking times for a profile"),
+    "sun-times": ("scripts/build-sun-times.py", "Sunrise/sunset/twilight tables per section"),
+    "manifest": ("scripts/build-data-manifest.py", "Rebuild or check public/data-manifest.json"),
+    "bundle": ("scripts/build-data-bundle.py", "Normalized data-bundle.json"),
+    "patch": ("scripts/build-data-patch.py", "Record-level data patches between releases"),
+    "sections": ("scripts/build-section-bundles.py", "Per-section data bundles"),
+    "section-tiles": ("scripts/build-section-tiles.py", "Per-section basemap/contour PMTiles extracts"),
+    "tile-index": ("scripts/build-tile-index.py", "Corridor tiles per zoom with mile spans, for prefetching"),
+    "water-gaps": ("scripts/build-water-gaps.py", "Water-carry distance index"),
+    "clusters": ("scripts/build-clusters.py", "Precomputed map point clusters per category"),
+    "nnml-databook": ("scripts/parse-nnml-databook.py", "Repair NNML landmarks from the databook PDF"),
+    "nnml-comments": ("scripts/extract-nnml-water-comments.py", "Attach NNML water chart comments"),
+    "nnml-legend": ("scripts/clean-nnml-landmark-legend.py", "Strip databook legend text"),
+    "nnml": ("scripts/postprocess-nnml.py", "All NNML post-processing in one pass"),
+    "validate": ("scripts/validate-data.py", "Cross-file consistency checks"),
+    "review-duplicates": ("scripts/review-near-duplicates.py", "Near-duplicate text review CSV"),
+    "bench": ("scripts/bench-pipeline.py", "Stage benchmarks on synthetic trails"),
+}
+# Modules no command may import before its main() runs.
+HEAVY_MODULES = {"rasterio", "numpy", "pdfplumber", "pdfminer", "aiohttp"}
+STARTUP_BUDGET_MS = 200
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: odt-build.py <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_}" for name, (_, help_) in COMMANDS.items()]
+    lines.append(f"  {'startup':<{width}}  Check cold-start time of every command")
+    return "\n".join(lines)
+
+
+def load_command(name: str):
+    """Import a command's script as running it would, without calling main()."""
+    script = COMMANDS[name][0]
+    # Root-level scripts use paths relative to the repo root.
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT / "scripts"))
+    from buildlib.scripts import load_script
+
+    return load_script(script)
+
+
+def run_command(name: str, argv: list[str]) -> None:
+    module = load_command(name)
+    sys.argv = [str(ROOT / COMMANDS[name][0]), *argv]
+    result = module.main()
+    if inspect.iscoroutine(result):
+        import asyncio
+        asyncio.run(result)
+
+
+def startup_check(argv: list[str]) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="odt-build.py startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name in COMMANDS:
+        probe = f"import runpy; runpy.run_path({__file__!r}, run_name='odt_build')['load_command']({name!r})"
+        times = []
+        heavy = set()
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True)
+            times.append((time.perf_counter() - start) * 1000)
+            # -X importtime lines: "import time: self | cumulative | module"
+            for line in proc.stderr.splitlines():
+                if line.startswith("import time:") and "|" in line:
+                    module = line.rsplit("|", 1)[1].strip().split(".")[0]
+                    if module in HEAVY_MODULES:
+                        heavy.add(module)
+        median = statistics.median(times)
+        ok = proc.returncode == 0 and median <= args.budget_ms and not heavy
+        failed = failed or not ok
+        note = f"  imports {', '.join(sorted(heavy))}" if heavy else ""
+        if proc.returncode != 0:
+            note += f"  exit {proc.returncode}"
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<17} {median:7.1f} ms (budget {args.budget_ms:.0f}){note}")
+    sys.exit(1 if failed else 0)
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(usage())
+        sys.exit(0 if len(sys.argv) >= 2 else 2)
+    name, argv = sys.argv[1], sys.argv[2:]
+    if name == "startup":
+        startup_check(argv)
+    elif name in COMMANDS:
+        run_command(name, argv)
+    else:
+        sys.exit(f"odt-build.py: unknown command '{name}'\n\n{usage()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,17 +8,33 @@ waypoints (e.g. mile 445.2 read only "receives more routine maintenance."). The
 Data Book itself has one complete description per milepoint. This script reads
 it with column-aware positioning and matches rows to JSON records by coordinate.
 
+Pages are parsed in a process pool and each page's records are cached under
+build/nnml/databook-cache/, keyed by a hash of the page content (its content
+streams, fonts and XObjects) and the column geometry below, so re-runs after
+changing the matching only re-read the cache and re-runs after editing the PDF
+only re-parse the changed pages. Entries no current page maps to are removed.
+
 Dry-run by default; pass --write to update the JSON files.
+
+Run:
+    python3 scripts/parse-nnml-databook.py [--write] [--jobs N] [--no-cache]
 """
 
 from __future__ import annotations
 
+import argparse
+import bisect
+import hashlib
 import json
+import os
 import re
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import pdfplumber
+from buildlib.manifest import add_manifest_arguments
+from buildlib.pipeline import Pipeline
+from buildlib.spatial import MILES_PER_DEG_LAT, GridIndex
+from buildlib.trace import add_trace_arguments, enable_from_args, traced
 
 ROOT = Path(__file__).resolve().parents[1]
 PDF = ROOT / "databook NNML.pdf"
@@ -51,76 +67,211 @@ BOILERPLATE = [
 SECTION_RE = re.compile(r"^SECTION\s+\d+:", re.IGNORECASE)
 LAT_RE = re.compile(r"^-?\d{2,3}\.\d{3,},?$")
 MATCH_TOLERANCE = 0.0008  # ~0.05 mi in degrees
+# Radius that contains every point within MATCH_TOLERANCE (|dlat| + |dlon|).
+MATCH_RADIUS_MILES = MATCH_TOLERANCE * MILES_PER_DEG_LAT
+
+CACHE_DIR = ROOT / "build" / "nnml" / "databook-cache"
+# Everything that changes what parse_page() returns for the same page content.
+# Bump CACHE_VERSION when editing parse_page() itself.
+CACHE_VERSION = 2
+PARSER_KEY = repr((CACHE_VERSION, MILEPOINT_MAX_X, NAME_X, COMMENT_X, COORD_X, BOILERPLATE, SECTION_RE.pattern))
 
 
 def is_boilerplate(text: str) -> bool:
     return SECTION_RE.match(text.strip()) is not None or any(b in text for b in BOILERPLATE)
 
 
-def parse_databook() -> list[dict]:
+def parse_page(page) -> list[dict]:
+    """Databook milepoint records on one pdfplumber page, in table order."""
     records: list[dict] = []
-    with pdfplumber.open(PDF) as pdf:
-        for page in pdf.pages:
-            tables = page.find_tables()
-            if not tables:
-                continue
-            words = page.extract_words()
-            # The table's ruled horizontal lines give exact per-milepoint row
-            # bands; combine them with fixed column x-ranges (the vertical rules
-            # are incomplete, so extract_table() merges columns).
-            for row in tables[0].rows:
-                _, top, _, bottom = row.bbox
-                rw = [w for w in words if top - 1 <= w["top"] < bottom - 1]
-                if not rw:
-                    continue
-                coords = [w for w in rw if COORD_X[0] <= w["x0"] < COORD_X[1]]
-                nums = re.findall(r"-?\d+\.\d+", " ".join(w["text"] for w in coords))
-                if len(nums) < 2:
-                    continue  # header / section / legend band — no coordinate
-
-                left = sorted((w for w in rw if w["x0"] < MILEPOINT_MAX_X), key=lambda w: w["x0"])
-                floats = [w["text"] for w in left if re.match(r"^\d+\.\d+$", w["text"])]
-                section = next((w["text"] for w in left if w["text"].startswith("S")), "")
-                name = " ".join(
-                    w["text"] for w in sorted((w for w in rw if NAME_X[0] <= w["x0"] < NAME_X[1]), key=lambda w: w["x0"])
-                )
-                comment_words = sorted(
-                    (w for w in rw if COMMENT_X[0] <= w["x0"] < COMMENT_X[1]),
-                    key=lambda w: (round(w["top"]), w["x0"]),
-                )
-                # Drop any legend text that bleeds into the comment column.
-                comment_text = " ".join(w["text"] for w in comment_words)
-                if is_boilerplate(comment_text):
-                    comment_text = ""
-                desc = re.sub(r"\s{2,}", " ", comment_text).strip()
-
-                records.append({
-                    "section": section,
-                    "cw": float(floats[0]) if floats else None,
-                    "name": name.strip(),
-                    "lat": round(float(nums[0]), 5),
-                    "lon": round(float(nums[1]), 5),
-                    "desc": desc,
-                })
+    tables = page.find_tables()
+    if not tables:
+        return records
+    # Row bands are sliced out of an index sorted by top with bisect; each
+    # band's words are then put back in extract_words() reading order, which
+    # keeps lat before lon even when their tops differ by a fraction.
+    words = page.extract_words()
+    by_top = sorted(range(len(words)), key=lambda i: words[i]["top"])
+    tops = [words[i]["top"] for i in by_top]
+    # The table's ruled horizontal lines give exact per-milepoint row
+    # bands; combine them with fixed column x-ranges (the vertical rules
+    # are incomplete, so extract_table() merges columns).
+    for row in tables[0].rows:
+        _, top, _, bottom = row.bbox
+        band = by_top[bisect.bisect_left(tops, top - 1):bisect.bisect_left(tops, bottom - 1)]
+        rw = [words[i] for i in sorted(band)]
+        if not rw:
+            continue
+        coords = [w for w in rw if COORD_X[0] <= w["x0"] < COORD_X[1]]
+        nums = re.findall(r"-?\d+\.\d+", " ".join(w["text"] for w in coords))
+        if len(nums) < 2:
+            continue  # header / section / legend band — no coordinate
+
+        left = sorted((w for w in rw if w["x0"] < MILEPOINT_MAX_X), key=lambda w: w["x0"])
+        floats = [w["text"] for w in left if re.match(r"^\d+\.\d+$", w["text"])]
+        section = next((w["text"] for w in left if w["text"].startswith("S")), "")
+        name = " ".join(
+            w["text"] for w in sorted((w for w in rw if NAME_X[0] <= w["x0"] < NAME_X[1]), key=lambda w: w["x0"])
+        )
+        comment_words = sorted(
+            (w for w in rw if COMMENT_X[0] <= w["x0"] < COMMENT_X[1]),
+            key=lambda w: (round(w["top"]), w["x0"]),
+        )
+        # Drop any legend text that bleeds into the comment column.
+        comment_text = " ".join(w["text"] for w in comment_words)
+        if is_boilerplate(comment_text):
+            comment_text = ""
+        desc = re.sub(r"\s{2,}", " ", comment_text).strip()
+
+        records.append({
+            "section": section,
+            "cw": float(floats[0]) if floats else None,
+            "name": name.strip(),
+            "lat": round(float(nums[0]), 5),
+            "lon": round(float(nums[1]), 5),
+            "desc": desc,
+        })
     return records
 
 
-def main() -> None:
-    write = "--write" in sys.argv
-    records = parse_databook()
-    print(f"Parsed {len(records)} databook milepoints")
+def _digest_object(digest, obj, seen: set) -> None:
+    """Feed a PDF object (dicts, arrays, streams, followed references) into digest."""
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in seen:
+            digest.update(f"ref {obj.objid}".encode())
+            return
+        seen.add(obj.objid)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        _digest_object(digest, obj.attrs, seen)
+        digest.update(obj.get_rawdata() or obj.get_data())
+    elif isinstance(obj, dict):
+        for name in sorted(obj, key=str):
+            digest.update(str(name).encode())
+            _digest_object(digest, obj[name], seen)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for item in obj:
+            _digest_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode())
+
+
+def page_cache_key(page) -> str:
+    """Hash of the page's content streams, fonts, XObjects and geometry plus PARSER_KEY.
+
+    Fonts and XObjects are hashed with everything they reference, so swapping
+    an embedded font or a form XObject (which can hold text) re-parses the page
+    even though its content stream is unchanged.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    digest = hashlib.sha256(PARSER_KEY.encode())
+    digest.update(repr(page.bbox).encode())
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        digest.update(resolve1(stream).get_data())
+    resources = resolve1(page.page_obj.resources) or {}
+    for kind in ("Font", "XObject"):
+        digest.update(kind.encode())
+        _digest_object(digest, resources.get(kind), set())
+    return digest.hexdigest()
+
+
+_worker_pdf = None
+
+
+def _open_worker_pdf(path: str) -> None:
+    import pdfplumber
+
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(path)
 
+
+def _parse_page_number(page_number: int) -> tuple[int, list[dict]]:
+    return page_number, parse_page(_worker_pdf.pages[page_number])
+
+
+@traced("parse databook pages")
+def parse_databook(jobs: int = 1, use_cache: bool = True) -> list[dict]:
+    """Parse every databook page, reusing cached pages whose content is unchanged.
+
+    Cache misses are parsed in a process pool; each worker opens the PDF once.
+    pdfplumber is imported here rather than at module level so the matching
+    helpers (and `--help`) load without it.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(PDF) as pdf:
+        keys = [page_cache_key(page) for page in pdf.pages]
+
+    results: dict[int, list[dict]] = {}
+    if use_cache:
+        for number, key in enumerate(keys):
+            cached = CACHE_DIR / f"{key}.json"
+            if cached.exists():
+                results[number] = json.loads(cached.read_text())
+    misses = [number for number in range(len(keys)) if number not in results]
+    print(f"Databook: {len(keys)} pages, {len(keys) - len(misses)} cached, {len(misses)} to parse")
+
+    if misses:
+        if jobs > 1 and len(misses) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(misses)),
+                initializer=_open_worker_pdf, initargs=(str(PDF),),
+            ) as pool:
+                parsed = pool.map(_parse_page_number, misses, chunksize=max(1, len(misses) // (jobs * 4)))
+                results.update(parsed)
+        else:
+            _open_worker_pdf(str(PDF))
+            try:
+                results.update(_parse_page_number(number) for number in misses)
+            finally:
+                _worker_pdf.close()
+        if use_cache:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            for number in misses:
+                (CACHE_DIR / f"{keys[number]}.json").write_text(json.dumps(results[number]))
+    if use_cache and CACHE_DIR.exists():
+        # Entries for pages that no longer exist (or changed) would only pile up.
+        live = {f"{key}.json" for key in keys}
+        stale = [path for path in CACHE_DIR.glob("*.json") if path.name not in live]
+        for path in stale:
+            path.unlink()
+        if stale:
+            print(f"Databook cache: removed {len(stale)} stale pages")
+
+    return [record for number in range(len(keys)) for record in results[number]]
+
+
+def nearest_record(grid: GridIndex, lat: float, lon: float) -> dict | None:
+    """Closest databook record within MATCH_TOLERANCE (|dlat| + |dlon| degrees)."""
+    best, bestd = None, MATCH_TOLERANCE
+    for _, r in grid.within(lat, lon, MATCH_RADIUS_MILES):
+        d = abs(r["lat"] - lat) + abs(r["lon"] - lon)
+        if d < bestd:
+            best, bestd = r, d
+    return best
+
+
+def repair_landmarks(datasets: dict[str, list[dict]], records: list[dict]) -> int:
+    """Pipeline transform: replace fragmented prose fields with databook descriptions."""
     # Index databook records by rounded coordinate.
     by_coord = {}
     for r in records:
         by_coord.setdefault((r["lat"], r["lon"]), r)
+    grid = GridIndex.from_items(by_coord.values(), cell_miles=MATCH_RADIUS_MILES)
 
     updated = 0
     unmatched_json = 0
     samples = []
     for filename, field in TARGET_FIELDS.items():
-        path = NNML_DIR / filename
-        data = json.loads(path.read_text())
+        data = datasets.get(filename)
+        if data is None:
+            continue
         changed = 0
         for item in data:
             lat, lon = item.get("lat"), item.get("lon")
@@ -129,13 +280,7 @@ def main() -> None:
             key = (round(float(lat), 5), round(float(lon), 5))
             rec = by_coord.get(key)
             if rec is None:
-                # nearest within tolerance
-                best, bestd = None, MATCH_TOLERANCE
-                for (rlat, rlon), r in by_coord.items():
-                    d = abs(rlat - lat) + abs(rlon - lon)
-                    if d < bestd:
-                        best, bestd = r, d
-                rec = best
+                rec = nearest_record(grid, lat, lon)
             if rec and rec["desc"] and rec["desc"] != item.get(field):
                 if len(samples) < 6 and filename == "waypoints.json":
                     samples.append((item.get("mile"), item.get(field), rec["desc"]))
@@ -143,15 +288,33 @@ def main() -> None:
                 changed += 1
             elif rec is None:
                 unmatched_json += 1
-        if write and changed:
-            path.write_text(json.dumps(data, indent=2) + "\n")
-        print(f"{filename}: {'updated' if write else 'would update'} {changed} {field}(s)")
+        print(f"{filename}: {changed} {field}(s) replaced from the databook")
         updated += changed
 
-    print(f"\nTotal: {updated} landmarks {'updated' if write else 'to update'}; {unmatched_json} JSON records had no databook match")
-    print("\n--- sample changes (waypoints.json) ---")
+    print(f"Total: {updated} landmarks replaced; {unmatched_json} JSON records had no databook match")
+    if samples:
+        print("--- sample changes (waypoints.json) ---")
     for mile, old, new in samples:
         print(f"  mile {mile}:\n    OLD: {old!r}\n    NEW: {new!r}")
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--write", action="store_true", help="Update the JSON files (default: dry run).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for page parsing.")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not write the page cache.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+    records = parse_databook(jobs=args.jobs, use_cache=not args.no_cache)
+    print(f"Parsed {len(records)} databook milepoints")
+
+    Pipeline(NNML_DIR, list(TARGET_FIELDS)).register(
+        "databook repair", lambda datasets: repair_landmarks(datasets, records)
+    ).run(write=args.write, allow_size_change=args.allow_size_change)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Run every NNML post-processing step in one load/transform/save cycle.
+
+The NNML JSON under public/trails/nnml/ is produced by parse-nnml-gpx.js and
+then edited in place by three steps whose order matters:
+
+    1. legend cleanup      (clean-nnml-landmark-legend.py)
+    2. databook repair     (parse-nnml-databook.py; needs pdfplumber + the PDF)
+    3. comment attachment  (extract-nnml-water-comments.py; needs the workbook)
+
+Each file is loaded once, the steps run on the in-memory records, and each file
+is written once, atomically, only if it changed. The individual scripts still
+work on their own for one-off runs.
+
+Run:
+    python3 scripts/postprocess-nnml.py [--dry-run] [--skip databook] [--skip comments]
+"""
+
+import argparse
+import os
+
+from buildlib.manifest import add_manifest_arguments
+from buildlib.pipeline import Pipeline
+from buildlib.scripts import load_script
+from buildlib.trace import add_trace_arguments, enable_from_args
+
+STEPS = ["legend", "databook", "comments"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing files.")
+    parser.add_argument("--skip", action="append", choices=STEPS, default=[],
+                        help="Leave out a step (repeatable).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for databook page parsing.")
+    add_manifest_arguments(parser)
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    legend = load_script("scripts/clean-nnml-landmark-legend.py")
+    comments = load_script("scripts/extract-nnml-water-comments.py")
+    pipeline = Pipeline(legend.NNML_DIR, comments.TARGET_FILES)
+
+    if "legend" not in args.skip:
+        pipeline.register("legend cleanup", legend.clean_datasets)
+    if "databook" not in args.skip:
+        databook = load_script("scripts/parse-nnml-databook.py")
+        records = databook.parse_databook(jobs=args.jobs)
+        pipeline.register("databook repair", lambda datasets: databook.repair_landmarks(datasets, records))
+    if "comments" not in args.skip:
+        if not comments.WORKBOOK.exists():
+            raise SystemExit(f"Missing workbook: {comments.WORKBOOK} (use --skip comments)")
+        pipeline.register("comment attachment", lambda datasets: comments.attach_comments(datasets, [comments.WORKBOOK]))
+        pipeline.add_output(comments.REPORTS_FILE, comments.summarize_reports)
+
+    pipeline.run(write=not args.dry_run, allow_size_change=args.allow_size_change)
+
+
+if __name__ == "__main__":
+    main()
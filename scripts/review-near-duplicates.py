@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Review CSV of near-duplicate landmark/details text across both trails.
+
+generate-review-csv.py flags copy-paste clusters by exact `details` equality in
+ODT reliable water only. This tool clusters `landmark` and `details` text of
+every category file on every trail with MinHash/LSH (buildlib.neardup), so
+reworded or mistyped copies are caught too and the cost stays near-linear as
+the NNML databook and water logs grow.
+
+Output rows use the same suggestion and flag columns as
+water-reliable-review.csv, prefixed with trail, category and cluster id. When
+most of a cluster shares one exact text, members that differ from it only in
+case, punctuation or spacing get it as their suggested text.
+
+Run:
+    python3 scripts/review-near-duplicates.py [--threshold 0.8] [--min-size 3] [--out near-duplicate-review.csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import time
+from collections import Counter
+
+from buildlib import trail_public_dir
+from buildlib.neardup import THRESHOLD, cluster, normalize
+
+TRAILS = ["odt", "nnml"]
+CATEGORY_FILES = ["water.json", "towns.json", "navigation.json", "toilets.json"]
+FIELDS = ["landmark", "details"]
+FIELDNAMES = ["trail", "category", "cluster", "name", "mile", "landmark", "details", "onTrail",
+              "suggested_landmark", "suggested_details", "suggested_subcategory", "flags"]
+
+
+def load_records() -> list[tuple[str, str, dict]]:
+    records = []
+    for trail in TRAILS:
+        for filename in CATEGORY_FILES:
+            path = trail_public_dir(trail) / filename
+            if path.exists():
+                category = filename.removesuffix(".json")
+                records.extend((trail, category, item) for item in json.loads(path.read_text()))
+    return records
+
+
+def review_rows(records: list[tuple[str, str, dict]], threshold: float, min_size: int) -> list[dict]:
+    rows: dict[int, dict] = {}
+    cluster_ids: dict[int, list[str]] = {}
+    next_id = 1
+    for field in FIELDS:
+        texts = [item.get(field, "") or "" for _, _, item in records]
+        for members in cluster(texts, threshold):
+            if len(members) < min_size:
+                continue
+            label = f"{field[0].upper()}{next_id}"
+            next_id += 1
+            exact = Counter(texts[i].strip() for i in members)
+            majority, majority_count = exact.most_common(1)[0]
+            majority_key = normalize(majority)
+            trails = sorted({records[i][0] for i in members})
+            for i in members:
+                trail, category, item = records[i]
+                row = rows.setdefault(i, {
+                    "trail": trail,
+                    "category": category,
+                    "cluster": "",
+                    "name": item.get("name", ""),
+                    "mile": item.get("mile", ""),
+                    "landmark": item.get("landmark", ""),
+                    "details": item.get("details", ""),
+                    "onTrail": item.get("onTrail", ""),
+                    "suggested_landmark": "",
+                    "suggested_details": "",
+                    "suggested_subcategory": "",
+                    "flags": "",
+                })
+                cluster_ids.setdefault(i, []).append(label)
+                text = texts[i].strip()
+                if exact[text] == len(members):
+                    flag = f"copy-paste cluster: {len(members)} entries share identical {field} text"
+                else:
+                    flag = (f"near-duplicate cluster: {len(members)} entries share similar {field} text "
+                            f"({len(exact)} variants; {', '.join(trails)})")
+                    if (text != majority and normalize(text) == majority_key
+                            and majority_count >= 2 and majority_count * 2 > len(members)):
+                        row[f"suggested_{field}"] = majority
+                row["flags"] = " | ".join(f for f in (row["flags"], flag) if f)
+    for i, labels in cluster_ids.items():
+        rows[i]["cluster"] = " ".join(labels)
+    return [rows[i] for i in sorted(rows, key=lambda i: (int(cluster_ids[i][0][1:]), i))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Minimum shingle Jaccard similarity to join a cluster.")
+    parser.add_argument("--min-size", type=int, default=3, help="Smallest cluster to report.")
+    parser.add_argument("--out", default="near-duplicate-review.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = load_records()
+    rows = review_rows(records, args.threshold, args.min_size)
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    clusters = {label for row in rows for label in row["cluster"].split()}
+    suggested = sum(1 for row in rows if row["suggested_landmark"] or row["suggested_details"])
+    print(f"Scanned {len(records)} records in {time.perf_counter() - start:.2f} s")
+    print(f"Wrote {len(rows)} entries in {len(clusters)} clusters -> {args.out}")
+    print(f"{suggested} entries have a suggested majority text")
+    breakdown = Counter(flag.split(":")[0] for row in rows for flag in row["flags"].split(" | "))
+    print("\nFlag breakdown:")
+    for flag, count in breakdown.most_common():
+        print(f"  {count:3}x  {flag}")
+
+
+if __name__ == "__main__":
+    main()
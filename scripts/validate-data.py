@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Cross-file consistency checks over the published data of every trail.
+
+validate-categories.py only checks category names in the source CSV. This
+validator checks the built output instead, per trail:
+
+  - every category record (water/towns/navigation/toilets) matches its own
+    waypoints.json record: same name and mile (hash lookup) and within
+    COORD_TOLERANCE_MILES, each waypoint claimed by at most one record per file
+  - every waypoint name resolves to a source GPX/KML waypoint, where the trail
+    has one (the NNML GPX files carry tracks only, so NNML skips this)
+  - miles never decrease within a file (alternates published at mile 0 aside)
+    and stay within MILE_OVERRUN of the elevation profile's length
+  - every waypoint lies within MAX_OFF_ROUTE_MILES of the route or an
+    alternate (grid index over the densified lines)
+  - the elevation profile's distances increase and its final distance agrees
+    with the route_line.geojson length, measured as the trail's profile
+    builder measures it (PROFILE_MEASURE)
+
+Route and alternate lines are read from the memory-mapped route store
+(buildlib.routestore) when it is current; otherwise the columns are built in
+memory, so validating never writes to build/.
+
+It runs in about a second for both trails and exits non-zero on any error, so
+it can gate a build.
+
+Run:
+    python3 scripts/validate-data.py [--trail odt] [--trail nnml]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from buildlib import ROOT, trail_build_dir, trail_public_dir
+from buildlib.geo import METERS_PER_MILE, haversine_m
+from buildlib.routestore import RouteStore, open_store
+from buildlib.spatial import GridIndex
+from buildlib.trace import add_trace_arguments, enable_from_args, span, traced
+
+TRAILS = ["odt", "nnml"]
+CATEGORY_FILES = ["water.json", "towns.json", "navigation.json", "toilets.json"]
+NAME_SOURCES = {
+    "odt": [ROOT / "waypoints-including-alternates.gpx", ROOT / "Track Files" / "ODT pit toilets.kml"],
+    "nnml": [],
+}
+MAX_OFF_ROUTE_MILES = 1.0
+ROUTE_SAMPLE_MILES = 0.05
+ROUTE_LENGTH_TOLERANCE = 0.01  # relative difference between profile and route length
+# How each trail's profile measures distance, so the route is measured the
+# same way. scripts/build-elevation-profile.py walks route_line.geojson in
+# file order and counts the gaps between segments ("walked"); ODT's profile
+# comes from build-elevation-from-kml.py, which stitches the KML tracks in
+# segment-number order rather than route_line.geojson's, so only the length
+# within segments is comparable there ("segments").
+PROFILE_MEASURE = {"odt": "segments", "nnml": "walked"}
+# Guidebook miles run slightly long against the measured track (ODT ends at
+# 751.1 vs a 743.2 mi profile), so allow this much relative overrun.
+MILE_OVERRUN = 0.02
+COORD_TOLERANCE_MILES = 0.05
+GPX_NS = "{http://www.topografix.com/GPX/1/1}"
+KML_NS = "{http://www.opengis.net/kml/2.2}"
+
+
+def source_names(paths: list[Path]) -> set[str]:
+    names = set()
+    for path in paths:
+        root = ET.parse(path).getroot()
+        if path.suffix == ".gpx":
+            names.update(n.text.strip() for n in root.iter(f"{GPX_NS}name") if n.text)
+        else:
+            for placemark in root.iter(f"{KML_NS}Placemark"):
+                name = placemark.find(f"{KML_NS}name")
+                if name is not None and name.text:
+                    names.add(name.text.strip())
+    return names
+
+
+@traced("route index")
+def route_index(stores: list[RouteStore]) -> GridIndex:
+    """Grid index over points sampled every ROUTE_SAMPLE_MILES along the lines."""
+    samples = []
+    for store in stores:
+        for part in store.segment_slices():
+            lon, lat, meters = store.lon[part].tolist(), store.lat[part].tolist(), store.meters[part].tolist()
+            for i in range(len(lon) - 1):
+                steps = max(1, math.ceil((meters[i + 1] - meters[i]) / METERS_PER_MILE / ROUTE_SAMPLE_MILES))
+                samples.extend(
+                    (lat[i] + (lat[i + 1] - lat[i]) * k / steps, lon[i] + (lon[i + 1] - lon[i]) * k / steps)
+                    for k in range(steps)
+                )
+            if lon:
+                samples.append((lat[-1], lon[-1]))
+    return GridIndex.from_items(samples, key=lambda p: p, cell_miles=MAX_OFF_ROUTE_MILES)
+
+
+def check_monotone(filename: str, records: list[dict], trail_end: float, errors: list[str]) -> None:
+    previous = None
+    for item in records:
+        mile = item.get("mile")
+        if not mile:
+            continue
+        if previous is not None and mile < previous[1]:
+            errors.append(f"{filename}: mile decreases {previous[0]} ({previous[1]}) -> {item['name']} ({mile})")
+        if mile > trail_end * (1 + MILE_OVERRUN):
+            errors.append(f"{filename}: {item['name']} mile {mile} beyond profile end {trail_end}")
+        previous = (item["name"], mile)
+
+
+def validate_trail(trail: str) -> tuple[list[str], list[str]]:
+    errors: list[str] = []
+    warnings: list[str] = []
+    public_dir = trail_public_dir(trail)
+    build_dir = trail_build_dir(trail)
+
+    profile = json.loads((public_dir / "elevation-profile.json").read_text())
+    distances = [p["distance"] for p in profile]
+    trail_end = distances[-1]
+    backwards = sum(1 for a, b in zip(distances, distances[1:]) if b < a)
+    if backwards:
+        errors.append(f"elevation-profile.json: distance decreases at {backwards} point(s)")
+    route = open_store(build_dir / "route_line.geojson", write=False)
+    walked = PROFILE_MEASURE[trail] == "walked"
+    route_miles = (route.total_meters if walked else route.length_meters) / METERS_PER_MILE
+    if abs(route_miles - trail_end) > ROUTE_LENGTH_TOLERANCE * route_miles:
+        errors.append(f"elevation profile ends at {trail_end} mi but route_line.geojson is {route_miles:.2f} mi "
+                      f"({'gaps included' if walked else 'within segments'})")
+
+    waypoints = json.loads((public_dir / "waypoints.json").read_text())
+    check_monotone("waypoints.json", waypoints, trail_end, errors)
+    # (name, mile) is not unique (e.g. several pit toilets at one mile), so
+    # keep every waypoint under its key and give each to one record.
+    by_key: dict[tuple, list[int]] = defaultdict(list)
+    for i, w in enumerate(waypoints):
+        by_key[(w["name"], w.get("mile"))].append(i)
+
+    for filename in CATEGORY_FILES:
+        path = public_dir / filename
+        if not path.exists():
+            continue
+        records = json.loads(path.read_text())
+        check_monotone(filename, records, trail_end, errors)
+        used: set[int] = set()
+        for item in records:
+            candidates = [
+                (haversine_m(item["lon"], item["lat"], waypoints[i]["lon"], waypoints[i]["lat"]) / METERS_PER_MILE, i)
+                for i in by_key.get((item["name"], item.get("mile")), ()) if i not in used
+            ]
+            miles, match = min(candidates, default=(None, None))
+            if match is None or miles > COORD_TOLERANCE_MILES:
+                errors.append(f"{filename}: {item['name']} (mile {item.get('mile')}) record missing from "
+                              f"waypoints.json (no unused waypoint within {COORD_TOLERANCE_MILES} mi)")
+            else:
+                used.add(match)
+
+    if NAME_SOURCES[trail]:
+        names = source_names(NAME_SOURCES[trail])
+        for w in waypoints:
+            if w["name"] not in names:
+                errors.append(f"waypoints.json: {w['name']} not found in {', '.join(p.name for p in NAME_SOURCES[trail])}")
+    else:
+        warnings.append("no GPX waypoint source; name resolution skipped")
+
+    alternates = build_dir / "alternates.geojson"
+    index = route_index([route] + ([open_store(alternates, write=False)] if alternates.exists() else []))
+    for w in waypoints:
+        if index.nearest(w["lat"], w["lon"], MAX_OFF_ROUTE_MILES) is None:
+            errors.append(f"waypoints.json: {w['name']} (mile {w.get('mile')}) is more than "
+                          f"{MAX_OFF_ROUTE_MILES} mi from the route and alternates")
+    return errors, warnings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trail", action="append", choices=TRAILS, help="Trail to check (repeatable; default all).")
+    add_trace_arguments(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    failed = False
+    for trail in args.trail or TRAILS:
+        start = time.perf_counter()
+        with span(f"validate {trail}"):
+            errors, warnings = validate_trail(trail)
+        print(f"{trail}: {len(errors)} error(s), {len(warnings)} warning(s) in {time.perf_counter() - start:.2f} s")
+        for message in errors:
+            print(f"  ERROR {message}")
+        for message in warnings:
+            print(f"  WARN  {message}")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
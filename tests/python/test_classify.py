@@ -0,0 +1,79 @@
+"""Parity of buildlib.classify with the keyword loops it replaced.
+
+The old categorize-csv.py rules live in scripts/bench-classify.py
+(legacy_classify); every published record must classify the same way.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import csv
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts"))
+from buildlib.classify import classify, is_town, is_water, town_services  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location("bench_classify", ROOT / "scripts" / "bench-classify.py")
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+PUBLISHED = [
+    "public/water.json",
+    "public/towns.json",
+    "public/navigation.json",
+    "public/trails/nnml/water.json",
+    "public/trails/nnml/towns.json",
+    "public/trails/nnml/navigation.json",
+]
+
+
+def legacy(landmark, details):
+    return bench.legacy_classify({"Landmark": landmark, "Water Details": details})
+
+
+def shared(landmark, details):
+    result = classify(landmark, details)
+    return result.category, result.subcategory
+
+
+@pytest.mark.parametrize("rel", PUBLISHED)
+def test_published_records_match_legacy_rules(rel):
+    path = ROOT / rel
+    if not path.exists():
+        pytest.skip(f"{rel} not built")
+    records = json.loads(path.read_text())
+    assert records
+    for record in records:
+        landmark, details = record.get("landmark") or "", record.get("details") or ""
+        assert shared(landmark, details) == legacy(landmark, details), record.get("name")
+
+
+def test_source_csv_matches_legacy_rules():
+    with open(ROOT / "Water Sources Sanitized.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert rows
+    for row in rows:
+        assert shared(row["Landmark"], row["Water Details"]) == bench.legacy_classify(row), row["Way Point"]
+
+
+def test_rule_attribution():
+    assert classify("Paisley (all services)", "").rule == "town: 'services'; 'all services' in landmark"
+    assert classify("junction", "").rule == "navigation; 'junction' in landmark"
+    assert classify("spring", "").rule == "water: 'spring' in landmark; default seasonal"
+    assert is_town("downtown", "") == "town"
+    assert is_water("gate", "  ") is None
+    assert is_water("gate", "trickle") == "details"
+
+
+def test_town_services_keeps_published_order():
+    assert town_services("Frenchglen (limited, no services)") == "limited"
+    assert town_services("Fields (no resupply)") == "none"
+    assert town_services("camp store") == "store"
+    assert town_services("Burns (all services)") == "all"
+    assert town_services("Andrews") == "limited"
@@ -0,0 +1,89 @@
+"""Hierarchy tests for scripts/buildlib/clusters.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib import clusters  # noqa: E402
+from buildlib.clusters import cluster_hierarchy, project, unproject, visible  # noqa: E402
+
+RADIUS = 50
+MAX_ZOOM = 14
+
+
+def scatter(rng, n):
+    # A few dense groups (water near a trailhead) plus scattered points.
+    centres = [(-117.0 + rng.uniform(-1, 1), 40.0 + rng.uniform(-1, 1)) for _ in range(5)]
+    points = []
+    for _ in range(n):
+        if rng.random() < 0.6:
+            lon, lat = rng.choice(centres)
+            points.append((lon + rng.gauss(0, 0.01), lat + rng.gauss(0, 0.01)))
+        else:
+            points.append((-117.0 + rng.uniform(-2, 2), 40.0 + rng.uniform(-2, 2)))
+    return points
+
+
+def test_project_round_trip():
+    for lon, lat in [(-117.25, 40.5), (0.0, 0.0), (179.9, -60.0)]:
+        assert unproject(*project(lon, lat)) == pytest.approx((lon, lat))
+
+
+def test_neighbours_match_brute_force():
+    rng = random.Random(1)
+    points = [project(lon, lat) for lon, lat in scatter(rng, 300)]
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    r = RADIUS / (clusters.TILE_SIZE * 2 ** 8)
+    near = clusters._neighbours(list(range(len(points))), xs, ys, r)
+    for i in range(len(points)):
+        expected = [j for j in range(len(points)) if j != i and (xs[j] - xs[i]) ** 2 + (ys[j] - ys[i]) ** 2 <= r * r]
+        assert near[i] == expected
+
+
+def test_every_zoom_draws_each_point_once():
+    rng = random.Random(2)
+    points = scatter(rng, 400)
+    h = cluster_hierarchy(points, RADIUS, MAX_ZOOM)
+    n = h["points"]
+    leaves = {}
+
+    def points_of(node):
+        if node not in leaves:
+            leaves[node] = [node] if node < n else [p for c in h["children"][node - n] for p in points_of(c)]
+        return leaves[node]
+
+    for z in range(0, MAX_ZOOM + 2):
+        drawn = sorted(p for node in visible(h, z) for p in points_of(node))
+        assert drawn == list(range(n)), z
+    for node, members in enumerate(h["children"], start=n):
+        assert h["count"][node] == sum(h["count"][c] for c in members) == len(points_of(node))
+        assert all(h["minZoom"][c] == h["maxZoom"][node] + 1 for c in members)
+    assert visible(h, MAX_ZOOM + 1) == list(range(n))
+
+
+def test_coincident_points_cluster_and_distant_points_do_not():
+    h = cluster_hierarchy([(-117.0, 40.0), (-117.0, 40.0), (-100.0, 30.0)], RADIUS, MAX_ZOOM)
+    assert h["children"][0] == [0, 1]
+    assert h["maxZoom"][3] == MAX_ZOOM
+    assert (h["lon"][3], h["lat"][3], h["count"][3]) == (-117.0, 40.0, 2)
+    # The far point stays on its own down to zoom 1 at least.
+    assert h["minZoom"][2] <= 1
+    assert h["maxZoom"][2] == clusters.MAX_ZOOM
+
+
+def test_min_points_keeps_small_groups_apart():
+    h = cluster_hierarchy([(-117.0, 40.0), (-117.0, 40.0)], RADIUS, MAX_ZOOM, min_points=3)
+    assert h["children"] == []
+    assert visible(h, 0) == [0, 1]
+
+
+def test_empty_input():
+    h = cluster_hierarchy([], RADIUS, MAX_ZOOM)
+    assert h == {"points": 0, "lon": [], "lat": [], "count": [], "minZoom": [], "maxZoom": [], "children": []}
@@ -0,0 +1,121 @@
+"""Round-trip tests for scripts/buildlib/datapatch.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.datapatch import (  # noqa: E402
+    apply_patch,
+    check_target,
+    dump_like,
+    make_patch,
+    release_info,
+    same_value,
+)
+
+
+def release(records):
+    raw = json.dumps(records, indent=2).encode()
+    return raw, json.loads(raw)
+
+
+def diff(old, new):
+    old_raw, old_records = release(old)
+    new_raw, new_records = release(new)
+    patch = make_patch(old_records, new_records,
+                       base=release_info(old_raw, old_records),
+                       target=release_info(new_raw, new_records))
+    # Patches ship as JSON, so apply the decoded form.
+    return old_raw, old_records, new_records, json.loads(json.dumps(patch))
+
+
+OLD = [
+    {"name": "Spring A", "mile": 1.5, "elevation": 4200},
+    {"name": "Creek B", "mile": 7.0, "elevation": 3900, "note": "flowing"},
+    {"name": "Tank C", "mile": 12.25, "elevation": 4400},
+]
+
+
+def test_adds_at_start_and_end():
+    new = [{"name": "Trailhead", "mile": 0.0}, *OLD, {"name": "Terminus", "mile": 20.0}]
+    old_raw, old_records, new_records, patch = diff(OLD, new)
+    assert [index for index, _ in patch["added"]] == [0, 4]
+    assert not patch["changed"] and not patch["removed"]
+    assert same_value(apply_patch(old_records, patch, old_raw), new_records)
+
+
+def test_adds_removes_and_moves():
+    new = [{"name": "Trailhead", "mile": 0.0}, OLD[2], {"name": "Cache", "mile": 9.0}, OLD[0]]
+    old_raw, old_records, new_records, patch = diff(OLD, new)
+    assert patch["removed"] == [["Creek B", 7.0, 0]]
+    assert "order" in patch
+    assert same_value(apply_patch(old_records, patch, old_raw), new_records)
+
+
+def test_type_only_change_is_kept():
+    new = [dict(OLD[0], elevation=4200.0), OLD[1], dict(OLD[2], elevation=True)]
+    old_raw, old_records, new_records, patch = diff(OLD, new)
+    assert [change["set"] for change in patch["changed"]] == [{"elevation": 4200.0}, {"elevation": True}]
+    result = apply_patch(old_records, patch, old_raw)
+    assert same_value(result, new_records)
+    assert not same_value(result, old_records)
+    assert type(result[0]["elevation"]) is float
+
+
+def test_same_value_is_type_sensitive():
+    assert same_value({"a": [1, "x"]}, {"a": [1, "x"]})
+    assert not same_value(1, 1.0)
+    assert not same_value(1, True)
+    assert not same_value({"a": [1]}, {"a": [1.0]})
+    assert not same_value({"a": 1}, {"a": 1, "b": None})
+
+
+def test_stale_base_is_rejected():
+    new = [*OLD, {"name": "Terminus", "mile": 20.0}]
+    _, _, _, patch = diff(OLD, new)
+
+    edited = [dict(OLD[0], elevation=4300), OLD[1], OLD[2]]
+    edited_raw, edited_records = release(edited)
+    with pytest.raises(ValueError, match="sha256"):
+        apply_patch(edited_records, patch, edited_raw)
+
+    shorter_raw, shorter_records = release(OLD[:2])
+    with pytest.raises(ValueError, match="base of 3 records"):
+        apply_patch(shorter_records, patch, shorter_raw)
+
+
+@pytest.mark.parametrize("dump", [
+    lambda records: json.dumps(records, indent=2),
+    lambda records: json.dumps(records, indent=2) + "\n",
+    lambda records: json.dumps(records, indent="\t") + "\n",
+    lambda records: json.dumps(records, separators=(",", ":")),
+    lambda records: json.dumps(records),
+])
+def test_patched_file_keeps_the_base_layout(dump):
+    new = [dict(OLD[0], note="dry"), OLD[2], {"name": "Terminus", "mile": 20.0}]
+    old_raw, new_raw = dump(OLD).encode(), dump(new).encode()
+    patch = make_patch(OLD, new, base=release_info(old_raw, OLD), target=release_info(new_raw, new))
+    encoded = dump_like(old_raw, apply_patch(json.loads(old_raw), patch, old_raw))
+    assert encoded == new_raw
+    check_target(encoded, patch)
+
+
+def test_target_mismatch_is_rejected():
+    old_raw, old_records, new_records, patch = diff(OLD, OLD[:2])
+    encoded = dump_like(old_raw, apply_patch(old_records, patch, old_raw))
+    check_target(encoded, patch)
+    with pytest.raises(ValueError, match="target release"):
+        check_target(encoded + b"\n", patch)
+
+
+@pytest.mark.parametrize("rel", ["water.json", "trails/nnml/water.json"])
+def test_published_layouts_round_trip(rel):
+    raw = (Path(__file__).resolve().parents[2] / "public" / rel).read_bytes()
+    assert dump_like(raw, json.loads(raw)) == raw
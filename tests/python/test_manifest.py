@@ -0,0 +1,58 @@
+"""Size-gate tests for scripts/buildlib/manifest.py publish().
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib import manifest  # noqa: E402
+
+
+@pytest.fixture
+def public(tmp_path, monkeypatch):
+    """A scratch public/ with one published asset, water.json (100 records)."""
+    monkeypatch.setattr(manifest, "PUBLIC_DIR", tmp_path)
+    manifest_path = tmp_path / manifest.MANIFEST_PATH.name
+    monkeypatch.setattr(manifest, "load_manifest", lambda: _load(manifest_path))
+    monkeypatch.setattr(manifest, "write_manifest", lambda data: manifest_path.write_text(json.dumps(data)))
+    water = tmp_path / "water.json"
+    water.write_text(json.dumps(list(range(100))))
+    manifest_path.write_text(json.dumps(manifest.finalize({"water.json": manifest.asset_entry(water)})))
+    return tmp_path
+
+
+def _load(path):
+    return json.loads(path.read_text())
+
+
+def test_publish_refuses_size_change_before_writing(public):
+    water = public / "water.json"
+    before_water, before_manifest = water.read_bytes(), _load(public / "data-manifest.json")
+    with pytest.raises(SystemExit, match="water.json"):
+        manifest.publish({water: "[]", public / "towns.json": "[1]"})
+    assert water.read_bytes() == before_water
+    assert not (public / "towns.json").exists()
+    assert _load(public / "data-manifest.json") == before_manifest
+    assert not list(public.glob(".*.tmp"))
+
+
+def test_publish_writes_and_records(public):
+    water = public / "water.json"
+    manifest.publish({water: json.dumps(list(range(90))), public / "towns.json": "[1]"})
+    assets = _load(public / "data-manifest.json")["assets"]
+    assert water.read_text() == json.dumps(list(range(90)))
+    assert assets["water.json"] == manifest.asset_entry(water)
+    assert assets["towns.json"]["records"] == 1
+
+
+def test_publish_allows_intended_size_change(public):
+    water = public / "water.json"
+    manifest.publish({water: "[]"}, allow_size_change=True)
+    assert water.read_text() == "[]"
+    assert _load(public / "data-manifest.json")["assets"]["water.json"]["bytes"] == 2
@@ -0,0 +1,86 @@
+"""Clustering tests for scripts/buildlib/neardup.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.neardup import MAX_BUCKET, THRESHOLD, cluster, jaccard, normalize, shingles  # noqa: E402
+
+WORDS = ("spring creek tank trough seep cistern pond well flowing dry low cattle clear muddy good "
+         "pipe guzzler reservoir algae trickle stagnant pool north south east west").split()
+
+
+def brute_force(texts, threshold=THRESHOLD):
+    """Connected components of every pair at or above threshold, in cluster()'s order."""
+    keys = [normalize(t) for t in texts]
+    sets = [shingles(k) for k in keys]
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    live = [i for i, k in enumerate(keys) if k]
+    for n, i in enumerate(live):
+        for j in live[n + 1:]:
+            if keys[i] == keys[j] or jaccard(sets[i], sets[j]) >= threshold:
+                parent[find(i)] = find(j)
+    groups = {}
+    for i in live:
+        groups.setdefault(find(i), []).append(i)
+    clusters = [sorted(g) for g in groups.values() if len(g) >= 2]
+    clusters.sort(key=lambda g: (-len(g), g[0]))
+    return clusters
+
+
+def variants(rng, base, count):
+    """Copies of base with one word changed or added, plus case/punctuation noise."""
+    out = []
+    for _ in range(count):
+        words = base.split()
+        if rng.random() < 0.5:
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+        else:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(WORDS))
+        text = " ".join(words)
+        out.append(text.upper() + "!" if rng.random() < 0.3 else text)
+    return out
+
+
+def test_normalize_ignores_case_and_punctuation():
+    assert normalize("  Spring,  FLOWING!! (cold) ") == "spring flowing cold"
+
+
+def test_matches_brute_force():
+    rng = random.Random(4)
+    texts = []
+    for _ in range(25):
+        base = " ".join(rng.choice(WORDS) for _ in range(12))
+        texts.extend(variants(rng, base, rng.randint(1, 4)))
+    texts.extend(["", "   ", "!!!"])
+    rng.shuffle(texts)
+    assert cluster(texts) == brute_force(texts)
+
+
+def test_large_bucket_still_clusters_near_duplicates():
+    """More than MAX_BUCKET near-copies of one boilerplate report form one cluster."""
+    rng = random.Random(9)
+    base = "water report cattle trough near the windmill was flowing with clear water today"
+    texts = variants(rng, base, MAX_BUCKET * 3)
+    unrelated = ["pothole dry since june", "spring box full and cold"]
+    clusters = cluster(texts + unrelated)
+    assert clusters == brute_force(texts + unrelated)
+    assert len(clusters[0]) > MAX_BUCKET
+
+
+def test_threshold_is_inclusive():
+    a, b = "abcdefghij klmnop", "abcdefghij klmnoq"
+    similarity = jaccard(shingles(a), shingles(b))
+    assert cluster([a, b], threshold=similarity) == [[0, 1]]
+    assert cluster([a, b], threshold=similarity + 1e-9) == []
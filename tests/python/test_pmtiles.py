@@ -0,0 +1,85 @@
+"""Tests for scripts/buildlib/pmtiles.py (ids, directories, archive round trip).
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib import pmtiles  # noqa: E402
+from buildlib.pmtiles import Entry, Header  # noqa: E402
+
+TEMPLATE = Header(*([0] * 13 + [pmtiles.COMPRESSION_GZIP, 1, 0, 0] + [0] * 4 + [0, 0, 0]))
+
+
+def test_tile_ids_follow_the_spec():
+    assert pmtiles.zxy_to_tile_id(0, 0, 0) == 0
+    # z1 walks the Hilbert curve: (0,0), (0,1), (1,1), (1,0).
+    assert [pmtiles.zxy_to_tile_id(1, x, y) for x, y in [(0, 0), (0, 1), (1, 1), (1, 0)]] == [1, 2, 3, 4]
+    assert pmtiles.zxy_to_tile_id(2, 0, 0) == 5
+    assert pmtiles.zxy_to_tile_id(12, 3423, 1763) == 19078479  # value from the PMTiles spec tests
+
+
+def test_tile_id_round_trip():
+    for z in range(6):
+        seen = set()
+        for x in range(1 << z):
+            for y in range(1 << z):
+                tile_id = pmtiles.zxy_to_tile_id(z, x, y)
+                assert pmtiles.tile_id_to_zxy(tile_id) == (z, x, y)
+                seen.add(tile_id)
+        first = ((1 << (2 * z)) - 1) // 3
+        assert seen == set(range(first, first + (1 << (2 * z))))
+
+
+def test_directory_round_trip_with_runs_and_gaps():
+    entries = [
+        Entry(0, 0, 100, 1),
+        Entry(1, 100, 50, 3),   # run of three identical tiles, contiguous offset
+        Entry(7, 0, 100, 1),    # repeats the first tile's bytes
+        Entry(40, 500, 20, 0),  # leaf pointer
+        Entry(41, 520, 1, 1),
+    ]
+    assert pmtiles.deserialize_directory(pmtiles.serialize_directory(entries)) == entries
+
+
+def test_find_resolves_runs_and_leaves():
+    entries = [Entry(5, 0, 10, 3), Entry(20, 10, 10, 0)]
+    assert pmtiles._find(entries, 7) == entries[0]
+    assert pmtiles._find(entries, 8) is None
+    assert pmtiles._find(entries, 25) == entries[1]
+    assert pmtiles._find(entries, 4) is None
+
+
+def test_write_read_round_trip_with_leaf_directories(tmp_path):
+    # Scattered ids and uneven lengths defeat run-length encoding and gzip, so
+    # the root outgrows the first 16 KiB and leaf directories are needed.
+    rng = random.Random(1)
+    ids = sorted(rng.sample(range(2_000_000), 40_000))
+    content = {tile_id: f"tile {tile_id}".encode() * rng.randint(1, 40) for tile_id in ids}
+    content[ids[1]] = content[ids[0]]  # one shared tile is stored once
+    path = tmp_path / "test.pmtiles"
+    counts = pmtiles.write_archive(path, ((i, content[i], content[i]) for i in ids), {"name": "test"}, TEMPLATE)
+    assert counts["tiles"] == len(ids)
+    assert counts["contents"] == len(ids) - 1
+    assert pmtiles.is_archive(path)
+
+    with pmtiles.Reader(path) as reader:
+        assert reader.header.leaf_length > 0
+        assert all(entry.run_length == 0 for entry in reader.root)
+        assert reader.metadata() == {"name": "test"}
+        for tile_id in ids[:50] + ids[-50:] + ids[::997]:
+            assert reader.read_at(reader.locate(tile_id)) == content[tile_id]
+        assert reader.locate(1) is None
+        z, x, y = pmtiles.tile_id_to_zxy(ids[-1])
+        assert reader.get(z, x, y) == content[ids[-1]]
+
+
+def test_is_archive_rejects_lfs_pointer(tmp_path):
+    pointer = tmp_path / "basemap.pmtiles"
+    pointer.write_text("version https://git-lfs.github.com/spec/v1\n")
+    assert not pmtiles.is_archive(pointer)
+    assert not pmtiles.is_archive(tmp_path / "missing.pmtiles")
@@ -0,0 +1,99 @@
+"""Brute-force comparison tests for scripts/buildlib/spatial.py GridIndex.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.geo import local_miles  # noqa: E402
+from buildlib.spatial import GridIndex  # noqa: E402
+
+
+def scatter(rng, n, lat=44.0, lon=-121.0, spread=0.3):
+    return [(lat + rng.uniform(-spread, spread), lon + rng.uniform(-spread, spread)) for _ in range(n)]
+
+
+def brute_distances(points, lat, lon):
+    return sorted((local_miles(lat, lon, plat, plon), i) for i, (plat, plon) in enumerate(points))
+
+
+def build(points, cell_miles):
+    return GridIndex.from_items(list(enumerate(points)), key=lambda item: item[1], cell_miles=cell_miles)
+
+
+@pytest.mark.parametrize("cell_miles", [0.25, 1.0, 5.0])
+def test_nearest_matches_brute_force(cell_miles):
+    rng = random.Random(7)
+    points = scatter(rng, 400)
+    index = build(points, cell_miles)
+    for lat, lon in scatter(rng, 200, spread=0.45):
+        expected = brute_distances(points, lat, lon)[0][0]
+        for max_miles in (math.inf, 2.0, 0.5):
+            found = index.nearest(lat, lon, max_miles)
+            if expected <= max_miles:
+                assert found is not None
+                assert found[0] == pytest.approx(expected)
+            else:
+                assert found is None
+
+
+@pytest.mark.parametrize("cell_miles", [0.25, 1.0])
+def test_nearest_at_max_miles_boundary(cell_miles):
+    """A point exactly max_miles away is found, however many cells away it is."""
+    rng = random.Random(11)
+    points = scatter(rng, 300)
+    index = build(points, cell_miles)
+    for lat, lon in scatter(rng, 100, spread=0.45):
+        distances = brute_distances(points, lat, lon)
+        nearest_d = distances[0][0]
+        found = index.nearest(lat, lon, nearest_d)
+        assert found is not None and found[0] == pytest.approx(nearest_d)
+        assert index.nearest(lat, lon, nearest_d * (1 - 1e-9)) is None
+
+
+@pytest.mark.parametrize("cell_miles", [0.25, 1.0])
+def test_within_matches_brute_force(cell_miles):
+    rng = random.Random(3)
+    points = scatter(rng, 400)
+    index = build(points, cell_miles)
+    for lat, lon in scatter(rng, 100, spread=0.45):
+        distances = brute_distances(points, lat, lon)
+        # Radii that land exactly on a point's distance, plus round ones.
+        for radius in (0.3, 1.7, distances[5][0], distances[40][0]):
+            found = index.within(lat, lon, radius)
+            assert sorted(value[0] for _, value in found) == sorted(i for d, i in distances if d <= radius)
+            assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_wide_latitude_range():
+    """Longitude cells span fewer miles north of the reference latitude."""
+    rng = random.Random(5)
+    points = scatter(rng, 300, spread=4.0)
+    index = build(points, 1.0)
+    for lat, lon in scatter(rng, 100, spread=5.0):
+        distances = brute_distances(points, lat, lon)
+        assert index.nearest(lat, lon)[0] == pytest.approx(distances[0][0])
+        radius = distances[0][0] * 1.5
+        found = index.within(lat, lon, radius)
+        assert sorted(value[0] for _, value in found) == sorted(i for d, i in distances if d <= radius)
+
+
+def test_empty_index():
+    index = GridIndex.from_items([], key=lambda item: item)
+    assert index.size == 0
+    assert index.nearest(44.0, -121.0) is None
+    assert index.nearest(44.0, -121.0, 1.0) is None
+    assert index.within(44.0, -121.0, 10.0) == []
+
+
+def test_items_without_coordinates_are_skipped():
+    index = GridIndex.from_items([{"lat": 44.0, "lon": -121.0}, {"lat": None, "lon": -121.0}])
+    assert index.size == 1
+    assert index.nearest(44.0, -121.0)[0] == 0.0
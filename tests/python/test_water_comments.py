@@ -0,0 +1,28 @@
+"""Comment attachment tests for scripts/extract-nnml-water-comments.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.scripts import load_script  # noqa: E402
+from buildlib.synthetic import trail_records, write_water_chart_xlsx  # noqa: E402
+
+comments = load_script("scripts/extract-nnml-water-comments.py")
+
+
+def test_comments_name_their_sheet_and_cell(tmp_path, capsys):
+    records = trail_records(40, seed=1)
+    workbook = tmp_path / "chart.xlsx"
+    commented = write_water_chart_xlsx(workbook, records, comment_rate=0.5, jitter_deg=0, seed=2)
+    datasets = {"water.json": records}
+    assert comments.attach_comments(datasets, [workbook]) == commented
+    attached = [c for item in records for c in item.get("sheetComments", [])]
+    assert attached
+    for comment in attached:
+        assert comment["sheet"] == "Sheet1"
+        assert comments.cell_column(comment["cell"]) == comments.COMMENT_COLUMN
+        assert comment["text"].startswith("Report ")
@@ -0,0 +1,71 @@
+"""Behaviour tests for scripts/buildlib/watergaps.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.watergaps import build_index, dry_stretches, next_ahead, next_behind  # noqa: E402
+
+START = (44.0, -121.0)
+
+
+def source(name, mile, subcategory, lat=45.0, lon=-121.0):
+    return {"name": name, "mile": mile, "subcategory": subcategory, "lat": lat, "lon": lon}
+
+
+def test_sweeps_match_brute_force():
+    rng = random.Random(2)
+    sources = sorted(round(rng.uniform(0, 100), 1) for _ in range(30))
+    queries = sorted({round(rng.uniform(0, 100), 1) for _ in range(200)} | set(sources[::3]))
+    for strict in (True, False):
+        ahead = [min((s - q for s in sources if (s > q if strict else s >= q)), default=None) for q in queries]
+        behind = [min((q - s for s in sources if (s < q if strict else s <= q)), default=None) for q in queries]
+        assert next_ahead(sources, queries, strict) == [None if d is None else round(d, 1) for d in ahead]
+        assert next_behind(sources, queries, strict) == [None if d is None else round(d, 1) for d in behind]
+
+
+def test_dry_stretches_include_open_ends():
+    assert dry_stretches([10.0, 25.0], 40.0) == [
+        {"startMile": 0.0, "endMile": 10.0, "miles": 10.0},
+        {"startMile": 10.0, "endMile": 25.0, "miles": 15.0},
+        {"startMile": 25.0, "endMile": 40.0, "miles": 15.0},
+    ]
+    assert dry_stretches([0.0], 5.0) == [{"startMile": 0.0, "endMile": 5.0, "miles": 5.0}]
+
+
+def test_build_index_filters_and_alternates():
+    water = [
+        source("Trailhead tap", 0, "reliable", *START),
+        source("Alternate spring", 0, "reliable"),  # mile 0 far from the start: an alternate
+        source("Creek", 12.0, "seasonal"),
+        source("Pothole", 20.0, "unreliable"),
+        source("Spring", 30.0, "reliable"),
+    ]
+    sections = [{"section": 1, "startMile": 0, "endMile": 25.0}, {"section": 2, "startMile": 25.0, "endMile": 40.0}]
+    index = build_index(water, 40.0, START, sections, bucket_miles=10.0)
+
+    assert [s["name"] for s in index["sources"]] == ["Trailhead tap", "Creek", "Pothole", "Spring"]
+    assert index["sourceGaps"]["reliable"]["nobo"] == [30.0, 18.0, 10.0, None]
+    assert index["sourceGaps"]["seasonal"]["nobo"] == [12.0, 18.0, 10.0, None]
+    assert index["sourceGaps"]["any"]["sobo"] == [None, 12.0, 8.0, 10.0]
+    # Buckets at miles 0, 10, 20, 30, 40; a source at the bucket mile counts.
+    assert index["bucketGaps"]["reliable"]["nobo"] == [0.0, 20.0, 10.0, 0.0, None]
+    assert index["bucketGaps"]["any"]["sobo"] == [0.0, 10.0, 0.0, 0.0, 10.0]
+
+    first, second = index["dryStretches"]
+    assert first["reliable"][0] == {"startMile": 0.0, "endMile": 30.0, "miles": 30.0}
+    assert [s["miles"] for s in second["any"]] == [10.0, 10.0]
+
+
+@pytest.mark.parametrize("name", ["reliable", "seasonal", "any"])
+def test_no_water(name):
+    index = build_index([], 15.0, START, [{"section": 1, "startMile": 0, "endMile": 15.0}], bucket_miles=5.0)
+    assert index["bucketGaps"][name]["nobo"] == [None] * 4
+    assert index["dryStretches"][0][name] == [{"startMile": 0.0, "endMile": 15.0, "miles": 15.0}]
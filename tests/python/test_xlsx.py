@@ -0,0 +1,124 @@
+"""Streaming reader tests for scripts/buildlib/xlsx.py.
+
+Run:
+    python3 -m pytest tests/python
+"""
+
+import sys
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from buildlib.synthetic import write_water_chart_xlsx  # noqa: E402
+from buildlib.xlsx import (  # noqa: E402
+    DOC_REL_NS,
+    REL_NS,
+    SPREADSHEET_NS,
+    THREADED_COMMENT_REL,
+    SharedString,
+    iter_rows,
+    read_rows,
+    sheet_parts,
+    split_ref,
+    threaded_comment_part,
+)
+
+WORKSHEET_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+def rels(*relationships):
+    body = "".join(f'<Relationship Id="{rid}" Type="{kind}" Target="{target}"/>'
+                   for rid, kind, target in relationships)
+    return f'<Relationships xmlns="{REL_NS}">{body}</Relationships>'
+
+
+def sheet(rows):
+    return f'<worksheet xmlns="{SPREADSHEET_NS}"><sheetData>{"".join(rows)}</sheetData></worksheet>'
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Two sheets listed out of part order; only "Water" has threaded comments."""
+    path = tmp_path / "book.xlsx"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("xl/workbook.xml",
+                    f'<workbook xmlns="{SPREADSHEET_NS}" xmlns:r="{DOC_REL_NS}"><sheets>'
+                    '<sheet name="Water" sheetId="1" r:id="rId2"/>'
+                    '<sheet name="Notes" sheetId="2" r:id="rId1"/></sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    rels(("rId1", WORKSHEET_REL, "worksheets/sheet1.xml"),
+                         ("rId2", WORKSHEET_REL, "/xl/worksheets/sheet2.xml")))
+        zf.writestr("xl/sharedStrings.xml",
+                    f'<sst xmlns="{SPREADSHEET_NS}"><si><t>zero</t></si><si><r><t>o</t></r><r><t>ne</t></r></si>'
+                    '<si><t>two</t></si><si><t>three</t></si></sst>')
+        zf.writestr("xl/worksheets/sheet1.xml", sheet(['<row r="1"><c r="A1" t="s"><v>3</v></c></row>']))
+        zf.writestr("xl/worksheets/sheet2.xml", sheet([
+            '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1"><v>1.5</v></c></row>',
+            '<row r="2"><c r="A2" t="s"><v>1</v></c><c r="B2" t="inlineStr"><is><t>inline</t></is></c>'
+            '<c r="C2" t="s"><v>2</v></c></row>',
+            '<row r="4"><c r="B4"/></row>',
+        ]))
+        zf.writestr("xl/worksheets/_rels/sheet2.xml.rels",
+                    rels(("rId1", THREADED_COMMENT_REL, "../threadedComments/threadedComment7.xml")))
+        zf.writestr("xl/threadedComments/threadedComment7.xml", "<ThreadedComments/>")
+    with zipfile.ZipFile(path) as zf:
+        yield zf
+
+
+def test_split_ref():
+    assert split_ref("E12") == ("E", 12)
+    assert split_ref("AB3") == ("AB", 3)
+
+
+def test_sheet_parts_follow_workbook_rels(workbook):
+    assert sheet_parts(workbook) == [("Water", "xl/worksheets/sheet2.xml"), ("Notes", "xl/worksheets/sheet1.xml")]
+
+
+def test_threaded_comments_come_from_the_sheet_rels(workbook):
+    assert threaded_comment_part(workbook, "xl/worksheets/sheet2.xml") == "xl/threadedComments/threadedComment7.xml"
+    # sheet1 has no rels of its own, but other sheets do: no numbering guess.
+    assert threaded_comment_part(workbook, "xl/worksheets/sheet1.xml") is None
+
+
+def test_read_rows_resolves_wanted_cells(workbook):
+    assert read_rows(workbook, "xl/worksheets/sheet2.xml", ["A", "B"]) == {
+        1: {"A": "zero", "B": "1.5"},
+        2: {"A": "one", "B": "inline"},
+        4: {"B": ""},
+    }
+    assert read_rows(workbook, "xl/worksheets/sheet2.xml", ["C"], rows={2, 3}) == {2: {"C": "two"}}
+
+
+def test_iter_rows_defers_shared_strings(workbook):
+    rows = dict(iter_rows(workbook, "xl/worksheets/sheet2.xml", ["A"]))
+    assert rows[2]["A"] == 1 and isinstance(rows[2]["A"], SharedString)
+
+
+def test_iter_rows_streams(tmp_path):
+    """The first rows arrive before the parser reaches the end of the sheet."""
+    path = tmp_path / "broken.xlsx"
+    rows = [f'<row r="{r}"><c r="A{r}" t="inlineStr"><is><t>row {r}</t></is></c></row>' for r in range(1, 5001)]
+    with zipfile.ZipFile(path, "w") as zf:
+        # Truncated: the closing tags are missing, so a whole-document parse fails.
+        zf.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{SPREADSHEET_NS}"><sheetData>{"".join(rows)}<')
+    with zipfile.ZipFile(path) as zf:
+        stream = iter_rows(zf, "xl/worksheets/sheet1.xml", ["A"])
+        assert next(stream) == (1, {"A": "row 1"})
+        with pytest.raises(ET.ParseError):
+            list(stream)
+
+
+def test_synthetic_water_chart_round_trip(tmp_path):
+    records = [{"name": f"S{n} {n}.0 - W{n}", "mile": float(n), "subcategory": "reliable",
+                "lat": 39.0 + n / 100, "lon": -115.0} for n in range(1, 21)]
+    path = tmp_path / "chart.xlsx"
+    write_water_chart_xlsx(path, records, jitter_deg=0)
+    with zipfile.ZipFile(path) as zf:
+        [(_, part)] = sheet_parts(zf)
+        rows = read_rows(zf, part, ["D", "F"])
+        assert threaded_comment_part(zf, part) == "xl/threadedComments/threadedComment1.xml"
+    assert [values["D"] for values in rows.values()] == [f"W{n}" for n in range(1, 21)]
+    assert list(rows.values())[0]["F"] == "39.01000, -115.00000"